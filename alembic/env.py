@@ -7,7 +7,15 @@ import sys
 
 # モデルのインポート
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app.models import base  # noqa
+import importlib
+import pkgutil
+
+import app.models
+from app.core.database import Base
+
+# autogenerate が全テーブルを認識できるよう、app/models 配下をすべて読み込む
+for module in pkgutil.iter_modules(app.models.__path__):
+    importlib.import_module(f"app.models.{module.name}")
 
 # Alembic Config オブジェクトの取得
 config = context.config
@@ -16,7 +24,7 @@ config = context.config
 fileConfig(config.config_file_name)
 
 # ターゲットメタデータの設定
-target_metadata = base.Base.metadata
+target_metadata = Base.metadata
 
 # データベース URL の取得
 def get_url():
@@ -0,0 +1,35 @@
+"""Keyset pagination indexes
+
+Revision ID: a1f3c9d2e7b4
+Revises: 123456789abc
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# リビジョン識別子
+revision = 'a1f3c9d2e7b4'
+down_revision = '123456789abc'
+branch_labels = None
+depends_on = None
+
+# (インデックス名, テーブル, 列) — 一覧の ORDER BY <時刻> DESC, id DESC に対応
+INDEXES = [
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+    ("ix_pets_user_id_created_at_id", "pets", ["user_id", "created_at", "id"]),
+    ("ix_notifications_user_id_created_at_id", "notifications", ["user_id", "created_at", "id"]),
+    ("ix_login_history_user_id_logged_at_id", "login_history", ["user_id", "logged_at", "id"]),
+    ("ix_feedback_user_id_created_at_id", "feedback", ["user_id", "created_at", "id"]),
+    ("ix_attachment_user_id_created_at_id", "attachment", ["user_id", "created_at", "id"]),
+]
+
+def upgrade():
+    # 稼働中のテーブルをロックしないよう CONCURRENTLY で作成（トランザクション外で実行）
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""User search trigram indexes
+
+Revision ID: b7e2d4f1c3a8
+Revises: a1f3c9d2e7b4
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# リビジョン識別子
+revision = 'b7e2d4f1c3a8'
+down_revision = 'a1f3c9d2e7b4'
+branch_labels = None
+depends_on = None
+
+# (インデックス名, 列) — 管理者検索の ILIKE '%q%' / similarity 用
+INDEXES = [
+    ("ix_users_username_trgm", "username"),
+    ("ix_users_display_name_trgm", "display_name"),
+    ("ix_users_email_trgm", "email"),
+]
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # 稼働中の users をロックしないよう CONCURRENTLY で作成（トランザクション外で実行）
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.create_index(
+                name,
+                "users",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name="users", postgresql_concurrently=True, if_exists=True)
+    # pg_trgm は他の用途でも使われうるため削除しない
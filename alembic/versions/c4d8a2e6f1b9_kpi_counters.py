@@ -0,0 +1,120 @@
+"""KPI counters maintained by statement-level triggers
+
+Revision ID: c4d8a2e6f1b9
+Revises: b7e2d4f1c3a8
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# リビジョン識別子
+revision = 'c4d8a2e6f1b9'
+down_revision = 'b7e2d4f1c3a8'
+branch_labels = None
+depends_on = None
+
+# 文単位トリガー（遷移テーブルで影響行をまとめて数える）。
+# 一括 INSERT でも kpi_counters の UPDATE は 1 文につき 1 回。増減 0 の場合は行ロックも取らない。
+# 複数行を更新する関数は name 順（users_active → users_total）に更新し、
+# statistics.reconcile の ORDER BY name FOR UPDATE とロック順序を揃える（デッドロック防止）。
+TRIGGER_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION kpi_users_insert() RETURNS trigger AS $$
+    DECLARE
+        total bigint;
+        active bigint;
+    BEGIN
+        SELECT count(*), count(*) FILTER (WHERE is_active) INTO total, active FROM new_rows;
+        UPDATE kpi_counters SET value = value + active, updated_at = now() WHERE name = 'users_active' AND active <> 0;
+        UPDATE kpi_counters SET value = value + total, updated_at = now() WHERE name = 'users_total' AND total <> 0;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION kpi_users_delete() RETURNS trigger AS $$
+    DECLARE
+        total bigint;
+        active bigint;
+    BEGIN
+        SELECT count(*), count(*) FILTER (WHERE is_active) INTO total, active FROM old_rows;
+        UPDATE kpi_counters SET value = value - active, updated_at = now() WHERE name = 'users_active' AND active <> 0;
+        UPDATE kpi_counters SET value = value - total, updated_at = now() WHERE name = 'users_total' AND total <> 0;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION kpi_users_update() RETURNS trigger AS $$
+    DECLARE
+        delta bigint;
+    BEGIN
+        SELECT (SELECT count(*) FROM new_rows WHERE is_active) - (SELECT count(*) FROM old_rows WHERE is_active)
+          INTO delta;
+        UPDATE kpi_counters SET value = value + delta, updated_at = now() WHERE name = 'users_active' AND delta <> 0;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION kpi_report_logs_insert() RETURNS trigger AS $$
+    BEGIN
+        UPDATE kpi_counters SET value = value + (SELECT count(*) FROM new_rows), updated_at = now()
+         WHERE name = 'reports_total';
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION kpi_report_logs_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE kpi_counters SET value = value - (SELECT count(*) FROM old_rows), updated_at = now()
+         WHERE name = 'reports_total';
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+# (トリガー名, テーブル, イベント, 遷移テーブル定義, 関数)
+TRIGGERS = [
+    ("trg_kpi_users_insert", "users", "INSERT", "NEW TABLE AS new_rows", "kpi_users_insert"),
+    ("trg_kpi_users_delete", "users", "DELETE", "OLD TABLE AS old_rows", "kpi_users_delete"),
+    ("trg_kpi_users_update", "users", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows", "kpi_users_update"),
+    ("trg_kpi_report_logs_insert", "report_logs", "INSERT", "NEW TABLE AS new_rows", "kpi_report_logs_insert"),
+    ("trg_kpi_report_logs_delete", "report_logs", "DELETE", "OLD TABLE AS old_rows", "kpi_report_logs_delete"),
+]
+
+def upgrade():
+    op.create_table(
+        "kpi_counters",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    for ddl in TRIGGER_FUNCTIONS:
+        op.execute(ddl)
+
+    # 初期値の投入とトリガー作成の間に書き込みが入らないよう、対象テーブルを短時間ロックする
+    op.execute("LOCK TABLE users, report_logs IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        INSERT INTO kpi_counters (name, value)
+        SELECT 'users_total', count(*) FROM users
+        UNION ALL SELECT 'users_active', count(*) FILTER (WHERE is_active) FROM users
+        UNION ALL SELECT 'reports_total', count(*) FROM report_logs
+        """
+    )
+    for name, table, event, referencing, function in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON {table} "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+def downgrade():
+    for name, table, _, _, _ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    for _, _, _, _, function in reversed(TRIGGERS):
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.drop_table("kpi_counters")
@@ -1,9 +1,17 @@
 # APIルーター：ダッシュボード統計エンドポイント
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import metrics
 from app.core.database import get_db
-from app.core.security import has_admin_role
+from app.core.read_replicas import get_replica_router
+from app.api.dependencies import has_admin_role
+from app.services.admin_export import EXPORTS, MEDIA_TYPES, build_query, stream_export
 from app.services.statistics import get_dashboard_stats
 
 router = APIRouter()
@@ -21,3 +29,59 @@ async def admin_dashboard_stats(
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"統計取得エラー: {str(e)}")
+
+
+@router.get("/admin/metrics", summary="プロセス内メトリクス（管理者のみ）", response_model=dict)
+async def admin_metrics(_: None = Depends(has_admin_role)):
+    """
+    パスワードハッシュ実行プールなど、各サブシステムの統計を返す。
+    値はリクエストを処理したワーカープロセス単位。
+    """
+    return metrics.collect()
+
+
+@router.get("/admin/export/{entity}", summary="データのエクスポート（管理者のみ）")
+async def admin_export(
+    request: Request,
+    entity: Literal["users", "login_history", "feedback", "payments"],
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="出力形式"),
+    since: Optional[datetime] = Query(None, description="この日時以降（含む）"),
+    until: Optional[datetime] = Query(None, description="この日時より前（含まない）"),
+    user_id: Optional[UUID] = Query(None, description="login_history / feedback / payments"),
+    is_active: Optional[bool] = Query(None, description="users"),
+    is_successful: Optional[bool] = Query(None, description="login_history"),
+    category: Optional[str] = Query(None, description="feedback"),
+    handled: Optional[str] = Query(None, description="feedback"),
+    status_: Optional[str] = Query(None, alias="status", description="payments"),
+    currency: Optional[str] = Query(None, description="payments"),
+    _: None = Depends(has_admin_role)
+):
+    """
+    全件を NDJSON（1 行 1 件）または CSV でストリーミング出力する（時刻・id 順）。
+    サーバーサイドカーソルで少しずつ読み出すため、件数によらずメモリ使用量は一定。
+    """
+    spec = EXPORTS[entity]
+    filters = {
+        name: value
+        for name, value in {
+            "user_id": user_id,
+            "is_active": is_active,
+            "is_successful": is_successful,
+            "category": category,
+            "handled": handled,
+            "status": status_,
+            "currency": currency,
+        }.items()
+        if value is not None
+    }
+    try:
+        stmt = build_query(spec, since=since, until=until, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{entity} では指定できない条件です: {e}")
+
+    filename = f"{entity}-{datetime.now():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(spec, stmt, format, get_replica_router().route(request)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
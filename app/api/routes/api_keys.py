@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app import crud, schemas
-from app.api import deps
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.crud import crud_api_key
+from app.schemas.api_key import APIKey, APIKeyCreate, APIKeyCreated
 
-router = APIRouter()
+router = APIRouter(prefix="/api_keys", tags=["API Keys"])
+
+@router.post("/", response_model=APIKeyCreated)
+async def create_api_key(
+    api_key_in: APIKeyCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # 平文キーを返すのはこのレスポンスのみ（DB にはハッシュだけが残る）
+    db_api_key, raw_key = await crud_api_key.create_api_key(db, user_id=current_user.id, api_key=api_key_in)
+    return APIKeyCreated(**APIKey.model_validate(db_api_key).model_dump(), key=raw_key)
 
-@router.post("/", response_model=schemas.APIKey)
-def create_api_key(
-    api_key_in: schemas.APIKeyCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.get("/", response_model=list[APIKey])
+async def read_api_keys(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return crud.crud_api_key.create_api_key(db, user_id=current_user.id, api_key=api_key_in)
+    return await crud_api_key.get_api_keys_by_user(db, user_id=current_user.id)
 
-@router.get("/", response_model=list[schemas.APIKey])
-def read_api_keys(
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.delete("/{key_id}")
+async def delete_api_key(
+    key_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return crud.crud_api_key.get_api_keys_by_user(db, user_id=current_user.id)
+    # 削除したキーは以降の X-API-Key 認証で拒否される
+    deleted = await crud_api_key.delete_api_key(db, user_id=current_user.id, key_id=key_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="対象の API キーが見つかりません")
+    return {"detail": "削除しました"}
@@ -1,12 +1,13 @@
 # app/api/routes/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.services.auth_service import authenticate_user, create_access_token, update_last_login
+from app.services.auth_service import create_access_token, login as login_pipeline
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.utils.request_meta import get_client_ip, get_user_agent
 
 import logging
 
@@ -19,6 +20,7 @@ router = APIRouter()
     response_description="JWTアクセストークンを返します"
 )
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
@@ -26,12 +28,19 @@ async def login(
     ユーザー認証およびJWTトークンの発行を行うエンドポイント。
 
     - 認証失敗時は401エラーを返却。
-    - 認証成功後、最終ログイン時刻（last_login_at）を更新。
+    - 認証成功時は最終ログイン時刻（last_login_at）を UPDATE … RETURNING 1 回で更新。
+    - ログイン履歴（失敗を含む）はバッファ経由でまとめて記録。
     - JWTトークンを発行し、アクセストークンを返却。
     """
     try:
-        # 認証処理（ユーザー名とパスワードを検証）
-        user = await authenticate_user(db, form_data.username, form_data.password)
+        # 認証処理（ユーザー名とパスワードの検証・最終ログイン更新・履歴記録）
+        user = await login_pipeline(
+            db,
+            form_data.username,
+            form_data.password,
+            ip=get_client_ip(request),
+            ua=get_user_agent(request),
+        )
         if not user:
             logging.warning(f"認証失敗: username={form_data.username}")
             raise HTTPException(
@@ -40,9 +49,6 @@ async def login(
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        # ✅ 最終ログイン日時を更新
-        await update_last_login(db, user.id)
-
         # JWTアクセストークンの生成
         access_token = create_access_token(
             data={"sub": str(user.id), "is_admin": user.is_admin},
@@ -56,6 +62,9 @@ async def login(
             "token_type": "bearer"
         }
 
+    except HTTPException:
+        # 401（認証失敗）や 503（ハッシュキュー満杯）はそのまま返却
+        raise
     except Exception as e:
         # トークン生成またはその他処理中の例外を捕捉
         logging.error(f"トークン発行中にエラーが発生: {e}")
@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.dependencies import get_db, get_current_user
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.dependencies.api_key_auth import require_scopes
 from app.schemas.chat import ChatRequest, ChatResponse
+from app.services.api_key_index import ApiKeyPrincipal
 from app.utils.openai_client import get_ai_response
 
 router = APIRouter()
@@ -12,11 +14,25 @@ router = APIRouter()
 async def chat_completion(
     request: ChatRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     ユーザーからのチャットメッセージに対し、OpenAIを使用して応答を返す。
     """
+    return await _complete(request)
+
+@router.post("/service/chat/completion", response_model=ChatResponse, summary="AIチャット応答（サービス間連携）")
+async def service_chat_completion(
+    request: ChatRequest,
+    principal: ApiKeyPrincipal = Depends(require_scopes("chat"))
+):
+    """
+    連携サービスからのチャットメッセージに応答する。
+    認証は X-API-Key（chat スコープ）で行い、DB セッションは取得しない。
+    """
+    return await _complete(request)
+
+async def _complete(request: ChatRequest) -> ChatResponse:
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="メッセージが空です。")
 
@@ -1,9 +1,10 @@
 # ---------- ルーター ----------
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
-from ..dependencies import get_db, get_current_user
+from ..dependencies import Principal, get_db, get_current_user
+from ...schemas.common import CursorPage
 from ...schemas.feedback import FeedbackCreate, FeedbackOut
+from ...utils.pagination import CursorParams
 from ...crud.feedback import create_feedback, list_feedbacks
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
@@ -12,13 +13,14 @@ router = APIRouter(prefix="/feedback", tags=["Feedback"])
 async def send_feedback(
     body: FeedbackCreate,
     db : AsyncSession = Depends(get_db),
-    user: dict       = Depends(get_current_user),
+    user: Principal  = Depends(get_current_user),
 ):
-    return await create_feedback(db, UUID(user["sub"]), body)
+    return await create_feedback(db, user.id, body)
 
-@router.get("/", response_model=list[FeedbackOut])
+@router.get("/", response_model=CursorPage[FeedbackOut])
 async def my_feedback(
     db : AsyncSession = Depends(get_db),
-    user: dict       = Depends(get_current_user),
+    user: Principal  = Depends(get_current_user),
+    params: CursorParams = Depends(),
 ):
-    return await list_feedbacks(db, UUID(user["sub"]))
+    return await list_feedbacks(db, user.id, params)
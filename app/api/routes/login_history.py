@@ -1,16 +1,18 @@
 # ---------- ルーター ----------
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
-from ..dependencies import get_db, get_current_user
+from ..dependencies import Principal, get_db, get_current_user
+from ...schemas.common import CursorPage
 from ...schemas.login_history import LoginHistoryOut
+from ...utils.pagination import CursorParams
 from ...crud.login_history import list_logins
 
 router = APIRouter(prefix="/login_history", tags=["LoginHistory"])
 
-@router.get("/", response_model=list[LoginHistoryOut])
+@router.get("/", response_model=CursorPage[LoginHistoryOut])
 async def my_logins(
     db : AsyncSession = Depends(get_db),
-    user: dict       = Depends(get_current_user),
+    user: Principal  = Depends(get_current_user),
+    params: CursorParams = Depends(),
 ):
-    return await list_logins(db, UUID(user["sub"]))
+    return await list_logins(db, user.id, params)
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from uuid import UUID
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
-from app.api import deps
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.crud import crud_notification
+from app.schemas.common import CursorPage
+from app.schemas.notification import Notification, NotificationCreate
+from app.utils import conditional
+from app.utils.pagination import CursorParams
 
-router = APIRouter()
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
-@router.post("/", response_model=schemas.Notification)
-def create_notification(
-    notification_in: schemas.NotificationCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.post("/", response_model=Notification)
+async def create_notification(
+    notification_in: NotificationCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return crud.crud_notification.create_notification(db, user_id=current_user.id, notification=notification_in)
+    return await crud_notification.create_notification(db, user_id=current_user.id, notification=notification_in)
 
-@router.get("/", response_model=list[schemas.Notification])
-def read_notifications(
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.get("/", response_model=CursorPage[Notification], responses={304: {"description": "前回から変更なし"}})
+async def read_notifications(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    params: CursorParams = Depends(),
 ):
-    return crud.crud_notification.get_notifications_by_user(db, user_id=current_user.id)
+    version = await crud_notification.get_notifications_version(db, user_id=current_user.id)
+    validators = conditional.make_validators("notifications", current_user.id, *version, last_modified=version[1])
+    if (cached := conditional.not_modified(request, validators)) is not None:
+        return cached
+    conditional.apply(response, validators)
+    return await crud_notification.get_notifications_by_user(db, user_id=current_user.id, params=params)
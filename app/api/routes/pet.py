@@ -1,42 +1,93 @@
 # app/api/routes/pet.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
 
-from app.api.dependencies import get_db, get_current_user
+from app.api.dependencies import Principal, get_db, get_current_user
 from app.services import pet_service
-from app.schemas.pet import PetCreate, PetRead, PetUpdate
+from app.schemas.common import BulkResult, CursorPage
+from app.models.pet import Pet
+from app.schemas.pet import PetBulkCreate, PetBulkUpdate, PetCreate, PetRead, PetUpdate
+from app.utils import conditional
+from app.utils.pagination import CursorParams
+from app.utils.sparse_fields import FieldSelection, SparseFields
 
 router = APIRouter()
 
-@router.get("/pets/", response_model=list[PetRead])
+# ?fields=（並び順の created_at と id は出力しなくても読み込む）
+PET_FIELDS = SparseFields(PetRead, Pet, always=(Pet.id, Pet.created_at))
+
+@router.get("/pets/", response_model=CursorPage[PetRead], responses={304: {"description": "前回から変更なし"}})
 async def list_my_pets(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    params: CursorParams = Depends(),
+    fields: Optional[FieldSelection] = Depends(PET_FIELDS),
 ):
     """
-    現在ログインしているユーザーに紐づくペット一覧を返す。
+    現在ログインしているユーザーに紐づくペット一覧を返す（新しい順・カーソル方式）。
+    (件数, 最終更新日時) が前回と同じなら一覧を読まずに 304 を返す。
+    fields（例: id,name,species）を指定すると、その列だけを読み込んで返す。
     """
-    return await pet_service.get_pets_by_user(db, UUID(current_user["id"]))
+    count, last_modified = await pet_service.get_pets_version(db, current_user.id)
+    validators = conditional.make_validators(
+        "pets", current_user.id, count, last_modified, fields.names if fields else None, last_modified=last_modified
+    )
+    if (cached := conditional.not_modified(request, validators)) is not None:
+        return cached
+    if fields is None:
+        conditional.apply(response, validators)
+        return await pet_service.get_pets_by_user(db, current_user.id, params)
+    page = await pet_service.get_pets_by_user(db, current_user.id, params, options=fields.options)
+    result = fields.page_response(page)
+    conditional.apply(result, validators)
+    return result
 
 @router.post("/pets/", response_model=PetRead)
 async def add_pet(
     pet: PetCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     ペット情報を新規登録する。
     """
-    return await pet_service.create_pet(db, UUID(current_user["id"]), pet)
+    return await pet_service.create_pet(db, current_user.id, pet)
+
+@router.post("/pets/bulk", response_model=BulkResult)
+async def add_pets_bulk(
+    body: PetBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    ペットを一括登録する（全件を 1 トランザクションで処理し、項目ごとの結果を返す）。
+    id を指定した項目は再送しても二重登録されない。
+    """
+    return await pet_service.bulk_create_pets(db, current_user.id, body.items)
+
+@router.put("/pets/bulk", response_model=BulkResult)
+async def update_pets_bulk(
+    body: PetBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    自分のペットを一括更新する（全件を 1 トランザクションで処理し、項目ごとの結果を返す）。
+    ※ /pets/{pet_id} より前に登録し、"bulk" がパスパラメータとして解釈されないようにする。
+    """
+    return await pet_service.bulk_update_pets(db, current_user.id, body.items)
 
 @router.put("/pets/{pet_id}", response_model=PetRead)
 async def update_pet(
     pet_id: UUID,
     update: PetUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     指定されたペットの情報を更新する。
@@ -50,7 +101,7 @@ async def update_pet(
 async def delete_pet(
     pet_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     指定されたペットを削除する。
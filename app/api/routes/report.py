@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.dependencies import get_db, get_current_user
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.dependencies.api_key_auth import require_scopes
 from app.schemas.report import ReportRequest, ReportResponse
+from app.services.api_key_index import ApiKeyPrincipal
 from app.services.report_generator import generate_custom_report
 
 router = APIRouter()
@@ -12,7 +14,7 @@ router = APIRouter()
 async def generate_report_custom(
     request: ReportRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     ユーザーとペット情報に基づいてレポートを生成。
@@ -25,7 +27,29 @@ async def generate_report_custom(
         breed=request.breed,
         age=request.age,
         email=request.email,
-        user_id=current_user["id"],
+        user_id=current_user.id,
+        pet_id=request.pet_id,
+        use_openai=request.use_openai
+    )
+
+@router.post("/service/reports/custom", response_model=ReportResponse, summary="カスタムレポート生成（サービス間連携）")
+async def service_generate_report_custom(
+    request: ReportRequest,
+    db: AsyncSession = Depends(get_db),
+    principal: ApiKeyPrincipal = Depends(require_scopes("reports"))
+):
+    """
+    連携サービスからのレポート生成。X-API-Key（reports スコープ）で認証し、
+    レポートはキーの所有ユーザーの履歴として記録する。
+    """
+    return await generate_custom_report(
+        db=db,
+        pet_name=request.pet_name,
+        species=request.species,
+        breed=request.breed,
+        age=request.age,
+        email=request.email,
+        user_id=principal.user_id,
         pet_id=request.pet_id,
         use_openai=request.use_openai
     )
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.roles import RoleCreate, RoleRead
+from app.schemas.common import BulkResult
+from app.schemas.roles import RoleCreate, RoleGrantBulk, RoleRead
+from app.crud.roles import assign_roles_bulk
 from app.services.role_service import get_roles, create_role, assign_role
 from app.core.database import get_db
-from app.core.security import has_admin_role
+from app.utils.serialization import json_response
+from app.api.dependencies import has_admin_role
 
 router = APIRouter()
 
@@ -19,7 +22,7 @@ async def list_roles(
     """
     管理者のみ全ロール一覧を取得可能。
     """
-    return await get_roles(db)
+    return json_response(list[RoleRead], await get_roles(db))
 
 @router.post(
     "/roles/",
@@ -54,3 +57,19 @@ async def assign_user_role(
     except Exception:
         raise HTTPException(status_code=400, detail="ロール付与に失敗しました")
     return {"detail": "ロールを割り当てました"}
+
+@router.post(
+    "/roles/assign/bulk",
+    response_model=BulkResult,
+    summary="ロールの一括付与（管理者のみ）"
+)
+async def assign_roles_in_bulk(
+    body: RoleGrantBulk,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(has_admin_role)
+):
+    """
+    複数の (ユーザー, ロール) の組を 1 トランザクションで付与する。
+    付与済みの組は exists、存在しないユーザー・ロールは not_found として項目ごとに返す。
+    """
+    return await assign_roles_bulk(db, body.grants)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.dependencies import get_db, get_current_user
-from app.schemas.survey import SurveyCreate, SurveyRead
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.schemas.survey import SurveyCatalogRead, SurveyCreate, SurveyRead
 from app.crud.surveys import create_survey, get_surveys
+from app.services.survey_catalog import get_survey_catalog
+from app.utils import conditional
 
 router = APIRouter()
 
@@ -10,13 +12,35 @@ router = APIRouter()
 async def create_new_survey(
     survey: SurveyCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    return await create_survey(db=db, survey=survey, user_id=current_user["sub"])
+    return await create_survey(db=db, survey=survey, user_id=current_user.id)
 
 @router.get("/", response_model=list[SurveyRead])
 async def read_surveys(
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    return await get_surveys(db=db, user_id=current_user["sub"])
+    return await get_surveys(db=db, user_id=current_user.id)
+
+@router.get(
+    "/surveys/catalog",
+    response_model=SurveyCatalogRead,
+    responses={304: {"description": "If-None-Match の版から変更なし"}},
+    summary="アンケートカタログ（カテゴリ・設問・選択肢）",
+)
+async def read_survey_catalog(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _: Principal = Depends(get_current_user)
+):
+    """
+    カテゴリ → 設問 → 選択肢の木構造を返す。
+    プロセス内に直列化済みの JSON を保持しており、If-None-Match が現在の版（ETag）と
+    一致する場合は本文なしの 304 を返す。
+    """
+    catalog = await get_survey_catalog().get(db)
+    headers = {"ETag": catalog.etag, "Cache-Control": conditional.CACHE_CONTROL}
+    if conditional.etag_matches(request, catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
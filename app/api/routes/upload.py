@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.utils.validators import validate_upload_file
 from app.services.upload_service import save_file_metadata
-from app.core.security import get_current_user
+from app.api.dependencies import Principal, get_current_user
 
 router = APIRouter()
 
@@ -14,7 +14,7 @@ router = APIRouter()
 async def upload_file(
     file: UploadFile,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     アップロードされたファイルのバリデーションとサニタイジングを実施。
@@ -25,5 +25,5 @@ async def upload_file(
     # ファイル名・MIMEバリデーション
     await validate_upload_file(file, allowed_extensions, allowed_mime_types)
     # ファイル保存＆メタ情報登録
-    file_url = await save_file_metadata(db, file, current_user["id"])
+    file_url = await save_file_metadata(db, file, current_user.id)
     return {"detail": "アップロード成功", "url": file_url}
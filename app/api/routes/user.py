@@ -1,12 +1,15 @@
 # app/api/routes/user.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.schemas.user import UserRead, UserCreate
-from app.schemas.common import PasswordChangeRequest
+from app.models.user import User
+from app.schemas.user import UserRead, UserCreate, UserBulkStatusRequest
+from app.schemas.common import BulkResult, CursorPage, PasswordChangeRequest
 from app.services.user_service import (
     get_user_by_id,
+    get_user_version,
     get_all_users,
     get_inactive_users,
     get_user_by_email,
@@ -14,28 +17,40 @@ from app.services.user_service import (
     update_user,
     deactivate_user,
     restore_user,
+    bulk_set_active,
     change_password,
     force_reset_password,
     search_users_by_criteria
 )
 from app.events.event_handler import log_event
 from app.core.database import get_db
-from app.core.security import get_current_user, has_admin_role
+from app.utils import bulk
+from app.utils.pagination import CursorParams
+from app.utils import conditional
+from app.utils.serialization import json_response, page_response
+from app.utils.sparse_fields import FieldSelection, SparseFields
+from app.api.dependencies import Principal, get_current_user, has_admin_role
 
 router = APIRouter()
 
-@router.get("/users/", response_model=list[UserRead], summary="全アクティブユーザー一覧（管理者）")
+# ?fields=（並び順の created_at と id は出力しなくても読み込む）
+USER_FIELDS = SparseFields(UserRead, User, always=(User.id, User.created_at))
+
+@router.get("/users/", response_model=CursorPage[UserRead], summary="全アクティブユーザー一覧（管理者）")
 async def list_users(
-    limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    params: CursorParams = Depends(),
+    fields: Optional[FieldSelection] = Depends(USER_FIELDS),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(has_admin_role)
 ):
     """
-    アクティブなユーザーをページネーション付きで一覧取得。
+    アクティブなユーザーを新しい順に一覧取得（カーソル方式。続きは next_cursor を cursor に指定）。
     ペット情報（petsリスト）も含まれる場合、スキーマ側で `UserRead` に統合されている想定。
+    fields（例: id,email）を指定すると、その列だけを読み込んで返す。
     """
-    return await get_all_users(db, limit=limit, offset=offset)
+    if fields is not None:
+        return fields.page_response(await get_all_users(db, params, options=fields.options))
+    return page_response(UserRead, await get_all_users(db, params))
 
 @router.get("/users/inactive", response_model=list[UserRead], summary="非アクティブユーザー一覧（管理者）")
 async def list_inactive_users(
@@ -46,22 +61,48 @@ async def list_inactive_users(
     論理削除された（is_active=False）ユーザーを一覧取得。
     管理者のみがアクセス可能。
     """
-    return await get_inactive_users(db)
+    return json_response(list[UserRead], await get_inactive_users(db))
 
-@router.get("/users/me", response_model=UserRead)
+@router.get("/users/me", response_model=UserRead, responses={304: {"description": "前回から変更なし"}})
 async def read_current_user(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     現在ログインしているユーザー自身のプロフィールを取得。
     ユーザーが飼っているペット一覧（pets）も含まれる場合、UserReadで対応。
+    updated_at が前回と同じならプロフィールを読まずに 304 を返す。
     """
-    user = await get_user_by_id(db, current_user["id"])
+    updated_at = await get_user_version(db, current_user.id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    validators = conditional.make_validators("users/me", current_user.id, updated_at, last_modified=updated_at)
+    if (cached := conditional.not_modified(request, validators)) is not None:
+        return cached
+    conditional.apply(response, validators)
+    user = await get_user_by_id(db, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
     return user
 
+@router.get("/users/search", response_model=CursorPage[UserRead])
+async def search_users(
+    query: str = Query(..., max_length=100, description="ユーザー名・表示名・メールアドレスの検索語"),
+    is_active: bool | None = Query(None),
+    params: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(has_admin_role)
+):
+    """
+    ユーザー名・表示名・メールアドレスのあいまい検索（類似度の高い順・カーソル方式）。
+    is_active によりアクティブ／非アクティブのフィルタも可能。
+    ※ /users/{user_id} より前に登録し、"search" がパスパラメータとして解釈されないようにする。
+    """
+    users = await search_users_by_criteria(db, query=query, is_active=is_active, params=params)
+    return page_response(UserRead, users)
+
 @router.get("/users/{user_id}", response_model=UserRead)
 async def read_user(
     user_id: int,
@@ -97,13 +138,13 @@ async def update_my_user(
     user_id: int,
     user_update: UserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     自分自身のユーザー情報を更新。
     他人の情報を更新しようとすると403エラー。
     """
-    if user_id != current_user["id"]:
+    if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="自身以外のユーザー情報は更新できません")
     updated = await update_user(db, user_id, user_update)
     if not updated:
@@ -114,7 +155,7 @@ async def update_my_user(
 async def deactivate_user_route(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(has_admin_role)
 ):
     """
@@ -125,9 +166,36 @@ async def deactivate_user_route(
     success = await deactivate_user(db, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="対象ユーザーが見つかりません")
-    log_event("user_deactivated", current_user["id"], {"target_user_id": user_id})
+    log_event("user_deactivated", current_user.id, {"target_user_id": user_id})
     return {"detail": "ユーザーを無効化しました"}
 
+@router.post("/users/bulk/deactivate", response_model=BulkResult)
+async def deactivate_users_bulk(
+    body: UserBulkStatusRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    _: None = Depends(has_admin_role)
+):
+    """
+    複数ユーザーを一括で論理削除する（1 トランザクション・項目ごとの結果を返す）。
+    """
+    result = await bulk_set_active(db, body.user_ids, is_active=False)
+    for item in result.items:
+        if item.status == bulk.STATUS_UPDATED:
+            log_event("user_deactivated", current_user.id, {"target_user_id": str(item.id)})
+    return result
+
+@router.post("/users/bulk/restore", response_model=BulkResult)
+async def restore_users_bulk(
+    body: UserBulkStatusRequest,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(has_admin_role)
+):
+    """
+    論理削除されたユーザーを一括で復元する（1 トランザクション・項目ごとの結果を返す）。
+    """
+    return await bulk_set_active(db, body.user_ids, is_active=True)
+
 @router.put("/users/{user_id}/restore")
 async def restore_user_route(
     user_id: int,
@@ -146,13 +214,13 @@ async def restore_user_route(
 async def change_my_password(
     request: PasswordChangeRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     現在ログインしているユーザーが、自身のパスワードを変更する。
     古いパスワードが一致しない場合はエラー。
     """
-    success = await change_password(db, current_user["id"], request.old_password, request.new_password)
+    success = await change_password(db, current_user.id, request.old_password, request.new_password)
     if not success:
         raise HTTPException(status_code=400, detail="現在のパスワードが一致しません")
     return {"detail": "パスワードを変更しました"}
@@ -171,20 +239,3 @@ async def reset_user_password(
     if not success:
         raise HTTPException(status_code=404, detail="ユーザーが存在しません")
     return {"detail": "パスワードをリセットしました"}
-
-@router.get("/users/search", response_model=list[UserRead])
-async def search_users(
-    query: str = Query(""),
-    is_active: bool | None = Query(None),
-    limit: int = Query(50),
-    offset: int = Query(0),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(has_admin_role)
-):
-    """
-    ユーザーを名前またはメールアドレスで部分一致検索。
-    is_active によりアクティブ／非アクティブのフィルタも可能。
-    ペット情報も含めて表示されるように、UserReadに組み込まれている想定。
-    """
-    users = await search_users_by_criteria(db, query=query, is_active=is_active, limit=limit, offset=offset)
-    return users
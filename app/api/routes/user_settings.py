@@ -1,26 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
-from app.api import deps
+from app.api.dependencies import Principal, get_db, get_current_user
+from app.crud import crud_user_setting
+from app.schemas.user_setting import UserSetting, UserSettingCreate
+from app.utils import conditional
 
-router = APIRouter()
+router = APIRouter(prefix="/user_settings", tags=["User Settings"])
 
-@router.get("/", response_model=schemas.UserSetting)
-def read_user_setting(
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.get("/", response_model=UserSetting, responses={304: {"description": "前回から変更なし"}})
+async def read_user_setting(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    setting = crud.crud_user_setting.get_user_setting(db, user_id=current_user.id)
+    version = await crud_user_setting.get_user_setting_version(db, user_id=current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="ユーザー設定が見つかりません")
+    validators = conditional.make_validators("user_settings", current_user.id, version)
+    if (cached := conditional.not_modified(request, validators)) is not None:
+        return cached
+    conditional.apply(response, validators)
+    setting = await crud_user_setting.get_user_setting(db, user_id=current_user.id)
     if not setting:
-        raise HTTPException(status_code=404, detail="User setting not found")
+        raise HTTPException(status_code=404, detail="ユーザー設定が見つかりません")
     return setting
 
-@router.put("/", response_model=schemas.UserSetting)
-def update_user_setting(
-    setting_in: schemas.UserSettingCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: schemas.User = Depends(deps.get_current_user),
+@router.put("/", response_model=UserSetting)
+async def update_user_setting(
+    setting_in: UserSettingCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return crud.crud_user_setting.create_user_setting(db, user_id=current_user.id, setting=setting_in)
+    return await crud_user_setting.upsert_user_setting(db, user_id=current_user.id, setting=setting_in)
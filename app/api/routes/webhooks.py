@@ -2,13 +2,10 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
-from uuid import UUID
 
-from app.api.dependencies import get_db, get_current_user
+from app.api.dependencies import Principal, get_db, get_current_user
 from app.crud import crud_webhook
-from app.schemas.webhook import WebhookCreate, WebhookResponse
-from app.models.user import User
+from app.schemas.webhook import Webhook as WebhookResponse, WebhookCreate
 
 router = APIRouter()
 
@@ -19,7 +16,7 @@ router = APIRouter()
 async def register_webhook(
     webhook: WebhookCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     現在ログイン中のユーザーに対してWebhookを1件登録する。
@@ -29,14 +26,14 @@ async def register_webhook(
     return created
 
 # ─────────────────────────────
-# 同期：Webhook一覧取得（ユーザー単位）
+# 非同期：Webhook一覧取得（ユーザー単位）
 # ─────────────────────────────
 @router.get("/webhooks/", response_model=list[WebhookResponse], summary="Webhook一覧取得")
-def read_webhooks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def read_webhooks(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     現在のユーザーが登録済みのWebhook一覧を取得する。
     """
-    return crud_webhook.get_webhooks_by_user(db, user_id=current_user.id)
+    return await crud_webhook.get_webhooks_by_user(db, user_id=current_user.id)
@@ -0,0 +1,144 @@
+# app/background/batch_writer.py
+
+"""
+書き込みをプロセス内でバッファし、まとめて永続化する汎用ライター。
+
+リクエスト処理側は submit() で項目を積むだけ（I/O なし・非ブロッキング）で、
+バックグラウンドタスクが flush_interval 秒ごと、または max_batch 件たまった時点で
+flush 関数（複数行 INSERT など）を 1 回呼び出す。
+バッファが max_pending に達した場合は新しい項目を破棄し、破棄件数を記録する。
+flush 関数が int を返した場合は、その件数を書き込めなかった項目（rejected）として数える。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchWriter(Generic[T]):
+    """
+    上限付きキュー＋定期フラッシュのバッチライター。
+    - flush: 1 バッチ分の項目を受け取り永続化する非同期関数（書き込めなかった件数を返してよい）
+    - max_batch: 1 回のフラッシュで書き込む最大件数
+    - flush_interval: フラッシュ間隔（秒）
+    - max_pending: バッファに保持できる最大件数（超過分は破棄）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[T]], Awaitable[Optional[int]]],
+        *,
+        max_batch: int = 500,
+        flush_interval: float = 0.2,
+        max_pending: int = 50_000,
+    ) -> None:
+        self.name = name
+        self._flush = flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: Deque[T] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rejected = 0
+        self.flushes = 0
+
+    def submit(self, item: T) -> bool:
+        """
+        項目をバッファに積む。バッファが満杯の場合は破棄して False を返す。
+        """
+        if len(self._queue) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("%s: バッファ満杯のため破棄 (dropped=%d)", self.name, self.dropped)
+            return False
+        self._queue.append(item)
+        self.submitted += 1
+        if len(self._queue) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        """
+        バックグラウンドのフラッシュタスクを開始する。
+        """
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name=f"batch-writer:{self.name}")
+
+    async def stop(self) -> None:
+        """
+        フラッシュタスクを停止し、残っている項目をすべて書き出す。
+        """
+        if self._task is not None:
+            # 進行中のフラッシュを中断しないよう、キャンセルではなく停止フラグで終了させる
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        while self._queue:
+            await self.flush_once()
+        if self.dropped or self.failed or self.rejected:
+            logger.warning(
+                "%s: 停止しました（書き込み %d 件、破棄 %d 件、失敗 %d 件、除外 %d 件）",
+                self.name, self.written, self.dropped, self.failed, self.rejected,
+            )
+
+    async def flush_once(self) -> int:
+        """
+        最大 max_batch 件を取り出して書き込む。書き込んだ件数を返す。
+        失敗したバッチはログに残して破棄する（リクエスト処理には影響させない）。
+        """
+        if not self._queue:
+            return 0
+        batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+        try:
+            rejected = await self._flush(batch) or 0
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("%s: %d 件の書き込みに失敗しました", self.name, len(batch))
+            return 0
+        self.flushes += 1
+        self.rejected += rejected
+        self.written += len(batch) - rejected
+        return len(batch) - rejected
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                await self.flush_once()
+                if len(self._queue) < self.max_batch:
+                    break
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        バッファ状況を返す（/admin/metrics 用）。
+        """
+        return {
+            "pending": len(self._queue),
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+        }
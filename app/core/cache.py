@@ -0,0 +1,115 @@
+# app/core/cache.py
+
+"""
+プロセス内キャッシュの共通実装。
+
+件数上限付きの LRU で、エントリごとに有効期限（UNIX 時刻）を持つ。
+JWT の exp のように期限が値ごとに異なるデータと、
+一律 TTL のデータのどちらにも使えるようにしている。
+イベントループのスレッドからのみ操作する前提のためロックは持たない。
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ExpiringLRUCache(Generic[K, V]):
+    """
+    有効期限付き LRU キャッシュ。
+    - maxsize: 保持する最大件数（超過時は最も古く参照されたものから破棄）
+    - ttl: set() で期限を指定しなかった場合の既定の有効秒数
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        値を返す。未登録または期限切れの場合は None（期限切れは同時に削除）。
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        *,
+        expires_at: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        値を登録する。expires_at（UNIX 時刻）か ttl（秒）で期限を指定し、
+        どちらも無い場合はコンストラクタの ttl を使う。
+        """
+        if expires_at is None:
+            lifetime = ttl if ttl is not None else self.ttl
+            if lifetime is None:
+                raise ValueError("有効期限（expires_at または ttl）が必要です")
+            expires_at = time.time() + lifetime
+        if expires_at <= time.time():
+            return
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """
+        エントリを明示的に削除し、削除した値を返す。
+        """
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def items(self) -> List[Tuple[K, V]]:
+        """
+        有効期限内のエントリ一覧を返す（無効化対象の走査用。LRU 順序は変えない）。
+        """
+        now = time.time()
+        return [(key, value) for key, (value, expires_at) in self._data.items() if expires_at > now]
+
+    def clear(self) -> None:
+        """
+        全エントリを削除する（カウンタは保持）。
+        """
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ヒット率などの統計を返す（/admin/metrics 用）。
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Annotated, List, Optional
+from typing import Annotated, Dict, List, Optional
 
 from pydantic import AnyUrl, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -28,8 +28,88 @@ class Settings(BaseSettings):
         "https://appleid.apple.com",
         "https://github.com/login/oauth",
     ]
+    # OIDC 署名鍵（JWKS）キャッシュ設定
+    jwks_refresh_interval: int = Field(3600, description="JWKS 応答に max-age が無い場合の有効秒数")
+    jwks_min_refetch_interval: int = Field(30, description="未知 kid による JWKS 再取得の最小間隔（秒）")
+    jwks_uris: Dict[str, str] = Field(default_factory=dict, description="discovery を使わない issuer の jwks_uri 指定")
+
     secret_key: SecretStr = Field(..., env="SECRET_KEY")  # JWTシークレットキーをSecretStr型で安全に管理
 
+    # 認証済みユーザー識別情報キャッシュ（provider, subject → ユーザー）
+    identity_cache_ttl: int = Field(60, description="識別情報キャッシュの有効秒数（他ワーカーへの反映遅延の上限）")
+    identity_cache_size: int = Field(50_000, description="識別情報キャッシュの最大件数")
+
+    # リバースプロキシ（Front Door）設定
+    trusted_proxy_count: int = Field(1, description="アプリの手前にある信頼済みプロキシの段数（X-Forwarded-For を右から数える。0 で無視）")
+    client_ip_header: Optional[str] = Field(None, description="プロキシが設定するクライアント IP ヘッダー（例: X-Azure-ClientIP）。指定時は X-Forwarded-For より優先")
+
+    # レートリミット（トークンバケット）設定
+    rate_limit_storage_uri: Optional[str] = Field(None, description="全ワーカーで共有する Redis 互換ストア（例: redis://localhost:6379/2）")
+    rate_limit_per_minute: int = Field(100, description="1 分あたりに補充されるトークン数")
+    rate_limit_burst: int = Field(100, description="バケット容量（瞬間的に許容する最大消費量）")
+    rate_limit_route_costs: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "POST /reports": 20,
+            "POST /chat": 10,
+            "POST /service/reports": 20,
+            "POST /service/chat": 10,
+            "POST /token": 5,
+            "POST /upload": 5,
+            "POST /attachments": 5,
+        },
+        description="「メソッド パス接頭辞」ごとの消費トークン数（既定: GET=1, 更新系=2）",
+    )
+
+    # ログイン履歴のバッファ書き込み設定
+    login_history_flush_interval_ms: int = Field(200, description="ログイン履歴をフラッシュする間隔（ミリ秒）")
+    login_history_batch_size: int = Field(500, description="1 回の INSERT でまとめるログイン履歴の最大件数")
+    login_history_max_pending: int = Field(50_000, description="バッファに保持するログイン履歴の上限（超過分は破棄）")
+
+    # イベントログ（log_event）のバッファ書き込み設定
+    event_log_flush_interval_ms: int = Field(500, description="イベントログをフラッシュする間隔（ミリ秒）")
+    event_log_batch_size: int = Field(500, description="1 回の INSERT でまとめるイベントの最大件数")
+    event_log_max_pending: int = Field(20_000, description="バッファに保持するイベントの上限（超過分は破棄）")
+
+    # API キー認証（X-API-Key）のキャッシュと利用時刻の書き込み設定
+    api_key_cache_ttl: int = Field(300, description="有効な API キーをキャッシュする秒数")
+    api_key_negative_cache_ttl: int = Field(30, description="存在しない API キーを「該当なし」としてキャッシュする秒数")
+    api_key_cache_size: int = Field(10_000, description="API キーキャッシュの最大件数")
+    api_key_last_used_flush_interval: int = Field(30, description="last_used_at をまとめて書き込む間隔（秒）")
+
+    # 管理者向けユーザー検索（pg_trgm）
+    user_search_min_length: int = Field(3, ge=1, description="検索語の最小文字数（トライグラムは 3 文字未満ではインデックスが効かない）")
+
+    # 管理ダッシュボード KPI（kpi_counters）
+    kpi_cache_ttl: float = Field(10.0, description="/admin/stats の集計値をプロセス内にキャッシュする秒数")
+    kpi_reconcile_interval: int = Field(3600, description="集計値を実数と突き合わせる間隔（秒）")
+
+    # アンケートカタログ（カテゴリ・設問・選択肢）
+    survey_catalog_max_age: int = Field(300, description="他プロセスでの更新を取り込むため、カタログを読み直して版を確認する間隔（秒）")
+
+    # 管理者向けエクスポート（/admin/export）
+    export_yield_per: int = Field(2000, ge=1, description="サーバーサイドカーソルから 1 回に取り出して送る行数")
+
+    # パスワードハッシュ（bcrypt）実行プール設定
+    password_hash_workers: int = Field(4, description="bcrypt を実行するスレッド数")
+    password_hash_max_queue: int = Field(32, description="実行待ちで保持する要求数の上限（超過時は 503）")
+    bcrypt_rounds: int = Field(12, ge=4, le=31, description="bcrypt のコスト（python -m app.core.password_policy で計測して決める）")
+    bcrypt_target_ms: int = Field(250, description="キャリブレーション時に目標とする 1 回あたりのハッシュ時間（ミリ秒）")
+
+    # データベース接続プール設定（ワーカーあたり 1 プール）
+    db_pool_size: int = Field(10, description="プールに常駐させる接続数")
+    db_max_overflow: int = Field(10, description="db_pool_size を超えて一時的に確立できる接続数")
+    db_pool_timeout: float = Field(10.0, description="接続の空き待ちの上限秒数（超過時はエラー）")
+    db_pool_recycle: int = Field(1800, description="接続を作り直すまでの秒数（LB・サーバー側のアイドル切断対策）")
+    db_pool_pre_ping: bool = Field(True, description="貸し出し前に接続の生存確認を行う")
+    db_pool_prefill: int = Field(5, description="起動時に事前確立する接続数（db_pool_size が上限）")
+
+    # 読み取りレプリカ（未設定ならすべてプライマリ）
+    postgres_replica_uris: List[str] = Field(default_factory=list, description="読み取りレプリカの接続文字列（GET / HEAD のリクエストを振り分ける）")
+    db_replica_max_lag_seconds: float = Field(5.0, description="この秒数以上遅れているレプリカには振り分けない")
+    db_replica_check_interval: float = Field(10.0, description="レプリカの死活・遅延を確認する間隔（秒）")
+    db_replica_check_timeout: float = Field(2.0, description="死活確認 1 回の待ち時間の上限（秒）")
+    db_read_your_writes_seconds: float = Field(5.0, description="書き込み後、同じクライアントの読み取りをプライマリに固定する秒数")
+
     # 接続文字列（環境変数から読み込む）
     postgres_uri: Annotated[AnyUrl, Field(..., env="POSTGRES_URI")]
     cosmos_uri: Annotated[AnyUrl, Field(..., env="COSMOS_URI")]
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Any, AsyncGenerator, Dict
 
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase, declared_attr
-from sqlalchemy import MetaData
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from fastapi import Request, Response
+from sqlalchemy import MetaData, text
 
-from app.core.config import get_settings
+from app.core import metrics
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # 命名規約の定義
 NAMING_CONVENTION: dict[str, str] = {
@@ -31,6 +41,10 @@ class Base(DeclarativeBase):
     """全モデルが継承する基底クラス"""
     metadata = metadata_obj
 
+    # INSERT / UPDATE の flush 時に、サーバー側で決まる値（server_default など）を
+    # RETURNING で同じ文から取得する（commit 後の refresh による再 SELECT を不要にする）
+    __mapper_args__ = {"eager_defaults": True}
+
     # __tablename__ を自動生成 (CamelCase → snake_case)
     @declared_attr.directive
     def __tablename__(cls) -> str:  # type: ignore
@@ -43,15 +57,100 @@ class Base(DeclarativeBase):
             snake.append(c.lower())
         return "".join(snake)
 
-# データベース接続URLを設定
-DATABASE_URL = settings.DATABASE_URL
+# ------------------------------------------------------------------
+# 接続プール
+# アプリ内のエンジンはここで作る 1 つのみ（ワーカーあたりプールは 1 つ）。
+# Azure Database for PostgreSQL の max_connections を超えないよう、
+# (db_pool_size + db_max_overflow) × ワーカー数 × インスタンス数 で見積もる。
+# ------------------------------------------------------------------
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    接続の取得待ち時間とタイムアウト回数を記録する QueuePool。
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_ms = metrics.Histogram()
+        self.timeouts = 0
 
-# 非同期エンジンの作成
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,  # SQLAlchemyのログ出力を無効化（必要に応じてTrueに設定）
-    future=True,  # SQLAlchemy 2.0スタイルの使用を有効化
-)
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        プールの現在値を返す（/admin/metrics 用）。
+        """
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "timeouts": self.timeouts,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+
+def make_async_url(uri: Any) -> str:
+    """
+    postgresql:// 形式の接続文字列を asyncpg ドライバー指定に揃える。
+    """
+    url = make_url(str(uri))
+    if url.drivername in ("postgres", "postgresql"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def create_engine_from_settings(cfg: Settings, uri: Any = None, *, read_only: bool = False) -> AsyncEngine:
+    """
+    設定値のプールパラメータで非同期エンジンを作成する。
+    - uri: 接続先（省略時は postgres_uri。読み取りレプリカ用に指定する）
+    - read_only: セッションを既定で読み取り専用トランザクションにする（誤って書き込むとエラー）
+    """
+    connect_args: Dict[str, Any] = {}
+    if read_only:
+        connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+    return create_async_engine(
+        make_async_url(uri or cfg.postgres_uri),
+        echo=False,  # SQLAlchemyのログ出力を無効化（必要に応じてTrueに設定）
+        poolclass=InstrumentedQueuePool,
+        pool_size=cfg.db_pool_size,
+        max_overflow=cfg.db_max_overflow,
+        pool_recycle=cfg.db_pool_recycle,
+        pool_pre_ping=cfg.db_pool_pre_ping,
+        pool_timeout=cfg.db_pool_timeout,
+        connect_args=connect_args,
+    )
+
+
+async def prefill_pool(target: AsyncEngine, count: int) -> int:
+    """
+    起動時に count 本の接続を確立してプールへ戻す（初回リクエストの接続確立待ちを無くす）。
+    確立できた本数を返す。
+    """
+    opened = 0
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            try:
+                conn = await stack.enter_async_context(target.connect())
+                await conn.execute(text("SELECT 1"))
+            except Exception as exc:
+                logger.warning("接続プールの事前確立に失敗: %s", exc)
+                break
+            opened += 1
+    return opened
+
+
+# 非同期エンジンの作成（アプリ全体で共有）
+engine = create_engine_from_settings(settings)
+metrics.register("db_pool", lambda: engine.pool.stats())
 
 # 非同期セッションメーカーの作成
 async_session = async_sessionmaker(
@@ -61,12 +160,14 @@ async_session = async_sessionmaker(
 )
 
 # データベースセッションを取得するための依存関数
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request = None, response: Response = None) -> AsyncGenerator[AsyncSession, None]:
     """
     非同期データベースセッションを生成し、リクエストのライフサイクルに合わせて管理します。
+    読み取りレプリカが設定されている場合、GET / HEAD はレプリカに振り分けます
+    （直前に書き込んだクライアントはプライマリに固定。app.core.read_replicas 参照）。
     """
-    async with async_session() as session:
-        yield session
-
-
+    from app.core.read_replicas import get_replica_router  # 循環 import 回避のため遅延 import
 
+    bind = get_replica_router().route(request, response)
+    async with async_session(bind=bind) as session:
+        yield session
@@ -0,0 +1,277 @@
+# app/core/jwks.py
+
+"""
+外部 ID プロバイダー（OIDC）の署名鍵（JWKS）を管理するレジストリ。
+
+* Settings.jwt_issuers の各 issuer について JWKS を 1 度だけ取得し、kid ごとに解析済みの鍵を保持
+* 有効期限（Cache-Control: max-age または jwks_refresh_interval）の手前でバックグラウンド更新
+* 未知の kid を受け取った場合のみ再取得する（同一 issuer への同時再取得は 1 本にまとめる）
+
+定常状態ではトークン検証がネットワーク I/O を待つことはない。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# JWK に alg が無い場合に使う既定アルゴリズム
+_DEFAULT_ALGORITHMS = {"RSA": "RS256", "EC": "ES256"}
+
+# 検証を許可する署名アルゴリズム（HS 系は共有鍵のため外部 issuer では受け付けない）
+ALLOWED_ALGORITHMS = ["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"]
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def normalize_issuer(iss: str) -> str:
+    """
+    issuer 文字列を比較用に正規化する（AnyUrl が付与する末尾スラッシュを除去）。
+    """
+    return str(iss).rstrip("/")
+
+
+@dataclass
+class IssuerKeys:
+    """
+    1 つの issuer について取得済みの鍵と更新状態を保持する。
+    """
+    issuer: str
+    jwks_uri: Optional[str] = None
+    keys: Dict[str, Key] = field(default_factory=dict)
+    expires_at: float = 0.0        # 取得済み JWKS の有効期限（max-age による）
+    refresh_at: float = 0.0        # 次回バックグラウンド更新の時刻
+    last_fetch_at: float = 0.0     # 最後に取得を試みた時刻（未知 kid による再取得の間引き用）
+    inflight: Optional[asyncio.Task] = None
+
+
+class IssuerRegistry:
+    """
+    issuer → JWKS のレジストリ。
+    - refresh_interval: JWKS 応答に max-age が無い場合の有効秒数
+    - refresh_margin: 有効期限の何秒前にバックグラウンド更新するか（max-age が短い場合はその半分まで縮める）
+    - min_refetch_interval: 未知 kid による再取得の最小間隔（ランダム kid による負荷を防ぐ）
+    """
+
+    def __init__(
+        self,
+        issuers: Iterable[str],
+        *,
+        refresh_interval: float = 3600,
+        refresh_margin: float = 300,
+        min_refetch_interval: float = 30,
+        http_timeout: float = 5.0,
+        jwks_uris: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.refresh_interval = refresh_interval
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self._http_timeout = http_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresher: Optional[asyncio.Task] = None
+        uris = {normalize_issuer(k): v for k, v in (jwks_uris or {}).items()}
+        self._issuers: Dict[str, IssuerKeys] = {
+            normalize_issuer(iss): IssuerKeys(issuer=normalize_issuer(iss), jwks_uri=uris.get(normalize_issuer(iss)))
+            for iss in issuers
+        }
+
+    # ------------------------------------------
+    # ライフサイクル
+    # ------------------------------------------
+    async def start(self) -> None:
+        """
+        全 issuer の JWKS を並列に初回取得し、バックグラウンド更新を開始する。
+        取得に失敗した issuer は警告のみ（後続のリクエストや更新で再試行）。
+        """
+        await asyncio.gather(*(self._refresh(entry) for entry in self._issuers.values()), return_exceptions=True)
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """
+        バックグラウンド更新を停止し、HTTP クライアントを閉じる。
+        """
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------------------------------------
+    # 鍵の取得・トークン検証
+    # ------------------------------------------
+    def is_registered(self, iss: str) -> bool:
+        return normalize_issuer(iss) in self._issuers
+
+    async def get_key(self, iss: str, kid: Optional[str]) -> Key:
+        """
+        issuer と kid に対応する検証鍵を返す。
+        キャッシュに無い kid の場合のみ JWKS を再取得する。
+        """
+        entry = self._issuers.get(normalize_issuer(iss))
+        if entry is None:
+            raise JWTError(f"未登録の issuer です: {iss}")
+
+        key = self._lookup(entry, kid)
+        if key is not None:
+            return key
+
+        # 未知の kid: 鍵のローテーション直後の可能性があるため再取得（間引きあり）
+        if time.time() - entry.last_fetch_at >= self.min_refetch_interval or entry.inflight is not None:
+            try:
+                await self._refresh(entry)
+            except Exception as exc:
+                logger.warning("JWKS 再取得失敗: %s (%s)", entry.issuer, exc)
+            key = self._lookup(entry, kid)
+            if key is not None:
+                return key
+        raise JWTError(f"署名鍵が見つかりません: iss={iss} kid={kid}")
+
+    async def verify(self, token: str, *, audience: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ID トークンの署名・issuer・audience・有効期限を検証し、クレームを返す。
+        """
+        header = jwt.get_unverified_header(token)
+        iss = jwt.get_unverified_claims(token).get("iss")
+        if not iss:
+            raise JWTError("iss がありません")
+        if header.get("alg") not in ALLOWED_ALGORITHMS:
+            raise JWTError(f"許可されていない署名アルゴリズムです: {header.get('alg')}")
+
+        key = await self.get_key(iss, header.get("kid"))
+        return jwt.decode(
+            token,
+            key,
+            algorithms=ALLOWED_ALGORITHMS,
+            audience=audience,
+            issuer=iss,
+            options={"verify_aud": audience is not None},
+        )
+
+    @staticmethod
+    def _lookup(entry: IssuerKeys, kid: Optional[str]) -> Optional[Key]:
+        if kid is not None:
+            return entry.keys.get(kid)
+        # kid を持たないトークンは鍵が 1 本だけの issuer に限り受け付ける
+        if len(entry.keys) == 1:
+            return next(iter(entry.keys.values()))
+        return None
+
+    # ------------------------------------------
+    # 取得処理
+    # ------------------------------------------
+    async def _refresh(self, entry: IssuerKeys) -> None:
+        """
+        JWKS を取得して鍵を差し替える。
+        同一 issuer の取得が進行中であれば、新たに取得せずその完了を待つ（single-flight）。
+        """
+        if entry.inflight is None:
+            entry.inflight = asyncio.create_task(self._fetch(entry))
+            entry.inflight.add_done_callback(lambda _: setattr(entry, "inflight", None))
+        await asyncio.shield(entry.inflight)
+
+    async def _fetch(self, entry: IssuerKeys) -> None:
+        entry.last_fetch_at = time.time()
+        client = self._get_client()
+
+        if entry.jwks_uri is None:
+            discovery = await client.get(f"{entry.issuer}/.well-known/openid-configuration")
+            discovery.raise_for_status()
+            entry.jwks_uri = discovery.json()["jwks_uri"]
+
+        response = await client.get(entry.jwks_uri)
+        response.raise_for_status()
+        keys = self._parse_keys(response.json().get("keys", []))
+        if not keys:
+            raise ValueError("JWKS に利用可能な鍵がありません")
+
+        entry.keys = keys
+        ttl = self._max_age(response.headers.get("cache-control"))
+        now = time.time()
+        entry.expires_at = now + ttl
+        # max-age が refresh_margin より短いと取得直後から更新対象になり続けるため、余裕は TTL の半分までにする
+        entry.refresh_at = entry.expires_at - min(self.refresh_margin, ttl / 2)
+        logger.info("JWKS 取得: %s (%d keys)", entry.issuer, len(keys))
+
+    @staticmethod
+    def _parse_keys(raw_keys: List[Dict[str, Any]]) -> Dict[str, Key]:
+        """
+        JWK 配列を kid → 解析済み鍵 に変換する。署名用途以外や解析できない鍵は除外。
+        """
+        parsed: Dict[str, Key] = {}
+        for data in raw_keys:
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            algorithm = data.get("alg") or _DEFAULT_ALGORITHMS.get(data.get("kty", ""))
+            if algorithm not in ALLOWED_ALGORITHMS:
+                continue
+            try:
+                parsed[data["kid"]] = jwk.construct(data, algorithm)
+            except Exception as exc:
+                logger.warning("JWK 解析失敗: kid=%s (%s)", data.get("kid"), exc)
+        return parsed
+
+    def _max_age(self, cache_control: Optional[str]) -> float:
+        match = _MAX_AGE.search(cache_control or "")
+        return float(match.group(1)) if match else self.refresh_interval
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._http_timeout, follow_redirects=True)
+        return self._client
+
+    async def _refresh_loop(self) -> None:
+        """
+        更新時刻（refresh_at）を過ぎた issuer を順次更新する。
+        取得に失敗した issuer は既存の鍵を保持したまま、min_refetch_interval 秒待って再試行する。
+        """
+        while True:
+            now = time.time()
+            due = [e for e in self._issuers.values() if e.refresh_at <= now]
+            for entry in due:
+                try:
+                    await self._refresh(entry)
+                except Exception as exc:
+                    logger.warning("JWKS バックグラウンド更新失敗: %s (%s)", entry.issuer, exc)
+                    entry.refresh_at = now + self.min_refetch_interval
+            await asyncio.sleep(self._next_delay(time.time()))
+
+    def _next_delay(self, now: float) -> float:
+        """
+        次に更新対象になる issuer までの待ち秒数。max-age: 0 などで常に更新対象でも、
+        min_refetch_interval（最低 1 秒）より短い間隔では再取得しない。
+        """
+        next_due = min((e.refresh_at for e in self._issuers.values()), default=now + self.refresh_interval)
+        return max(next_due - now, self.min_refetch_interval, 1.0)
+
+
+@lru_cache()
+def get_issuer_registry() -> IssuerRegistry:
+    """
+    Settings.jwt_issuers から構築したプロセス共有のレジストリを返す。
+    """
+    settings = get_settings()
+    return IssuerRegistry(
+        [str(iss) for iss in settings.jwt_issuers],
+        refresh_interval=settings.jwks_refresh_interval,
+        min_refetch_interval=settings.jwks_min_refetch_interval,
+        jwks_uris=settings.jwks_uris,
+    )
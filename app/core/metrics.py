@@ -0,0 +1,94 @@
+# app/core/metrics.py
+
+"""
+プロセス内メトリクスの簡易レジストリ。
+
+各サブシステム（パスワードハッシュ実行プールなど）が統計取得関数を登録し、
+管理者向けエンドポイント `/admin/metrics` からまとめて参照できるようにする。
+値はワーカープロセス単位である点に注意。
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from typing import Any, Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# レイテンシ用の既定バケット上限（ミリ秒）
+DEFAULT_LATENCY_BUCKETS_MS: Sequence[float] = (1, 5, 10, 25, 50, 100, 150, 200, 300, 500, 1000, 2500)
+
+# 名前 → 統計取得関数
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """
+    統計取得関数を登録する。同名で再登録した場合は上書きする。
+    """
+    _collectors[name] = collector
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    """
+    登録済みの全サブシステムの統計をまとめて返す。
+    取得に失敗したサブシステムは error として返し、他の統計は返却を続ける。
+    """
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    for name, collector in _collectors.items():
+        try:
+            snapshot[name] = collector()
+        except Exception as exc:  # pragma: no cover
+            logger.warning("メトリクス取得失敗: %s (%s)", name, exc)
+            snapshot[name] = {"error": str(exc)}
+    return snapshot
+
+
+class Histogram:
+    """
+    固定バケットの累積ヒストグラム（Prometheus の histogram と同じ le 表記）。
+    イベントループのスレッドから observe() する前提のためロックは持たない。
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS) -> None:
+        self.buckets: List[float] = sorted(buckets)
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)  # 末尾は +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """
+        バケット上限から分位点を概算する（+Inf に入った場合は最大バケット上限を返す）。
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for upper, n in zip(self.buckets, self._counts):
+            cumulative += n
+            if cumulative >= rank:
+                return upper
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for upper, n in zip(self.buckets, self._counts):
+            cumulative += n
+            buckets[f"le_{upper:g}"] = cumulative
+        buckets["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
@@ -0,0 +1,106 @@
+# app/core/password_policy.py
+
+"""
+アプリ全体で共有するパスワードハッシュ方針（bcrypt のコスト）。
+
+コストは設定値 bcrypt_rounds で決まり、実行環境のハードウェアで計測して選ぶ。
+以下のコマンドで各コストの所要時間を計測し、目標時間に収まる最大コストを表示する。
+
+    python -m app.core.password_policy --target-ms 250
+
+コストを上げた場合、既存ハッシュは次回ログイン成功時に新しいコストで再ハッシュされる
+（passlib の needs_update による判定）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from functools import lru_cache
+from statistics import median
+from typing import Dict, Tuple
+
+from passlib.context import CryptContext
+
+# 計測するコストの範囲（10 未満は推奨されない・16 超は 1 回数秒かかる）
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def build_context(rounds: int) -> CryptContext:
+    """
+    指定コストの bcrypt CryptContext を作る。
+    コストが異なる既存ハッシュは needs_update() で更新対象と判定される。
+    """
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+@lru_cache()
+def get_password_context() -> CryptContext:
+    """
+    設定値のコストで作った共有 CryptContext を返す。
+    """
+    from app.core.config import get_settings
+
+    return build_context(get_settings().bcrypt_rounds)
+
+
+def measure(rounds: int, samples: int = 3) -> float:
+    """
+    指定コストでのハッシュ 1 回あたりの所要時間（ミリ秒・中央値）を計測する。
+    """
+    context = build_context(rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return median(timings)
+
+
+def calibrate(
+    target_ms: float,
+    min_rounds: int = MIN_ROUNDS,
+    max_rounds: int = MAX_ROUNDS,
+    samples: int = 3,
+) -> Tuple[int, Dict[int, float]]:
+    """
+    目標時間に収まる最大コストを求める。戻り値は (推奨コスト, {コスト: 計測ミリ秒})。
+    コストが 1 増えると時間はほぼ倍になるため、目標を超えた時点で計測を打ち切る。
+    最小コストでも目標を超える場合は最小コストを推奨する。
+    """
+    # バックエンドの初回ロード時間が計測に混ざらないよう 1 回空打ちする
+    build_context(min_rounds).hash("warm-up")
+    timings: Dict[int, float] = {}
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure(rounds, samples)
+        if timings[rounds] > target_ms:
+            break
+        best = rounds
+    return best, timings
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="bcrypt のコストを実行環境で計測し、推奨値を表示します")
+    parser.add_argument("--target-ms", type=float, default=None, help="1 回あたりの目標ハッシュ時間（既定: 設定値 bcrypt_target_ms）")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    target_ms = args.target_ms
+    if target_ms is None:
+        from app.core.config import get_settings
+
+        target_ms = get_settings().bcrypt_target_ms
+
+    best, timings = calibrate(target_ms, args.min_rounds, args.max_rounds, args.samples)
+    for rounds, elapsed in timings.items():
+        marker = " <= 推奨" if rounds == best else ""
+        print(f"rounds={rounds:2d}  {elapsed:8.1f} ms{marker}")
+    print(f"\n推奨設定: bcrypt_rounds={best}  (目標 {target_ms:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# app/core/principal.py
+
+"""
+認証済みの呼び出し元（Principal）を解決する共通レイヤー。
+
+Authorization: Bearer のトークンを 1 リクエストにつき 1 回だけ検証し、
+結果を request.state.principal に保持する。同じリクエスト内で
+get_current_user / has_admin_role などを複数回 Depends しても再検証は発生しない。
+
+* アプリ発行のアクセストークン（/token）: 署名検証のみ（トークンキャッシュ経由・DB アクセスなし）
+* 外部 IdP の ID トークン（Settings.jwt_issuers）: JWKS で検証し、識別情報キャッシュでユーザーを解決
+
+Principal 自体が持つのは ID と管理者フラグのみ。User の行が必要なルートだけが
+load_user() / get_current_db_user で遅延ロードする（同一リクエスト内では 1 回のみ）。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.jwks import get_issuer_registry
+from app.core.security import decode_access_token, oauth2_scheme
+from app.models.user import User
+from app.services.identity_cache import get_identity_cache
+
+logger = logging.getLogger(__name__)
+
+# トークンの種類（Principal.source）
+SOURCE_ACCESS_TOKEN = "access_token"
+SOURCE_ID_TOKEN = "id_token"
+
+
+@dataclass
+class Principal:
+    """
+    認証済みの呼び出し元。リクエスト単位で生成され、request.state に保持される。
+    """
+    id: UUID
+    is_admin: bool = False
+    source: str = SOURCE_ACCESS_TOKEN
+    _user: Optional[User] = field(default=None, init=False, repr=False)
+    _user_loaded: bool = field(default=False, init=False, repr=False)
+
+    async def load_user(self, db: AsyncSession) -> Optional[User]:
+        """
+        アクティブな User を読み込んで返す（存在しなければ None）。
+        初回呼び出し時のみクエリを発行し、以降は同じオブジェクトを返す。
+        """
+        if not self._user_loaded:
+            result = await db.execute(select(User).where(User.id == self.id, User.is_active == True))
+            self._user = result.scalar_one_or_none()
+            self._user_loaded = True
+        return self._user
+
+
+def _unauthorized(detail: str = "認証トークンが不正です。") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def extract_provider_from_iss(iss: str) -> str:
+    """
+    issuer(iss)の値を元に認証プロバイダー名を返す。
+    必要に応じてパターンを追加。
+    """
+    if "login.microsoftonline.com" in iss:
+        return "azure_b2c"
+    if "accounts.google.com" in iss:
+        return "google"
+    if "github.com" in iss:
+        return "github"
+    # 追加プロバイダーにも柔軟に対応
+    return "unknown"
+
+
+async def _resolve_id_token(token: str, iss: str, db: AsyncSession) -> Principal:
+    """
+    外部 IdP の ID トークンを検証し、(provider, sub) からユーザーを解決する。
+    """
+    try:
+        payload = await get_issuer_registry().verify(token, audience=get_settings().jwt_audience)
+        sub = payload.get("sub")
+        if not sub:
+            raise JWTError("sub がありません")
+    except JWTError as exc:
+        logger.warning("IDトークン検証失敗: %s", exc)
+        raise _unauthorized()
+
+    identity = await get_identity_cache().resolve(db, extract_provider_from_iss(iss), sub)
+    if not identity or not identity.is_active:
+        raise _unauthorized("ユーザーが存在しないか無効化されています")
+    return Principal(id=identity.id, is_admin=identity.is_admin, source=SOURCE_ID_TOKEN)
+
+
+async def get_principal(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Bearer トークンを検証して Principal を返す（全ルート共通の認証依存関数）。
+    - 同一リクエストでは request.state.principal を返し、再検証しない
+    - アプリ発行トークンは DB にアクセスしない（db セッションは接続を取得しない）
+    """
+    principal: Optional[Principal] = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    try:
+        token_user = decode_access_token(token)
+        principal = Principal(id=UUID(token_user.id), is_admin=token_user.is_admin)
+    except (JWTError, ValueError):
+        # アプリの鍵で検証できない場合のみ、登録済み issuer の ID トークンとして扱う
+        try:
+            iss = jwt.get_unverified_claims(token).get("iss")
+        except JWTError:
+            iss = None
+        if not iss or not get_issuer_registry().is_registered(iss):
+            logger.warning("トークン検証失敗")
+            raise _unauthorized()
+        principal = await _resolve_id_token(token, iss, db)
+
+    request.state.principal = principal
+    return principal
+
+
+async def get_current_db_user(
+    principal: Principal = Depends(get_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    User の行が必要なルート向け。Principal から遅延ロードし、無効化済みなら 401。
+    """
+    user = await principal.load_user(db)
+    if user is None:
+        raise _unauthorized("ユーザーが存在しないか無効化されています")
+    return user
+
+
+def require_admin(principal: Principal = Depends(get_principal)) -> None:
+    """
+    管理者のみアクセスを許可する。
+    """
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="この操作を行う権限がありません（管理者専用）"
+        )
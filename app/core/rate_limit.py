@@ -0,0 +1,228 @@
+# app/core/rate_limit.py
+
+"""
+トークンバケット方式のレートリミッター（ASGI ミドルウェア）。
+
+* キーは認証済みユーザーID（アプリ発行の JWT）、無ければクライアント IP（app.utils.request_meta.get_client_ip）。
+  IP は client_ip_header、X-Forwarded-For を右から trusted_proxy_count 段数えた値、接続元 IP の順で決定する
+  （クライアントが書き換えられる X-Forwarded-For の左側は使わない）
+* ルートごとにコスト（消費トークン数）を設定でき、レポート生成などの重い処理ほど多く消費する
+* バケットの状態は Redis 互換ストア（rate_limit_storage_uri）に置き、同一ホストの全ワーカーで共有する
+  未設定時はプロセス内メモリで動作する（ワーカーごとの制限になる）
+* 制限超過時は 429 と Retry-After ヘッダーを返す
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from typing import Dict, Optional, Protocol, Tuple
+
+from jose import JWTError
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.core.security import decode_access_token
+from app.utils.request_meta import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+# 参照系は 1、更新系は 2 を既定コストとする（ルート別設定が優先）
+DEFAULT_METHOD_COSTS = {"GET": 1, "HEAD": 1, "OPTIONS": 0}
+DEFAULT_WRITE_COST = 2
+
+
+class BucketBackend(Protocol):
+    async def take(self, key: str, cost: int, rate: float, capacity: int) -> Tuple[bool, float]:
+        """
+        cost 分のトークンを消費する。戻り値は (許可したか, 再試行までの秒数)。
+        """
+        ...
+
+
+class MemoryBucketBackend:
+    """
+    プロセス内メモリのバケット（単一ワーカー用・Redis 障害時のフォールバック）。
+    満タンまで回復したバケットは不要なため、回復時間を TTL として破棄する。
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        self._buckets: ExpiringLRUCache[str, Tuple[float, float]] = ExpiringLRUCache(maxsize=maxsize)
+
+    async def take(self, key: str, cost: int, rate: float, capacity: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key) or (float(capacity), now)
+        tokens = min(float(capacity), tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets.set(key, (tokens, now), ttl=capacity / rate + 1)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+# Redis 側で原子的に補充・消費するスクリプト（時刻は Redis の TIME を使いワーカー間のずれを排除）
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBucketBackend:
+    """
+    Redis 互換ストア上のバケット。同一ストアを参照する全ワーカー・全プロセスで状態を共有する。
+    ストアに接続できない場合は可用性を優先し、プロセス内メモリで判定を続ける。
+    """
+
+    def __init__(self, uri: str, prefix: str = "rl:") -> None:
+        from redis.asyncio import Redis  # 任意依存のため遅延 import
+
+        self._redis = Redis.from_url(uri, socket_timeout=0.05, socket_connect_timeout=0.1)
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+        self._fallback = MemoryBucketBackend()
+        self.errors = 0
+
+    async def take(self, key: str, cost: int, rate: float, capacity: int) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._script(keys=[self._prefix + key], args=[rate, capacity, cost])
+            return bool(int(allowed)), float(retry_after)
+        except Exception as exc:
+            self.errors += 1
+            if self.errors == 1 or self.errors % 1000 == 0:
+                logger.warning("レートリミットストアに接続できません（メモリで継続）: %s", exc)
+            return await self._fallback.take(key, cost, rate, capacity)
+
+
+class RateLimitMiddleware:
+    """
+    トークンバケットで流量を制限する ASGI ミドルウェア。
+    - per_minute: 1 分あたりに補充されるトークン数
+    - burst: バケット容量（瞬間的に許容する最大消費量）
+    - route_costs: {"POST /reports": 10} 形式のルート別コスト（パスは前方一致、最長一致を優先）
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        backend: BucketBackend,
+        per_minute: int,
+        burst: int,
+        route_costs: Optional[Dict[str, int]] = None,
+        exempt_paths: Tuple[str, ...] = ("/docs", "/openapi.json"),
+    ) -> None:
+        self.app = app
+        self.backend = backend
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.exempt_paths = exempt_paths
+        # 最長一致を優先するためパスの長い順に並べる
+        self._route_costs = sorted(
+            ((rule.split(" ", 1)[0].upper(), rule.split(" ", 1)[1], cost) for rule, cost in (route_costs or {}).items()),
+            key=lambda item: len(item[1]),
+            reverse=True,
+        )
+        self.allowed = 0
+        self.throttled = 0
+        metrics.register("rate_limit", self.stats)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        cost = min(self.cost_for(scope["method"], scope["path"]), self.capacity)
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.key_for(HTTPConnection(scope))
+        allowed, retry_after = await self.backend.take(key, cost, self.rate, self.capacity)
+        if allowed:
+            self.allowed += 1
+            await self.app(scope, receive, send)
+            return
+
+        self.throttled += 1
+        await self._reject(send, retry_after)
+
+    def cost_for(self, method: str, path: str) -> int:
+        """
+        ルート別コストを返す。該当ルールが無ければメソッド別の既定値。
+        """
+        for rule_method, prefix, cost in self._route_costs:
+            if rule_method == method and path.startswith(prefix):
+                return cost
+        return DEFAULT_METHOD_COSTS.get(method, DEFAULT_WRITE_COST)
+
+    @staticmethod
+    def key_for(conn: HTTPConnection) -> str:
+        """
+        バケットのキーを決める。アプリ発行の JWT が有効ならユーザーID、無ければクライアント IP。
+        （デコード結果はトークンキャッシュに載るため、後段の認証で再デコードは発生しない）
+        """
+        authorization = conn.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                return f"user:{decode_access_token(token).id}"
+            except JWTError:
+                pass
+        return f"ip:{get_client_ip(conn)}"
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: float) -> None:
+        body = json.dumps(
+            {"detail": "リクエストが多すぎます。しばらくしてから再試行してください。"},
+            ensure_ascii=False,
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+            "backend_errors": getattr(self.backend, "errors", 0),
+        }
+
+
+def create_bucket_backend(storage_uri: Optional[str]) -> BucketBackend:
+    """
+    設定に応じてバケットのストアを選ぶ。URI 未設定ならプロセス内メモリ。
+    """
+    if storage_uri:
+        return RedisBucketBackend(storage_uri)
+    logger.info("レートリミットはプロセス内メモリで動作します（ワーカー間で共有されません）")
+    return MemoryBucketBackend()
@@ -0,0 +1,268 @@
+# app/core/read_replicas.py
+
+"""
+読み取りレプリカへのセッション振り分け。
+
+get_db はリクエストごとに接続先のエンジンを 1 つ選び、セッション全体をそこに束ねる
+（同じトランザクション内で読み書きの接続先が分かれることはない）。
+
+* GET / HEAD / OPTIONS: 正常かつ遅延が db_replica_max_lag_seconds 未満のレプリカに
+  ラウンドロビンで振り分ける。該当するレプリカが無ければプライマリ
+* それ以外のメソッド: プライマリ。あわせてクライアントを
+  db_read_your_writes_seconds 秒だけプライマリに固定する（自分の書き込みを読めるように）
+* 固定はワーカー内のキャッシュ（Authorization ヘッダーのハッシュ、無ければ接続元 IP）と
+  Cookie の両方で判定する。Cookie は別ワーカー・別インスタンスに届いた読み取りにも効く
+
+死活と遅延は db_replica_check_interval 秒ごとに確認する。レプリカのエンジンは
+読み取り専用トランザクションで接続するため、誤って書き込むとその場でエラーになる。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.core.config import get_settings
+from app.utils.request_meta import UNKNOWN_IP, get_client_ip
+
+logger = logging.getLogger(__name__)
+
+# レプリカに振り分けてよいメソッド（副作用なし）
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# プライマリ固定の期限（UNIX 時刻）を保持する Cookie
+PIN_COOKIE = "roro_db_pin"
+
+# 遅延（秒）。プライマリとして動いている場合（同一 DB の代用など）と、
+# 受信済みの WAL をすべて適用済みの場合は 0
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class Replica:
+    """
+    レプリカ 1 台分のエンジンと直近の確認結果。確認前は振り分け対象外。
+    """
+    __slots__ = ("name", "engine", "healthy", "lag_seconds", "checked_at", "failures", "routed")
+
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.failures = 0
+        self.routed = 0
+
+
+class ReplicaRouter:
+    """
+    リクエストの接続先エンジンを選ぶ。
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[Replica],
+        *,
+        max_lag_seconds: float,
+        check_interval: float,
+        check_timeout: float,
+        pin_seconds: float,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.pin_seconds = pin_seconds
+        self._pins: ExpiringLRUCache[str, bool] = ExpiringLRUCache(maxsize=100_000, ttl=pin_seconds)
+        self._rr = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.pinned_reads = 0
+        self.fallbacks = 0
+
+    # ------------------------------------------------------------------
+    # 振り分け
+    # ------------------------------------------------------------------
+    def route(self, request: Optional[Request], response: Optional[Response] = None) -> AsyncEngine:
+        """
+        リクエストの接続先を返す。書き込みリクエストの場合はクライアントをプライマリに固定する。
+        リクエスト外（バックグラウンド処理など）からの呼び出しは常にプライマリ。
+        """
+        if not self.replicas or request is None:
+            return self.primary
+        if request.method not in SAFE_METHODS:
+            self.pin(request, response)
+            return self.primary
+        if self.is_pinned(request):
+            self.pinned_reads += 1
+            return self.primary
+        replica = self.choose_replica()
+        if replica is None:
+            self.fallbacks += 1
+            return self.primary
+        replica.routed += 1
+        return replica.engine
+
+    def choose_replica(self) -> Optional[Replica]:
+        """
+        正常かつ遅延が許容範囲のレプリカをラウンドロビンで 1 台返す。
+        """
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and (replica.lag_seconds or 0) < self.max_lag_seconds
+        ]
+        if not candidates:
+            return None
+        return candidates[next(self._rr) % len(candidates)]
+
+    @staticmethod
+    def client_key(request: Request) -> Optional[str]:
+        """
+        クライアントの識別子。トークンそのものは保持しないようハッシュ化する。
+        匿名クライアントは get_client_ip の IP を使う（接続元はプロキシなので全員が同じキーになる）。
+        IP が特定できない場合は None とし、Cookie でのみ固定する。
+        """
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return hashlib.sha256(authorization.encode()).hexdigest()
+        ip = get_client_ip(request)
+        return None if ip == UNKNOWN_IP else ip
+
+    def pin(self, request: Request, response: Optional[Response]) -> None:
+        key = self.client_key(request)
+        if key is not None:
+            self._pins.set(key, True)
+        if response is not None:
+            until = int(time.time() + self.pin_seconds)
+            response.set_cookie(
+                PIN_COOKIE,
+                str(until),
+                max_age=max(1, int(self.pin_seconds)),
+                httponly=True,
+                samesite="lax",
+            )
+
+    def is_pinned(self, request: Request) -> bool:
+        key = self.client_key(request)
+        if key is not None and self._pins.get(key):
+            return True
+        try:
+            return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    # ------------------------------------------------------------------
+    # 死活・遅延の確認
+    # ------------------------------------------------------------------
+    @staticmethod
+    async def _measure_lag(engine: AsyncEngine) -> Any:
+        async with engine.connect() as conn:
+            return await conn.scalar(LAG_QUERY)
+
+    async def check_replica(self, replica: Replica) -> None:
+        """
+        接続の取得から遅延の取得までを check_timeout 秒以内に終えられなければ異常とする。
+        """
+        try:
+            lag = await asyncio.wait_for(self._measure_lag(replica.engine), timeout=self.check_timeout)
+        except Exception as exc:
+            if replica.healthy:
+                logger.warning("レプリカ %s を振り分け対象から外します: %s", replica.name, exc)
+            replica.healthy = False
+            replica.failures += 1
+        else:
+            replica.lag_seconds = float(lag or 0)
+            if not replica.healthy:
+                logger.info("レプリカ %s を振り分け対象にします（遅延 %.2f 秒）", replica.name, replica.lag_seconds)
+            replica.healthy = True
+        replica.checked_at = time.time()
+
+    async def check_once(self) -> None:
+        await asyncio.gather(*(self.check_replica(replica) for replica in self.replicas))
+
+    async def start(self) -> None:
+        """
+        初回の確認を済ませてから定期確認を開始する（レプリカ未設定なら何もしない）。
+        """
+        if not self.replicas or self._task is not None:
+            return
+        await self.check_once()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="replica-health")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                await self.check_once()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "failures": replica.failures,
+                    "routed": replica.routed,
+                    "pool": replica.engine.pool.stats() if hasattr(replica.engine.pool, "stats") else None,
+                }
+                for replica in self.replicas
+            ],
+            "pinned_reads": self.pinned_reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+@lru_cache()
+def get_replica_router() -> ReplicaRouter:
+    """
+    プロセス内で共有する ReplicaRouter を返す。
+    """
+    from app.core.database import create_engine_from_settings, engine  # 循環 import 回避のため遅延 import
+
+    settings = get_settings()
+    replicas = [
+        Replica(f"replica{i}", create_engine_from_settings(settings, uri, read_only=True))
+        for i, uri in enumerate(settings.postgres_replica_uris)
+    ]
+    router = ReplicaRouter(
+        engine,
+        replicas,
+        max_lag_seconds=settings.db_replica_max_lag_seconds,
+        check_interval=settings.db_replica_check_interval,
+        check_timeout=settings.db_replica_check_timeout,
+        pin_seconds=settings.db_read_your_writes_seconds,
+    )
+    metrics.register("db_replicas", router.stats)
+    return router
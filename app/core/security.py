@@ -1,23 +1,28 @@
 # app/core/security.py
 
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Callable
+import hashlib
 import os
+import secrets
 import logging
 
-# パスワードハッシュ設定（bcryptを使用）
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.services.password_hasher import hash_password
+from app.services.password_hasher import verify_password as _verify_password
 
 # JWT設定（.envやKeyVaultでSECRET_KEYを管理することを推奨）
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# デコード済みトークンのキャッシュ件数上限（ワーカーごと）
+TOKEN_CACHE_MAXSIZE = 10_000
+
 # OAuth2のスキーム設定（トークン発行エンドポイントを指定）
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -29,21 +34,51 @@ class TokenUser(BaseModel):
     id: str                  # JWTのsubに該当（UUID文字列）
     is_admin: bool = False   # 管理者フラグ
 
+    # キャッシュでリクエスト間共有されるため不変にする
+    model_config = ConfigDict(frozen=True)
+
+
+# ------------------------------------------
+# デコード済みトークンのキャッシュ
+# キーはトークン本体ではなく SHA-256 ダイジェスト、期限は JWT の exp
+# ------------------------------------------
+token_cache: ExpiringLRUCache[bytes, TokenUser] = ExpiringLRUCache(maxsize=TOKEN_CACHE_MAXSIZE)
+metrics.register("token_cache", token_cache.stats)
+
 
 # ------------------------------------------
 # パスワードのハッシュ化
 # ------------------------------------------
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
     プレーンなパスワードをハッシュ化（bcrypt）して返す。
+    計算はハッシュ専用プールで行い、イベントループを止めない。
     """
-    return pwd_context.hash(password)
+    return await hash_password(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    平文パスワードとハッシュ値を照合する。
+    平文パスワードとハッシュ値を照合する（ハッシュ専用プールで実行）。
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _verify_password(plain_password, hashed_password)
+
+# ------------------------------------------
+# API キーの発行とハッシュ化
+# ------------------------------------------
+API_KEY_PREFIX = "roro_"
+
+def generate_api_key() -> str:
+    """
+    推測不能な API キー（平文）を生成する。平文は発行時に一度だけ利用者へ返す。
+    """
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+def hash_api_key(raw_key: str) -> str:
+    """
+    API キーの SHA-256（16 進 64 文字）を返す。DB にはこの値のみ保存する。
+    キー自体が高エントロピーのため bcrypt のような低速ハッシュは不要。
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()
 
 # ------------------------------------------
 # アクセストークン（JWT）の生成
@@ -68,41 +103,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None,
     return encoded_jwt
 
 # ------------------------------------------
-# 現在のユーザー情報をJWTから抽出して返す
-# ------------------------------------------
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenUser:
-    """
-    Authorizationヘッダーに含まれるBearerトークンを検証し、
-    ユーザー情報（IDとロール）を返却する。
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="認証トークンが不正です。",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        is_admin: bool = payload.get("is_admin", False)
-
-        if user_id is None:
-            raise credentials_exception
-
-        return TokenUser(id=user_id, is_admin=is_admin)
-
-    except JWTError as e:
-        logging.warning(f"JWTデコード失敗: {e}")
-        raise credentials_exception
-
-# ------------------------------------------
-# 管理者ロール限定のアクセス制御（RBAC）
+# JWTを検証して TokenUser に変換（キャッシュ付き）
 # ------------------------------------------
-def has_admin_role(current_user: TokenUser = Depends(get_current_user)) -> None:
+def decode_access_token(token: str) -> TokenUser:
     """
-    管理者（is_admin=True）のみアクセスを許可する。
+    アクセストークンを検証し TokenUser を返す。
+    - 検証済みトークンは exp まで LRU キャッシュに保持し、再デコードを省く
+    - 不正なトークンは JWTError を送出する（キャッシュしない）
     """
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="この操作を行う権限がありません（管理者専用）"
-        )
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise JWTError("sub がありません")
+
+    user = TokenUser(id=user_id, is_admin=payload.get("is_admin", False))
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(digest, user, expires_at=float(exp))
+    return user
@@ -3,21 +3,26 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from app.crud.base import CRUDBase
 from app.models.attachments import Attachment
 from app.schemas.attachments import AttachmentCreate
+from app.utils.pagination import CursorParams, Page, paginate
+
+attachments = CRUDBase[Attachment, AttachmentCreate](Attachment)
 
 async def create_attachment(
     db: AsyncSession, *, user_id: UUID, data: "AttachmentCreate"
 ) -> Attachment:
-    db_obj = Attachment(user_id=user_id, **data.dict())
-    db.add(db_obj)
-    await db.commit()
-    await db.refresh(db_obj)
-    return db_obj
+    return await attachments.create(db, data, user_id=user_id)
 
 async def get_attachment(db: AsyncSession, attachment_id: UUID) -> Attachment | None:
     return await db.get(Attachment, attachment_id)
 
-async def list_by_user(db: AsyncSession, user_id: UUID) -> list[Attachment]:
-    res = await db.scalars(select(Attachment).where(Attachment.user_id == user_id))
-    return list(res)
\ No newline at end of file
+async def list_by_user(db: AsyncSession, user_id: UUID, params: CursorParams) -> Page[Attachment]:
+    return await paginate(
+        db,
+        select(Attachment).where(Attachment.user_id == user_id),
+        sort_col=Attachment.created_at,
+        id_col=Attachment.id,
+        params=params,
+    )
\ No newline at end of file
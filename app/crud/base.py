@@ -1,8 +1,23 @@
-from typing import Generic, TypeVar, Type, Optional, List
+# app/crud/base.py
+
+"""
+モデル共通の CRUD。
+
+書き込みは 1 往復で完結させる。
+* create: INSERT ... RETURNING（Base の eager_defaults でサーバー側既定値も同じ文で取得）
+* update_returning / delete_returning: UPDATE / DELETE ... RETURNING で、
+  SELECT してから変更・commit 後に refresh する 3 往復を 1 文にまとめる
+
+セッションは expire_on_commit=False のため、commit 後も返したオブジェクトの属性を
+そのまま参照できる（refresh 不要）。
+"""
+
+from typing import Any, Dict, Generic, TypeVar, Type, Optional, List, Union
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import BaseModel
-from app.models.base import Base
+from app.core.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -11,7 +26,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    async def get(self, db: AsyncSession, id: str) -> Optional[ModelType]:
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         result = await db.execute(select(self.model).filter(self.model.id == id))
         return result.scalars().first()
 
@@ -19,10 +34,49 @@ class CRUDBase(Generic[ModelType, CreateSchemaType]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = obj_in.dict()
-        db_obj = self.model(**obj_in_data)
+    async def create(
+        self,
+        db: AsyncSession,
+        obj_in: Union[CreateSchemaType, Dict[str, Any]],
+        **extra: Any,
+    ) -> ModelType:
+        """
+        1 行を INSERT ... RETURNING で作成する。extra は入力スキーマに無い列（user_id など）。
+        """
+        obj_in_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
+        db_obj = self.model(**obj_in_data, **extra)
         db.add(db_obj)
         await db.commit()
-        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_returning(
+        self,
+        db: AsyncSession,
+        id: Any,
+        values: Dict[str, Any],
+        *where: Any,
+    ) -> Optional[ModelType]:
+        """
+        id（と追加条件 where）に一致する行を UPDATE ... RETURNING で更新し、更新後の行を返す。
+        該当しなければ None。セッション内の同じオブジェクトは返した値で上書きされる。
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id, *where)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        db_obj = (await db.scalars(stmt)).one_or_none()
+        await db.commit()
+        return db_obj
+
+    async def delete_returning(self, db: AsyncSession, id: Any, *where: Any) -> Optional[ModelType]:
+        """
+        id（と追加条件 where）に一致する行を DELETE ... RETURNING で削除し、削除した行を返す。
+        該当しなければ None。
+        """
+        stmt = delete(self.model).where(self.model.id == id, *where).returning(self.model)
+        db_obj = (await db.scalars(stmt)).one_or_none()
+        await db.commit()
         return db_obj
@@ -1,15 +1,42 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
 from uuid import UUID
 
+from app.crud.base import CRUDBase
 from app.models.api_key import APIKey
 from app.schemas.api_key import APIKeyCreate
+from app.core.security import generate_api_key, hash_api_key
+from app.services.api_key_index import get_api_key_index
 
-def create_api_key(db: Session, user_id: UUID, api_key: APIKeyCreate):
-    db_api_key = APIKey(user_id=user_id, **api_key.dict())
-    db.add(db_api_key)
-    db.commit()
-    db.refresh(db_api_key)
-    return db_api_key
+api_keys = CRUDBase[APIKey, APIKeyCreate](APIKey)
 
-def get_api_keys_by_user(db: Session, user_id: UUID):
-    return db.query(APIKey).filter(APIKey.user_id == user_id).all()
+async def create_api_key(db: AsyncSession, user_id: UUID, api_key: APIKeyCreate) -> tuple[APIKey, str]:
+    """
+    API キーを発行する。DB には SHA-256 ハッシュのみ保存し、平文キーは戻り値でのみ返す。
+    """
+    raw_key = generate_api_key()
+    db_api_key = await api_keys.create(db, api_key, user_id=user_id, key_hash=hash_api_key(raw_key))
+    return db_api_key, raw_key
+
+async def get_api_keys_by_user(db: AsyncSession, user_id: UUID) -> list[APIKey]:
+    result = await db.scalars(select(APIKey).where(APIKey.user_id == user_id).order_by(APIKey.created_at))
+    return list(result.all())
+
+async def delete_api_key(db: AsyncSession, user_id: UUID, key_id: UUID) -> bool:
+    """
+    利用者自身の API キーを削除（失効）する。該当しない場合は False。
+    このプロセスのインデックスからも即時に破棄する（他ワーカーは api_key_cache_ttl 経過後に反映）。
+    """
+    db_api_key = await api_keys.delete_returning(db, key_id, APIKey.user_id == user_id)
+    if db_api_key is None:
+        return False
+    get_api_key_index().invalidate(db_api_key.key_hash)
+    return True
+
+async def get_key_hashes_by_users(db: AsyncSession, user_ids: Iterable[UUID]) -> list[str]:
+    """
+    指定ユーザーが所有する API キーのハッシュを返す（キャッシュ破棄用）。
+    """
+    result = await db.scalars(select(APIKey.key_hash).where(APIKey.user_id.in_(list(user_ids))))
+    return list(result.all())
@@ -1,15 +1,40 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
+from app.crud.base import CRUDBase
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate
+from app.utils.pagination import CursorParams, Page, paginate
+
+notifications = CRUDBase[Notification, NotificationCreate](Notification)
+
+async def create_notification(db: AsyncSession, user_id: UUID, notification: NotificationCreate) -> Notification:
+    return await notifications.create(db, notification, user_id=user_id)
 
-def create_notification(db: Session, user_id: UUID, notification: NotificationCreate):
-    db_notification = Notification(user_id=user_id, **notification.dict())
-    db.add(db_notification)
-    db.commit()
-    db.refresh(db_notification)
-    return db_notification
+async def get_notifications_by_user(db: AsyncSession, user_id: UUID, params: CursorParams) -> Page[Notification]:
+    return await paginate(
+        db,
+        select(Notification).where(Notification.user_id == user_id),
+        sort_col=Notification.created_at,
+        id_col=Notification.id,
+        params=params,
+    )
 
-def get_notifications_by_user(db: Session, user_id: UUID):
-    return db.query(Notification).filter(Notification.user_id == user_id).all()
+async def get_notifications_version(db: AsyncSession, user_id: UUID) -> tuple[int, datetime | None, int]:
+    """
+    条件付き GET 用の版（件数, 最新の作成日時, 既読件数）。通知には updated_at が無いため、
+    追加・削除・既読化のいずれでも値が変わる集約で代用する。
+    """
+    row = (
+        await db.execute(
+            select(
+                func.count(),
+                func.max(Notification.created_at),
+                func.count().filter(Notification.is_read == True),
+            ).where(Notification.user_id == user_id)
+        )
+    ).one()
+    return row[0], row[1], row[2]
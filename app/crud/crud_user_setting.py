@@ -1,15 +1,35 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import String, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.models.user_setting import UserSetting
 from app.schemas.user_setting import UserSettingCreate
 
-def create_user_setting(db: Session, user_id: UUID, setting: UserSettingCreate):
-    db_setting = UserSetting(user_id=user_id, **setting.dict())
-    db.add(db_setting)
-    db.commit()
-    db.refresh(db_setting)
+async def upsert_user_setting(db: AsyncSession, user_id: UUID, setting: UserSettingCreate) -> UserSetting:
+    """
+    ユーザー設定を保存する（user_id は一意のため、既存行があれば上書き）。
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING の 1 往復で確定後の行を返す。
+    """
+    values = setting.dict()
+    stmt = insert(UserSetting).values(user_id=user_id, **values)
+    stmt = (
+        stmt.on_conflict_do_update(index_elements=[UserSetting.user_id], set_=values)
+        .returning(UserSetting)
+        .execution_options(populate_existing=True)
+    )
+    db_setting = (await db.scalars(stmt)).one()
+    await db.commit()
     return db_setting
 
-def get_user_setting(db: Session, user_id: UUID):
-    return db.query(UserSetting).filter(UserSetting.user_id == user_id).first()
+async def get_user_setting(db: AsyncSession, user_id: UUID) -> UserSetting | None:
+    return await db.scalar(select(UserSetting).where(UserSetting.user_id == user_id))
+
+async def get_user_setting_version(db: AsyncSession, user_id: UUID) -> str | None:
+    """
+    条件付き GET 用の版。行の xmin（最後に書き込んだトランザクション ID）を使う。
+    updated_at 列が無くても、UPSERT のたびに値が変わる。
+    """
+    return await db.scalar(
+        select(literal_column("xmin").cast(String)).select_from(UserSetting).where(UserSetting.user_id == user_id)
+    )
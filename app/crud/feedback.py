@@ -2,16 +2,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import select
+from app.crud.base import CRUDBase
 from app.models.feedback import Feedback
 from app.schemas.feedback import FeedbackCreate
+from app.utils.pagination import CursorParams, Page, paginate
+
+feedbacks = CRUDBase[Feedback, FeedbackCreate](Feedback)
 
 async def create_feedback(db: AsyncSession, user_id: UUID, data: FeedbackCreate):
-    obj = Feedback(user_id=user_id, **data.dict())
-    db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
-    return obj
+    return await feedbacks.create(db, data, user_id=user_id)
 
-async def list_feedbacks(db: AsyncSession, user_id: UUID):
-    rows = await db.scalars(select(Feedback).where(Feedback.user_id == user_id))
-    return list(rows)
+async def list_feedbacks(db: AsyncSession, user_id: UUID, params: CursorParams) -> Page[Feedback]:
+    return await paginate(
+        db,
+        select(Feedback).where(Feedback.user_id == user_id),
+        sort_col=Feedback.created_at,
+        id_col=Feedback.id,
+        params=params,
+    )
@@ -1,16 +1,67 @@
 # ---------- CRUD ----------
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from app.background.batch_writer import BatchWriter
+from app.core import metrics
+from app.core.config import get_settings
 from app.models.login_history import LoginHistory
+from app.utils.pagination import CursorParams, Page, paginate
+from app.utils.request_meta import UNKNOWN_IP, parse_ip
 
-async def record_login(db: AsyncSession, *, user_id: UUID, ip: str, ua: str | None):
-    obj = LoginHistory(user_id=user_id, ip_address=ip, user_agent=ua)
-    db.add(obj)
+async def insert_logins(db: AsyncSession, rows: List[Dict[str, Any]]):
+    """
+    ログイン履歴を複数行 INSERT でまとめて登録する（コミットは 1 回）。
+    """
+    await db.execute(insert(LoginHistory), rows)
     await db.commit()
 
-async def list_logins(db: AsyncSession, user_id: UUID):
-    res = await db.scalars(
-        select(LoginHistory).where(LoginHistory.user_id == user_id).order_by(LoginHistory.logged_at.desc())
+async def _flush_logins(rows: List[Dict[str, Any]]):
+    from app.core.database import async_session  # 遅延 import で循環回避
+
+    async with async_session() as session:
+        await insert_logins(session, rows)
+
+@lru_cache()
+def get_login_history_writer() -> BatchWriter[Dict[str, Any]]:
+    """
+    ログイン履歴のバッファ付きライター（プロセス共有）を返す。
+    """
+    settings = get_settings()
+    writer: BatchWriter[Dict[str, Any]] = BatchWriter(
+        "login_history",
+        _flush_logins,
+        max_batch=settings.login_history_batch_size,
+        flush_interval=settings.login_history_flush_interval_ms / 1000,
+        max_pending=settings.login_history_max_pending,
+    )
+    metrics.register("login_history_writer", writer.stats)
+    return writer
+
+def record_login(*, user_id: UUID | None, ip: str, ua: str | None, success: bool = True) -> bool:
+    """
+    ログイン履歴（失敗を含む）をバッファに積む。DB への書き込みはバックグラウンドでまとめて行う。
+    バッファ満杯で破棄された場合は False。
+    ip_address は INET 列のため、不正な値は UNKNOWN_IP に置き換える
+    （1 行でも不正だと複数行 INSERT 全体が失敗し、同じバッチの履歴がまとめて失われる）。
+    """
+    return get_login_history_writer().submit({
+        "user_id": user_id,
+        "ip_address": parse_ip(ip) or UNKNOWN_IP,
+        "user_agent": ua[:300] if ua else None,
+        "is_successful": success,
+        "logged_at": datetime.now(),
+    })
+
+async def list_logins(db: AsyncSession, user_id: UUID, params: CursorParams) -> Page[LoginHistory]:
+    return await paginate(
+        db,
+        select(LoginHistory).where(LoginHistory.user_id == user_id),
+        sort_col=LoginHistory.logged_at,
+        id_col=LoginHistory.id,
+        params=params,
     )
-    return list(res)
@@ -2,20 +2,70 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import select
-from app.models.roles import Role, user_role_link
-from app.schemas.roles import RoleCreate
+from sqlalchemy.dialects.postgresql import insert
+from app.crud.base import CRUDBase
+from app.models.roles import Role, user_roles
+from app.models.user import User
+from app.schemas.common import BulkResult
+from app.schemas.roles import RoleCreate, RoleGrant
+from app.services.identity_cache import invalidate_user, invalidate_users
+from app.utils import bulk
+
+roles = CRUDBase[Role, RoleCreate](Role)
 
 async def create_role(db: AsyncSession, data: RoleCreate):
-    obj = Role(**data.dict())
-    db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
-    return obj
+    return await roles.create(db, data)
 
 async def assign_role(db: AsyncSession, user_id: UUID, role_id: UUID):
-    sql = user_role_link.insert().values(user_id=user_id, role_id=role_id).prefix_with("ON CONFLICT DO NOTHING")
+    sql = user_roles.insert().values(user_id=user_id, role_id=role_id).prefix_with("ON CONFLICT DO NOTHING")
     await db.execute(sql)
     await db.commit()
+    invalidate_user(user_id)
+
+async def assign_roles_bulk(db: AsyncSession, grants: list[RoleGrant]) -> BulkResult:
+    """
+    ロールを一括付与する（1 トランザクション）。
+    存在しないユーザー・ロールを先に除外し（外部キー違反で全体が失敗しないように）、
+    残りを複数行の INSERT ... ON CONFLICT DO NOTHING RETURNING で書き込む。
+    返ってこなかった組は付与済み（exists）。
+    """
+    user_ids = {grant.user_id for grant in grants}
+    role_ids = {grant.role_id for grant in grants}
+    known_users = set((await db.scalars(select(User.id).where(User.id.in_(user_ids)))).all())
+    known_roles = set((await db.scalars(select(Role.id).where(Role.id.in_(role_ids)))).all())
+
+    results = []
+    rows = []
+    seen: set[tuple] = set()
+    for index, grant in enumerate(grants):
+        key = (grant.user_id, grant.role_id)
+        if key in seen:
+            results.append(bulk.item(index, bulk.STATUS_DUPLICATE, grant.user_id))
+        elif grant.user_id not in known_users:
+            results.append(bulk.item(index, bulk.STATUS_NOT_FOUND, grant.user_id, "ユーザーが存在しません"))
+        elif grant.role_id not in known_roles:
+            results.append(bulk.item(index, bulk.STATUS_NOT_FOUND, grant.user_id, "ロールが存在しません"))
+        else:
+            rows.append({"user_id": grant.user_id, "role_id": grant.role_id})
+            results.append(bulk.item(index, bulk.STATUS_GRANTED, grant.user_id))
+        seen.add(key)
+
+    granted: set[tuple] = set()
+    for chunk in bulk.chunked(rows, bulk.rows_per_statement(2)):
+        stmt = (
+            insert(user_roles)
+            .values(list(chunk))
+            .on_conflict_do_nothing()
+            .returning(user_roles.c.user_id, user_roles.c.role_id)
+        )
+        granted.update(tuple(row) for row in (await db.execute(stmt)).all())
+    await db.commit()
+
+    for result, grant in zip(results, grants):
+        if result.status == bulk.STATUS_GRANTED and (grant.user_id, grant.role_id) not in granted:
+            result.status = bulk.STATUS_EXISTS
+    invalidate_users({user_id for user_id, _ in granted})
+    return bulk.build_result(results)
 
 async def list_roles(db: AsyncSession):
     rows = await db.scalars(select(Role))
@@ -0,0 +1,53 @@
+"""
+app/dependencies/api_key_auth.py
+
+サービス間連携向けの API キー（X-API-Key ヘッダー）認証の依存関数群。
+キーは SHA-256 でハッシュ化してプロセス内インデックスと突合し、
+利用時刻（last_used_at）はメモリで集約して定期的にまとめて書き込む。
+"""
+
+import logging
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+
+from app.services.api_key_index import ApiKeyPrincipal, get_api_key_index, get_last_used_recorder
+
+logger = logging.getLogger(__name__)
+
+# auto_error=False とし、未指定時も 401 を返す（既定の 403 ではなく）
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+async def get_api_key_principal(api_key: Optional[str] = Security(api_key_header)) -> ApiKeyPrincipal:
+    """
+    X-API-Key ヘッダーのキーを検証し、呼び出し元（キーID・ユーザーID・スコープ）を返す。
+    - DB セッションは取得しない（キャッシュミス時のみインデックスが短命セッションで 1 クエリ）
+    - last_used_at はメモリに記録するだけで、書き込みはバックグラウンドで行う
+    """
+    if not api_key:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API キーが必要です")
+
+    principal = await get_api_key_index().resolve(api_key)
+    if principal is None:
+        logger.warning("API キー認証失敗")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API キーが不正です")
+
+    get_last_used_recorder().touch(principal.key_id)
+    return principal
+
+
+def require_scopes(*scopes: str) -> Callable[..., ApiKeyPrincipal]:
+    """
+    指定スコープをすべて持つ API キーのみ許可する依存関数を返す。
+
+    例:
+        @router.post("/chat", dependencies=[Depends(require_scopes("chat"))])
+    """
+    async def dependency(principal: ApiKeyPrincipal = Depends(get_api_key_principal)) -> ApiKeyPrincipal:
+        if not principal.has_scopes(*scopes):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="API キーのスコープが不足しています")
+        return principal
+
+    return dependency
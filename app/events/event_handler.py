@@ -1,21 +1,142 @@
 # app/events/event_handler.py
 
+"""
+アプリ全体で使用される共通のイベントログ。
+
+log_event() はログ出力に加えてイベントをバッファに積むだけで（I/O なし・非ブロッキング）、
+DB への書き込みはバックグラウンドの BatchWriter がまとめて行う。
+
+* 全イベント → audit_logs（user_id = 操作したユーザー、action = イベント種別）
+* details に target_user_id があるイベント → user_event_logs（対象ユーザーの履歴）
+
+1 回のフラッシュは 2 テーブルへの複数行 INSERT と 1 回の commit。
+フラッシュまでにユーザーが物理削除されて外部キー違反になった場合は、存在しないユーザーを
+除いて再投入し（audit_logs は user_id を NULL にして残す）、除外件数を rejected として数える。
+バッファが満杯の場合は破棄し、破棄件数を /admin/metrics（event_log_writer）に出す。
+"""
+
 import logging
+import uuid
 from datetime import datetime
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.background.batch_writer import BatchWriter
+from app.core import metrics
+from app.core.config import get_settings
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.models.user_event_log import UserEventLog
 
-# アプリ全体で使用される共通のイベントロガー
 logger = logging.getLogger(__name__)
 
-def log_event(event_type: str, user_id: int, details: Dict[str, Any]):
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+def build_rows(events: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    バッファのイベントを audit_logs / user_event_logs の行に変換する。
+    """
+    audit_rows: List[Dict[str, Any]] = []
+    user_rows: List[Dict[str, Any]] = []
+    for event in events:
+        audit_rows.append({
+            "user_id": event["user_id"],
+            "action": event["event_type"][:100],
+            "description": event["description"],
+            "created_at": event["timestamp"],
+        })
+        if event["target_user_id"] is not None:
+            user_rows.append({
+                "user_id": event["target_user_id"],
+                "event_type": event["event_type"][:50],
+                "description": event["description"],
+                "timestamp": event["timestamp"],
+            })
+    return audit_rows, user_rows
+
+async def _write_rows(db: AsyncSession, audit_rows: List[Dict[str, Any]], user_rows: List[Dict[str, Any]]):
+    await db.execute(insert(AuditLog), audit_rows)
+    if user_rows:
+        await db.execute(insert(UserEventLog), user_rows)
+    await db.commit()
+
+async def _existing_user_ids(db: AsyncSession, user_ids: Set[uuid.UUID]) -> Set[uuid.UUID]:
+    if not user_ids:
+        return set()
+    result = await db.execute(select(User.id).where(User.id.in_(user_ids)))
+    return set(result.scalars())
+
+async def insert_events(db: AsyncSession, events: List[Dict[str, Any]]) -> int:
+    """
+    イベントを複数行 INSERT でまとめて登録する（コミットは 1 回）。
+    外部キー違反の場合はバッチ全体を捨てず、存在しないユーザーを参照する行だけを除いて再投入する。
+    除外した user_event_logs の行数を返す。
+    """
+    audit_rows, user_rows = build_rows(events)
+    try:
+        await _write_rows(db, audit_rows, user_rows)
+        return 0
+    except IntegrityError:
+        await db.rollback()
+
+    referenced = {row["user_id"] for row in audit_rows + user_rows if row["user_id"] is not None}
+    existing = await _existing_user_ids(db, referenced)
+    for row in audit_rows:
+        if row["user_id"] not in existing:
+            # 操作者が削除済みでも監査ログ自体は残す（FK は ON DELETE SET NULL と同じ扱い）
+            row["user_id"] = None
+    kept = [row for row in user_rows if row["user_id"] in existing]
+    rejected = len(user_rows) - len(kept)
+    logger.warning("イベントログ: 存在しないユーザーを参照する %d 件を除外して再登録します", rejected)
+    await _write_rows(db, audit_rows, kept)
+    return rejected
+
+async def _flush_events(events: List[Dict[str, Any]]) -> int:
+    from app.core.database import async_session  # 遅延 import で循環回避
+
+    async with async_session() as session:
+        return await insert_events(session, events)
+
+@lru_cache()
+def get_event_log_writer() -> BatchWriter[Dict[str, Any]]:
+    """
+    イベントログのバッファ付きライター（プロセス共有）を返す。
+    """
+    settings = get_settings()
+    writer: BatchWriter[Dict[str, Any]] = BatchWriter(
+        "event_log",
+        _flush_events,
+        max_batch=settings.event_log_batch_size,
+        flush_interval=settings.event_log_flush_interval_ms / 1000,
+        max_pending=settings.event_log_max_pending,
+    )
+    metrics.register("event_log_writer", writer.stats)
+    return writer
+
+def log_event(event_type: str, user_id: Optional[uuid.UUID], details: Dict[str, Any]) -> bool:
     """
-    イベントログをINFOレベルで出力。
+    イベントログをINFOレベルで出力し、DB 書き込み用のバッファに積む。
     例：ユーザー削除、設定変更、管理操作など
+    バッファ満杯で破棄された場合は False。
     """
     event = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "event_type": event_type,
-        "user_id": user_id,
-        "details": details
+        "user_id": _as_uuid(user_id),
+        "target_user_id": _as_uuid(details.get("target_user_id")),
+        # 呼び出し側が後から details を変更しても影響しないよう、積む時点で直列化する
+        "description": orjson.dumps(details, default=str).decode(),
     }
-    logger.info(f"イベントログ: {event}")
+    logger.info("イベントログ: %s %s %s", event_type, user_id, event["description"])
+    return get_event_log_writer().submit(event)
@@ -20,10 +20,7 @@ from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-
-# レート制御
-from slowapi import Limiter
-from slowapi.middleware import SlowAPIMiddleware
+from fastapi.responses import ORJSONResponse
 
 # OpenTelemetry
 from opentelemetry import trace
@@ -36,14 +33,11 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from .core.config import get_settings
 from .core.logging import configure_logging  # 独自 logging 設定ヘルパ
 from .core import security  # ensure JWT utils are imported once
+from .core.rate_limit import RateLimitMiddleware, create_bucket_backend
 
 settings = get_settings()
 logger = configure_logging()
 
-# ------------------------------------------------------------------
-# Limiter 準備: 1 IP 100 req/min（必要に応じ環境変数で調整可）
-limiter = Limiter(key_func=lambda request: request.client.host, default_limits=["100/minute"])
-
 # ------------------------------------------------------------------
 # OpenTelemetry 初期化
 resource = Resource.create({"service.name": settings.project_name})
@@ -60,6 +54,19 @@ app = FastAPI(
     docs_url="/docs",
     openapi_url="/openapi.json",
     lifespan="on",
+    # レスポンスの JSON 化は orjson（標準の json より高速。datetime / UUID もそのまま扱える）
+    default_response_class=ORJSONResponse,
+)
+
+# --- レートリミットミドルウェア -------------------------------------
+# ユーザーID／クライアント IP 単位のトークンバケット。状態は Redis 互換ストアで全ワーカー共有
+# CORS より先に登録し、CORS の内側に置く（429 にも Access-Control-Allow-Origin を付けるため）
+app.add_middleware(
+    RateLimitMiddleware,
+    backend=create_bucket_backend(settings.rate_limit_storage_uri),
+    per_minute=settings.rate_limit_per_minute,
+    burst=settings.rate_limit_burst,
+    route_costs=settings.rate_limit_route_costs,
 )
 
 # --- CORS: Front Door の公開ドメインを許可 --------------------------
@@ -69,12 +76,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["Retry-After"],  # 429 の再試行待ち秒数をブラウザのスクリプトから読めるようにする
 )
 
-# --- レートリミットミドルウェア -------------------------------------
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-
 # --- OpenTelemetry 自動計測 ----------------------------------------
 FastAPIInstrumentor.instrument_app(app, tracer_provider=provider, excluded_urls=r"/(docs|openapi\.json)")
 
@@ -107,16 +111,15 @@ async def on_startup() -> None:
     * OpenAI モデルウォームアップ（非同期）
     * その他外部サービスの疎通チェック
     """
-    from ..shared_lib.db import engine  # 遅延 import で循環回避
+    from .core.database import engine, prefill_pool  # 遅延 import で循環回避
 
     logger.info("🟢 FastAPI starting up…")
-    try:
-        # 接続確認 (0.5 秒タイムアウト)
-        async with engine.connect() as conn:
-            await asyncio.wait_for(conn.execute("SELECT 1"), timeout=0.5)
-        logger.info("✅ PostgreSQL 接続 OK")
-    except Exception as exc:  # pragma: no cover
-        logger.warning("⚠️  PostgreSQL 接続チェック失敗: %s", exc)
+    # 接続確認を兼ねて接続プールを事前確立（初回リクエストの接続待ちを無くす）
+    opened = await prefill_pool(engine, min(settings.db_pool_prefill, settings.db_pool_size))
+    if opened:
+        logger.info("✅ PostgreSQL 接続 OK（事前確立 %d 本）", opened)
+    else:  # pragma: no cover
+        logger.warning("⚠️  PostgreSQL 接続チェック失敗")
 
     # OpenAI モデルプリロード（並列で実施）
     async def preload_openai() -> None:
@@ -131,6 +134,36 @@ async def on_startup() -> None:
 
     asyncio.create_task(preload_openai())
 
+    # OIDC 署名鍵（JWKS）の初回取得とバックグラウンド更新開始
+    from .core.jwks import get_issuer_registry
+
+    await get_issuer_registry().start()
+
+    # ログイン履歴のバッファ書き込み開始
+    from .crud.login_history import get_login_history_writer
+
+    await get_login_history_writer().start()
+
+    # イベントログ（監査ログ・ユーザー履歴）のバッファ書き込み開始
+    from .events.event_handler import get_event_log_writer
+
+    await get_event_log_writer().start()
+
+    # API キーの last_used_at 集約書き込み開始
+    from .services.api_key_index import get_last_used_recorder
+
+    await get_last_used_recorder().start()
+
+    # KPI 集計値の定期突き合わせ開始（初回は起動直後に実行）
+    from .services.statistics import get_kpi_reconciler
+
+    await get_kpi_reconciler().start()
+
+    # 読み取りレプリカの初回死活確認と定期確認開始（未設定なら何もしない）
+    from .core.read_replicas import get_replica_router
+
+    await get_replica_router().start()
+
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
@@ -140,6 +173,35 @@ async def on_shutdown() -> None:
     logger.info("🛑 FastAPI shutting down…")
     await trace.get_tracer_provider().shutdown()
 
-    from ..shared_lib.db import engine
+    from .services.password_hasher import get_password_hasher
+
+    get_password_hasher().shutdown()
+
+    from .core.jwks import get_issuer_registry
+
+    await get_issuer_registry().stop()
+
+    # バッファに残っているログイン履歴を書き出してから終了
+    from .crud.login_history import get_login_history_writer
+
+    await get_login_history_writer().stop()
+
+    from .events.event_handler import get_event_log_writer
+
+    await get_event_log_writer().stop()
+
+    from .services.api_key_index import get_last_used_recorder
+
+    await get_last_used_recorder().stop()
+
+    from .services.statistics import get_kpi_reconciler
+
+    await get_kpi_reconciler().stop()
+
+    from .core.read_replicas import get_replica_router
+
+    await get_replica_router().stop()
+
+    from .core.database import engine
 
     await engine.dispose()
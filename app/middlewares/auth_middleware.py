@@ -1,28 +1,72 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
+from typing import Tuple
+
 from fastapi import status
-from app.core.security import verify_token
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.jwks import get_issuer_registry
+from app.core.security import decode_access_token
 import logging
 
 # ロガーの設定
 logger = logging.getLogger("uvicorn.error")
 
-class AuthMiddleware(BaseHTTPMiddleware):
+# トークンの検証を行わないパス（完全一致、またはその配下のパス）
+DEFAULT_EXEMPT_PATHS: Tuple[str, ...] = ("/docs", "/redoc", "/openapi.json", "/health")
+
+
+def is_acceptable_token(token: str) -> bool:
     """
-    リクエストに含まれるトークンを検証し、認証を行うミドルウェア。
+    アプリ発行のアクセストークンは署名・期限まで検証する（トークンキャッシュ経由）。
+    外部 IdP の ID トークンは登録済み issuer のものだけを通し、署名検証は
+    後段の認証依存関数（app.core.principal）で JWKS を使って行う。
     """
+    try:
+        decode_access_token(token)
+        return True
+    except (JWTError, ValueError):
+        pass
+    try:
+        iss = jwt.get_unverified_claims(token).get("iss")
+    except JWTError:
+        return False
+    return bool(iss) and get_issuer_registry().is_registered(iss)
 
-    async def dispatch(self, request: Request, call_next):
-        authorization: str = request.headers.get("Authorization")
-        if authorization:
+
+class AuthMiddleware:
+    """
+    リクエストに含まれるトークンを検証し、認証を行う ASGI ミドルウェア。
+    exempt_paths（/docs やヘルスチェックなど）はトークンなしで通す。
+    """
+
+    def __init__(self, app: ASGIApp, *, exempt_paths: Tuple[str, ...] = DEFAULT_EXEMPT_PATHS) -> None:
+        self.app = app
+        self.exempt_paths = exempt_paths
+        # "/docs" は "/docs" と "/docs/…" にだけ一致させ、"/docs-internal" や "/healthz" は通さない
+        self._exempt_prefixes = tuple(path.rstrip("/") + "/" for path in exempt_paths)
+
+    def is_exempt(self, path: str) -> bool:
+        return path in self.exempt_paths or path.startswith(self._exempt_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get("authorization")
+        if not authorization:
+            detail = "Authorization header missing."
+        else:
             scheme, _, token = authorization.partition(" ")
             if scheme.lower() != "bearer":
-                return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid authentication scheme."})
-            if not verify_token(token):
-                return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid or expired token."})
-        else:
-            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Authorization header missing."})
+                detail = "Invalid authentication scheme."
+            elif not is_acceptable_token(token):
+                detail = "Invalid or expired token."
+            else:
+                await self.app(scope, receive, send)
+                return
 
-        response = await call_next(request)
-        return response
+        response = JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": detail})
+        await response(scope, receive, send)
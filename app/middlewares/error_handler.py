@@ -1,23 +1,40 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 
 # ロガーの設定
 logger = logging.getLogger("uvicorn.error")
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
+class ExceptionHandlerMiddleware:
     """
-    すべてのリクエストに対して例外をキャッチし、統一されたエラーレスポンスを返すミドルウェア。
+    すべてのリクエストに対して例外をキャッチし、統一されたエラーレスポンスを返す ASGI ミドルウェア。
+    レスポンスの送信開始後（ストリーミング中など）の例外は 500 に差し替えられないため、そのまま送出する。
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
             logger.error(f"Unhandled exception: {exc}")
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": "Internal Server Error"},
             )
+            await response(scope, receive, send)
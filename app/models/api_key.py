@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import CHAR, Column, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -10,9 +10,12 @@ class APIKey(Base):
     __tablename__ = "api_keys"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    key = Column(String, unique=True, nullable=False)
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.now)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    service_name = Column(String(60), nullable=False)
+    # 平文キーは保存せず SHA-256（16 進 64 文字）のみを保持する
+    key_hash = Column(CHAR(64), unique=True, nullable=False)
+    scopes = Column(ARRAY(Text), nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), default=datetime.now)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
 
-    user = relationship("User", back_populates="api_keys")
+    user = relationship("User")
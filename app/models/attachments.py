@@ -2,7 +2,7 @@
 # app/models/attachments.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,12 +10,15 @@ from app.core.database import Base
 
 class Attachment(Base):
     """Blob Storage 上のファイルに紐づくメタデータ"""
+    # ユーザー別一覧のキーセットページング用
+    __table_args__ = (Index("ix_attachment_user_id_created_at_id", "user_id", "created_at", "id"),)
+
     id          = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id     = Column(UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"))
+    user_id     = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     filename    = Column(String(255), nullable=False)
     blob_path   = Column(String(500), nullable=False, unique=True)
     mime_type   = Column(String(80),  nullable=False)
     size_bytes  = Column(String(40),  nullable=False)
     created_at  = Column(DateTime, default=datetime.now)
 
-    user = relationship("User", back_populates="attachments")
+    user = relationship("User")
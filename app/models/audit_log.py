@@ -0,0 +1,19 @@
+# app/models/audit_log.py
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+class AuditLog(Base):
+    """
+    管理操作などの監査ログ（roro.audit_logs。テーブルは initDDL.sql で作成済み）。
+    user_id は操作したユーザー（システム処理の場合は NULL）。
+    """
+    __tablename__ = "audit_logs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    action = Column(String(100), nullable=False)  # e.g., "user_deactivated"
+    description = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
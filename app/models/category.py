@@ -9,3 +9,4 @@ class Category(Base):
     name = Column(String, unique=True, nullable=False)
 
     submissions = relationship("SurveySubmission", back_populates="category")
+    questions = relationship("Question", back_populates="category")
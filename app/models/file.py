@@ -21,4 +21,4 @@ class File(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     # ユーザーとのリレーションを定義
-    user = relationship("User", back_populates="files")
+    user = relationship("User")
@@ -0,0 +1,16 @@
+# app/models/kpi_counter.py
+
+from sqlalchemy import Column, String, BigInteger, DateTime, func
+
+from app.core.database import Base
+
+class KpiCounter(Base):
+    """
+    管理ダッシュボード用の集計値（1 指標 = 1 行）。
+    users / report_logs の文単位トリガーで増減し、定期ジョブで実数と突き合わせる。
+    """
+    __tablename__ = "kpi_counters"
+
+    name = Column(String(50), primary_key=True)  # e.g., "users_total", "users_active"
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
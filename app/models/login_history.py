@@ -1,16 +1,20 @@
 # ---------- モデル ----------
 import uuid, ipaddress
 from datetime import datetime
-from sqlalchemy import Column, DateTime, String, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, String, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, INET
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class LoginHistory(Base):
+    # ユーザー別一覧のキーセットページング用
+    __table_args__ = (Index("ix_login_history_user_id_logged_at_id", "user_id", "logged_at", "id"),)
+
     id         = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id    = Column(UUID(as_uuid=True), ForeignKey("user.id"))
+    user_id    = Column(UUID(as_uuid=True), ForeignKey("users.id"))  # 存在しないユーザー名での失敗は NULL
     ip_address = Column(INET, nullable=False)
     user_agent = Column(String(300))
+    is_successful = Column(Boolean, nullable=False, default=True)
     logged_at  = Column(DateTime, default=datetime.now)
 
-    user = relationship("User", back_populates="login_histories")
+    user = relationship("User")
@@ -0,0 +1,20 @@
+# app/models/payment.py
+
+from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+class Payment(Base):
+    """
+    決済履歴（roro.payments。テーブルは initDDL.sql で作成済み）。
+    """
+    __tablename__ = "payments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(10), nullable=False)
+    payment_date = Column(DateTime, server_default=func.now())
+    payment_method = Column(String(50))
+    status = Column(String(20), nullable=False)  # e.g., "Completed"
@@ -1,6 +1,6 @@
 # app/models/pet.py
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,6 +14,10 @@ class Pet(Base):
     各ペットはユーザー（飼い主）に属し、種別や年齢などの基本情報を持つ。
     """
     __tablename__ = "pets"
+    __table_args__ = (
+        # ユーザー別一覧のキーセットページング用
+        Index("ix_pets_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     # 主キー: UUID形式のIDを自動生成
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
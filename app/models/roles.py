@@ -1,18 +1,19 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, List
 from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core.database import Base
 
 if TYPE_CHECKING:
     from app.models.user import User
 
-# 中間テーブル: ユーザーとロールの多対多関係を定義
+# 中間テーブル: ユーザーとロールの多対多関係を定義（User 側もこの定義を共有する）
 user_roles = Table(
     "user_roles",
     Base.metadata,
-    Column("user_id", ForeignKey("users.id"), primary_key=True),
-    Column("role_id", ForeignKey("roles.id"), primary_key=True),
+    Column("user_id", PG_UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True),
+    Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
 )
 
 class Role(Base):
@@ -29,7 +30,7 @@ class Role(Base):
         "User",
         secondary=user_roles,
         back_populates="roles",
-        lazy="joined",
+        lazy="raise",  # ロール一覧で全ユーザーを読み込まない
     )
 
 
@@ -10,5 +10,5 @@ class SurveySubmission(Base):
     category_id = Column(String, ForeignKey("categories.id"), nullable=False)
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    user = relationship("User", back_populates="surveys")
+    user = relationship("User")
     category = relationship("Category", back_populates="submissions")
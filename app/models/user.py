@@ -6,11 +6,12 @@ from typing import TYPE_CHECKING, List
 from uuid import UUID, uuid4
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Table
+from sqlalchemy import DDL, Boolean, DateTime, Index, String, event
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
+from app.models.roles import user_roles
 
 # Forward reference のための型チェック（循環インポート防止）
 if TYPE_CHECKING:
@@ -19,16 +20,6 @@ if TYPE_CHECKING:
     from app.models.user_event_log import UserEventLog
     from app.models.pet import Pet  # 追加：ユーザーが飼育するペットの定義
 
-# ---------------------------------------
-# 中間テーブル：ユーザーとロールの多対多関係を定義
-# ---------------------------------------
-user_roles = Table(
-    "user_roles",
-    Base.metadata,
-    Column("user_id", PG_UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True),
-    Column("role_id", PG_UUID(as_uuid=True), ForeignKey("roles.id"), primary_key=True),
-)
-
 # ---------------------------------------
 # ユーザー本体モデル定義
 # ---------------------------------------
@@ -40,6 +31,14 @@ class User(Base):
     - イベントログ、ロール、IDプロバイダーとの関連を持つ
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # 一覧のキーセットページング（ORDER BY created_at DESC, id DESC）用
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # 管理者検索（ILIKE / similarity）用のトライグラム GIN インデックス（pg_trgm はテーブル作成前に有効化する）
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("ix_users_display_name_trgm", "display_name", postgresql_using="gin", postgresql_ops={"display_name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
 
     # 主キー：UUID
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -47,6 +46,12 @@ class User(Base):
     # メールアドレス（ユニーク必須）
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
 
+    # ログインID（パスワード認証ユーザーのみ。OIDC のみのユーザーは None）
+    username: Mapped[str | None] = mapped_column(String(50), unique=True, nullable=True)
+
+    # bcrypt ハッシュ（パスワード認証ユーザーのみ）
+    hashed_password: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
     # 任意の表示名（ニックネームなど）
     display_name: Mapped[str] = mapped_column(String(100), nullable=True)
 
@@ -62,6 +67,11 @@ class User(Base):
     # 最終ログイン日時（Noneの場合は未ログイン）
     last_login_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    # -----------------------------------
+    # リレーションはすべて lazy="raise"（既定では読み込まない）。
+    # 必要なクエリだけが services.user_loader_profiles のプロファイルで明示的に読み込む。
+    # -----------------------------------
+
     # -----------------------------------
     # 関連：ロール（多対多）
     # -----------------------------------
@@ -69,7 +79,7 @@ class User(Base):
         "Role",
         secondary=user_roles,
         back_populates="users",  # Role側にある users リレーションと対応
-        lazy="joined",           # JOINして一括読み込み
+        lazy="raise",
     )
 
     # -----------------------------------
@@ -79,7 +89,7 @@ class User(Base):
         "UserAuthProvider",
         back_populates="user",
         cascade="all, delete-orphan",  # 親が削除されたら子も削除
-        lazy="joined",
+        lazy="raise",
     )
 
     # -----------------------------------
@@ -89,7 +99,7 @@ class User(Base):
     event_logs: Mapped[List[UserEventLog]] = relationship(
         "UserEventLog",
         back_populates="user",
-        lazy="selectin"  # N+1防止のためselectinロード
+        lazy="raise",
     )
 
     # -----------------------------------
@@ -100,5 +110,14 @@ class User(Base):
         "Pet",
         back_populates="user",           # Petモデルのuserフィールドと連携
         cascade="all, delete-orphan",    # ユーザー削除時にペットも削除
-        lazy="selectin"                  # N+1防止（JOINせず効率取得）
+        passive_deletes=True,            # 削除は DB の ON DELETE CASCADE に任せる（読み込まない）
+        lazy="raise",
     )
+
+# create_all でもトライグラム GIN インデックスを作成できるよう、テーブル作成前に pg_trgm を有効化する
+# （本番は Alembic マイグレーションで同じ拡張を作成する）
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -13,4 +13,4 @@ class UserSetting(Base):
     receive_notifications = Column(Boolean, default=True)
     theme = Column(String, default="light")
 
-    user = relationship("User", back_populates="settings")
+    user = relationship("User")
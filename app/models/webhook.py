@@ -16,4 +16,4 @@ class Webhook(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.now)
 
-    user = relationship("User", back_populates="webhooks")
+    user = relationship("User")
@@ -1,9 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
 class APIKeyBase(BaseModel):
-    key: str
+    service_name: str = Field(..., max_length=60)
+    scopes: List[str] = []
 
 class APIKeyCreate(APIKeyBase):
     pass
@@ -11,8 +13,11 @@ class APIKeyCreate(APIKeyBase):
 class APIKey(APIKeyBase):
     id: UUID
     user_id: UUID
-    is_active: bool
     created_at: datetime
+    last_used_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+class APIKeyCreated(APIKey):
+    # 平文のキーは発行時のレスポンスでのみ返す（サーバーにはハッシュのみ保存）
+    key: str
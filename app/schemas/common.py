@@ -1,6 +1,11 @@
 # app/schemas/common.py
 
-from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+T = TypeVar("T")
 
 class PasswordChangeRequest(BaseModel):
     """
@@ -8,3 +13,33 @@ class PasswordChangeRequest(BaseModel):
     """
     old_password: str = Field(..., min_length=8, description="現在のパスワード")
     new_password: str = Field(..., min_length=8, description="新しいパスワード")
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    キーセット方式の一覧レスポンス。next_cursor が null なら最終ページ。
+    """
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="次ページ取得時に cursor へ指定する値")
+
+    # app.utils.pagination.Page（属性アクセス）からそのまま直列化する
+    model_config = ConfigDict(from_attributes=True)
+
+# 一括 API で 1 リクエストに含められる最大件数
+MAX_BULK_ITEMS = 10_000
+
+class BulkItemResult(BaseModel):
+    """
+    一括 API の項目ごとの結果（index はリクエスト内の位置）。
+    """
+    index: int = Field(..., description="リクエスト内の位置（0 始まり）")
+    id: Optional[UUID] = Field(None, description="対象のID")
+    status: str = Field(..., description="created / updated / granted / exists / not_found / conflict / duplicate")
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    """
+    一括 API のレスポンス。全件を 1 トランザクションで処理した結果。
+    """
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
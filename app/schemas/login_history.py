@@ -7,6 +7,7 @@ class LoginHistoryOut(BaseModel):
     id         : UUID
     ip_address : IPvAnyAddress
     user_agent : str | None
+    is_successful : bool
     logged_at  : datetime
 
     class Config:
@@ -1,9 +1,12 @@
 # app/schemas/pet.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
+from app.schemas.common import MAX_BULK_ITEMS
+
 # 入力共通の基本情報
 class PetBase(BaseModel):
     name: str       # 名前
@@ -19,6 +22,22 @@ class PetCreate(PetBase):
 class PetUpdate(PetBase):
     pass
 
+# 一括登録の 1 件分（id を指定すると再送しても二重登録されない）
+class PetBulkCreateItem(PetCreate):
+    id: Optional[UUID] = None
+
+# 一括更新の 1 件分
+class PetBulkUpdateItem(PetUpdate):
+    id: UUID
+
+# 一括登録リクエスト
+class PetBulkCreate(BaseModel):
+    items: List[PetBulkCreateItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+# 一括更新リクエスト
+class PetBulkUpdate(BaseModel):
+    items: List[PetBulkUpdateItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
 # 応答用（DB取得用）
 class PetRead(PetBase):
     id: UUID
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List
 from uuid import UUID
 
+from app.schemas.common import MAX_BULK_ITEMS
+
 class RoleCreate(BaseModel):
     """
     ロール作成時のリクエストスキーマを定義します。
@@ -8,10 +11,24 @@ class RoleCreate(BaseModel):
     slug: str
     name: str
 
-class RoleRead(RoleCreate):
+class RoleRead(BaseModel):
     """
     ロール情報の読み取り用スキーマを定義します。
     """
-    id: UUID
+    id: int
+    name: str
 
     model_config = ConfigDict(from_attributes=True)
+
+class RoleGrant(BaseModel):
+    """
+    ユーザーへのロール付与 1 件分を定義します。
+    """
+    user_id: UUID
+    role_id: int
+
+class RoleGrantBulk(BaseModel):
+    """
+    ロールの一括付与リクエストを定義します。
+    """
+    grants: List[RoleGrant] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
@@ -37,3 +37,22 @@ class SurveyRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+# アンケートカタログ（カテゴリ → 設問 → 選択肢）の応答形式（API ドキュメント用）
+class CatalogChoice(BaseModel):
+    id: str
+    text: str
+
+class CatalogQuestion(BaseModel):
+    id: str
+    text: str
+    choices: List[CatalogChoice]
+
+class CatalogCategory(BaseModel):
+    id: str
+    name: str
+    questions: List[CatalogQuestion]
+
+class SurveyCatalogRead(BaseModel):
+    version: str
+    categories: List[CatalogCategory]
@@ -1,5 +1,8 @@
-from typing import Annotated
-from pydantic import BaseModel, EmailStr, StringConstraints
+from typing import Annotated, List
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints
+
+from app.schemas.common import MAX_BULK_ITEMS
 
 # ユーザー名の制約: 最小3文字、最大50文字
 UsernameStr = Annotated[str, StringConstraints(min_length=3, max_length=50)]
@@ -24,11 +27,15 @@ class UserRead(UserBase):
     """
     ユーザー情報の読み取り用スキーマを定義します。
     """
-    id: int                # ユーザーID
+    id: UUID               # ユーザーID
+    # 保存済みの値は登録時に検証済みのため、読み取り時は形式チェック（1 件ごとに重い）を省く
+    email: str = Field(..., json_schema_extra={"format": "email"})
     is_active: bool        # アクティブ状態
 
-    class Config:
-        orm_mode = True    # ORMオブジェクトとの互換性を有効化
-
-
+    model_config = ConfigDict(from_attributes=True)  # ORMオブジェクトとの互換性を有効化
 
+class UserBulkStatusRequest(BaseModel):
+    """
+    ユーザーの一括無効化・復元リクエストを定義します。
+    """
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
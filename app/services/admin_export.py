@@ -0,0 +1,170 @@
+# app/services/admin_export.py
+
+"""
+管理者向けエクスポート（/admin/export/{entity}）。
+
+サーバーサイドカーソル（AsyncSession.stream + yield_per）で export_yield_per 件ずつ取り出し、
+取り出した分を NDJSON / CSV に変換して送り出す。テーブル全体をメモリに載せないため、
+100 万行でもメモリ使用量は 1 バッチ分で一定。
+
+* ORM オブジェクトではなく列のタプルを読む（アイデンティティマップに載せない）
+* 並び順は (時刻列, id)。期間（since 以上 / until 未満）と項目ごとの条件で絞り込める
+* セッションはストリームの中で開く。FastAPI の依存関係（get_db）のセッションは
+  レスポンス本文の送信前に閉じられるため使えない
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.models.feedback import Feedback
+from app.models.login_history import LoginHistory
+from app.models.payment import Payment
+from app.models.user import User
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+# CSV インジェクション（数式の埋め込み）対策でエスケープする先頭文字
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv; charset=utf-8",
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """
+    エクスポート対象 1 種類分の定義（出力列・期間の基準列・指定できる条件）。
+    """
+    columns: Tuple[Any, ...]
+    time_column: Any
+    id_column: Any
+    filters: Dict[str, Any]
+
+    @property
+    def names(self) -> List[str]:
+        return [column.key for column in self.columns]
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "users": ExportSpec(
+        # hashed_password は出力しない
+        columns=(
+            User.id, User.username, User.email, User.display_name, User.is_active,
+            User.created_at, User.updated_at, User.last_login_at,
+        ),
+        time_column=User.created_at,
+        id_column=User.id,
+        filters={"is_active": User.is_active},
+    ),
+    "login_history": ExportSpec(
+        columns=(
+            LoginHistory.id, LoginHistory.user_id, LoginHistory.ip_address, LoginHistory.user_agent,
+            LoginHistory.is_successful, LoginHistory.logged_at,
+        ),
+        time_column=LoginHistory.logged_at,
+        id_column=LoginHistory.id,
+        filters={"user_id": LoginHistory.user_id, "is_successful": LoginHistory.is_successful},
+    ),
+    "feedback": ExportSpec(
+        columns=(
+            Feedback.id, Feedback.user_id, Feedback.category, Feedback.message, Feedback.handled,
+            Feedback.created_at,
+        ),
+        time_column=Feedback.created_at,
+        id_column=Feedback.id,
+        filters={"user_id": Feedback.user_id, "category": Feedback.category, "handled": Feedback.handled},
+    ),
+    "payments": ExportSpec(
+        columns=(
+            Payment.id, Payment.user_id, Payment.amount, Payment.currency, Payment.payment_date,
+            Payment.payment_method, Payment.status,
+        ),
+        time_column=Payment.payment_date,
+        id_column=Payment.id,
+        filters={"user_id": Payment.user_id, "status": Payment.status, "currency": Payment.currency},
+    ),
+}
+
+
+def build_query(
+    spec: ExportSpec,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Select:
+    """
+    出力列の SELECT に期間と条件を付ける。spec にない条件名は ValueError。
+    """
+    stmt = select(*spec.columns)
+    if since is not None:
+        stmt = stmt.where(spec.time_column >= since)
+    if until is not None:
+        stmt = stmt.where(spec.time_column < until)
+    for name, value in (filters or {}).items():
+        if name not in spec.filters:
+            raise ValueError(name)
+        stmt = stmt.where(spec.filters[name] == value)
+    return stmt.order_by(spec.time_column, spec.id_column)
+
+
+def encode_ndjson(names: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    1 行 1 オブジェクトの JSON。Decimal / IP アドレスなど orjson が扱えない値は文字列にする。
+    """
+    return b"".join(orjson.dumps(dict(zip(names, row)), default=str) + b"\n" for row in rows)
+
+
+def _escape_formula(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    CSV に変換する。表計算ソフトで数式として評価されないよう、
+    記号で始まる文字列（ユーザー入力のフィードバック本文など）は先頭に ' を付ける。
+    数値・日時などの文字列以外の値はそのまま出力する。
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([_escape_formula(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(
+    spec: ExportSpec,
+    stmt: Select,
+    fmt: str,
+    bind: AsyncEngine,
+    *,
+    yield_per: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    stmt の結果を yield_per 件ずつ変換して返す。CSV は先頭にヘッダー行を付ける。
+    クライアントが切断するとジェネレーターが閉じられ、カーソルとセッションも閉じる。
+    """
+    from app.core.database import async_session  # 循環 import 回避のため遅延 import
+
+    yield_per = yield_per or get_settings().export_yield_per
+    names = spec.names
+    if fmt == CSV:
+        # Excel で文字化けしないよう BOM を付ける
+        yield b"\xef\xbb\xbf" + encode_csv([names])
+    async with async_session(bind=bind) as session:
+        result = await session.stream(stmt.execution_options(yield_per=yield_per))
+        async for partition in result.partitions():
+            yield encode_csv(partition) if fmt == CSV else encode_ndjson(names, partition)
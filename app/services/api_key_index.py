@@ -0,0 +1,238 @@
+# app/services/api_key_index.py
+
+"""
+API キー（X-API-Key）認証のためのプロセス内インデックスと利用時刻の記録。
+
+* キーの SHA-256 → (キーID・ユーザーID・サービス名・スコープ) を TTL 付きでキャッシュする
+  所有ユーザーが無効（is_active = false）のキーは登録しない
+* 存在しないキーも短い TTL で「該当なし」としてキャッシュし、総当たりで DB を叩かせない
+* last_used_at はリクエストごとに UPDATE せず、キーID 単位で最新時刻だけをメモリに保持し
+  api_key_last_used_flush_interval 秒ごとにまとめて UPDATE する
+
+定常状態の認証はハッシュ計算 1 回と辞書参照のみで、DB への往復は発生しない。
+キャッシュはワーカープロセス単位のため、他ワーカーでの削除の反映は TTL 経過後となる。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.core.config import get_settings
+from app.core.security import hash_api_key
+from app.models.api_key import APIKey
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# 「該当キーなし」を表すキャッシュ値
+_NOT_FOUND = object()
+
+
+@dataclass(frozen=True)
+class ApiKeyPrincipal:
+    """
+    API キーで認証された呼び出し元。ORM オブジェクトではないため遅延ロードは発生しない。
+    """
+    key_id: UUID
+    user_id: UUID
+    service_name: str
+    scopes: FrozenSet[str]
+
+    def has_scopes(self, *required: str) -> bool:
+        return set(required).issubset(self.scopes)
+
+
+class ApiKeyIndex:
+    """
+    key_hash をキーにした ApiKeyPrincipal のキャッシュ。
+    - ttl: 有効なキーを保持する秒数
+    - negative_ttl: 存在しない（または無効な）キーを「該当なし」として保持する秒数
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float) -> None:
+        self._cache: ExpiringLRUCache[str, Union[ApiKeyPrincipal, object]] = ExpiringLRUCache(
+            maxsize=maxsize, ttl=ttl
+        )
+        self.negative_ttl = negative_ttl
+
+    async def resolve(self, raw_key: str) -> Optional[ApiKeyPrincipal]:
+        """
+        平文キーから呼び出し元を返す。キャッシュに無い場合のみ 1 クエリで取得する。
+        """
+        key_hash = hash_api_key(raw_key)
+        cached = self._cache.get(key_hash)
+        if cached is _NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached  # type: ignore[return-value]
+
+        from app.core.database import async_session  # 循環 import 回避のため遅延 import
+
+        async with async_session() as db:
+            principal = await self._load(db, key_hash)
+        if principal is None:
+            self._cache.set(key_hash, _NOT_FOUND, ttl=self.negative_ttl)
+        else:
+            self._cache.set(key_hash, principal)
+        return principal
+
+    @staticmethod
+    async def _load(db: AsyncSession, key_hash: str) -> Optional[ApiKeyPrincipal]:
+        result = await db.execute(
+            select(APIKey.id, APIKey.user_id, APIKey.service_name, APIKey.scopes)
+            .join(User, User.id == APIKey.user_id)
+            .where(APIKey.key_hash == key_hash, User.is_active == True)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return ApiKeyPrincipal(
+            key_id=row.id,
+            user_id=row.user_id,
+            service_name=row.service_name,
+            scopes=frozenset(row.scopes or ()),
+        )
+
+    def invalidate(self, key_hash: str) -> None:
+        """
+        キーの削除・スコープ変更時に呼び出す。
+        """
+        self._cache.pop(key_hash)
+
+    def invalidate_user(self, user_id: UUID, key_hashes: Iterable[str] = ()) -> None:
+        """
+        ユーザーの論理削除・復元時に、そのユーザーのキーをすべて破棄する。
+        「該当なし」のエントリにはユーザーIDが無いため、復元時は所有キーのハッシュ（key_hashes）を
+        渡して無効化中に付いた否定キャッシュも破棄する。
+        """
+        self.invalidate_users({user_id}, key_hashes)
+
+    def invalidate_users(self, user_ids: AbstractSet[UUID], key_hashes: Iterable[str] = ()) -> None:
+        """
+        複数ユーザーのキーをまとめて破棄する（一括更新用。キャッシュの走査は 1 回）。
+        """
+        if user_ids:
+            for key, value in self._cache.items():
+                if isinstance(value, ApiKeyPrincipal) and value.user_id in user_ids:
+                    self._cache.pop(key)
+        for key_hash in key_hashes:
+            self._cache.pop(key_hash)
+
+    def stats(self) -> Dict[str, object]:
+        return self._cache.stats()
+
+
+class LastUsedRecorder:
+    """
+    API キーの last_used_at をまとめて書き込むレコーダー。
+    同じキーの記録はフラッシュまで最新時刻 1 件に集約されるため、
+    書き込み件数は呼び出し回数ではなく「間隔内に使われたキー数」に比例する。
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._pending: Dict[UUID, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.recorded = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def touch(self, key_id: UUID) -> None:
+        """
+        利用時刻を記録する（I/O なし）。
+        """
+        self._pending[key_id] = datetime.now(timezone.utc)
+        self.recorded += 1
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="api-key-last-used")
+
+    async def stop(self) -> None:
+        """
+        定期フラッシュを止め、未書き込みの時刻を書き出す。
+        """
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush_once()
+
+    async def flush_once(self) -> int:
+        """
+        集約済みの時刻を主キー指定の一括 UPDATE で書き込む。書き込んだ件数を返す。
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        rows = [{"id": key_id, "last_used_at": used_at} for key_id, used_at in batch.items()]
+
+        from app.core.database import async_session  # 循環 import 回避のため遅延 import
+
+        try:
+            async with async_session() as db:
+                await db.execute(update(APIKey), rows)
+                await db.commit()
+        except Exception:
+            self.failed += len(rows)
+            logger.exception("API キーの last_used_at 更新に失敗しました (%d 件)", len(rows))
+            return 0
+        self.flushes += 1
+        self.written += len(rows)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush_once()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+@lru_cache()
+def get_api_key_index() -> ApiKeyIndex:
+    """
+    プロセス内で共有する ApiKeyIndex を返す。
+    """
+    settings = get_settings()
+    index = ApiKeyIndex(
+        maxsize=settings.api_key_cache_size,
+        ttl=settings.api_key_cache_ttl,
+        negative_ttl=settings.api_key_negative_cache_ttl,
+    )
+    metrics.register("api_key_index", index.stats)
+    return index
+
+
+@lru_cache()
+def get_last_used_recorder() -> LastUsedRecorder:
+    """
+    プロセス内で共有する LastUsedRecorder を返す。
+    """
+    recorder = LastUsedRecorder(flush_interval=get_settings().api_key_last_used_flush_interval)
+    metrics.register("api_key_last_used", recorder.stats)
+    return recorder
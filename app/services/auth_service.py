@@ -1,30 +1,47 @@
+from dataclasses import dataclass
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from app.crud.login_history import record_login
+from app.models.roles import Role, user_roles
 from app.models.user import User
-from passlib.context import CryptContext
+from app.services.password_hasher import verify_and_update_password
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 from app.core.config import get_settings
 import logging
 
-# パスワードのハッシュ化に使用するコンテキスト
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # アプリ設定の取得
 settings = get_settings()
 SECRET_KEY = settings.secret_key or "unsafe-default"  # 本番ではKeyVaultなどを利用
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-async def authenticate_user(db: AsyncSession, username: str, password: str) -> User | None:
+@dataclass(frozen=True)
+class LoggedInUser:
+    """
+    ログイン成功時にトークン発行へ渡す最小限のユーザー情報。
+    """
+    id: UUID
+    is_admin: bool
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> tuple[UUID | None, bool, str | None]:
     """
     ユーザー名とパスワードを用いてユーザーを認証します。
+    - 取得するのは id とハッシュのみ（リレーションは読み込まない）
+    - bcrypt の照合はハッシュ専用プールで実行します
+    - 保存済みハッシュのコストが現行方針と異なる場合は再ハッシュした値も返します
+    戻り値は (ユーザーID（存在しなければ None）, 照合結果, 新ハッシュ（更新不要なら None）)。
     """
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
-    if user and pwd_context.verify(password, user.hashed_password):
-        return user
-    return None
+    result = await db.execute(
+        select(User.id, User.hashed_password).where(User.username == username, User.is_active == True)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None, False, None
+    verified, new_hash = await verify_and_update_password(password, row.hashed_password)
+    return row.id, verified, new_hash
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None, secret_key: str = SECRET_KEY, algorithm: str = ALGORITHM) -> str:
     """
@@ -47,9 +64,45 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None, secr
         logging.exception("JWT生成に失敗しました")
         raise RuntimeError("アクセストークンの生成に失敗しました") from e
 
-async def update_last_login(db: AsyncSession, user_id: int):
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user:
-        user.last_login_at = datetime.utcnow()
-        await db.commit()
\ No newline at end of file
+async def update_last_login(db: AsyncSession, user_id: UUID, new_hash: str | None = None) -> LoggedInUser | None:
+    """
+    last_login_at を UPDATE … RETURNING で更新し、トークン発行に必要な情報を同時に取得する。
+    管理者判定（admin ロールの有無）も同じ文のサブクエリで求める。
+    new_hash が渡された場合はハッシュの置き換えも同じ UPDATE で行う。
+    """
+    is_admin = (
+        select(user_roles.c.user_id)
+        .join(Role, Role.id == user_roles.c.role_id)
+        .where(user_roles.c.user_id == User.id, Role.name == "admin")
+        .exists()
+    )
+    values = {"last_login_at": datetime.utcnow()}
+    if new_hash is not None:
+        values["hashed_password"] = new_hash
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .returning(User.id, is_admin.label("is_admin"))
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    await db.commit()
+    return LoggedInUser(id=row.id, is_admin=row.is_admin) if row else None
+
+async def login(db: AsyncSession, username: str, password: str, *, ip: str, ua: str | None) -> LoggedInUser | None:
+    """
+    ログイン処理のパイプライン。
+    1. id とハッシュのみを SELECT して照合
+    2. 成功時は UPDATE … RETURNING 1 回で last_login_at 更新と管理者判定
+       （旧コストのハッシュはこの UPDATE で透過的に再ハッシュ後の値へ置き換える）
+    3. ログイン履歴（失敗を含む）はバッファへ積み、バックグラウンドで複数行 INSERT
+    """
+    user_id, verified, new_hash = await authenticate_user(db, username, password)
+    if not verified:
+        record_login(user_id=user_id, ip=ip, ua=ua, success=False)
+        return None
+
+    user = await update_last_login(db, user_id, new_hash)
+    record_login(user_id=user_id, ip=ip, ua=ua, success=user is not None)
+    return user
@@ -0,0 +1,136 @@
+# app/services/identity_cache.py
+
+"""
+外部 ID（provider, provider_subject）→ ユーザー識別情報 の解決キャッシュ。
+
+認証のたびに User とリレーション（roles / auth_providers / event_logs / pets）を
+読み込むのは過剰なため、認可判定に必要な最小限の射影
+（ユーザーID・アクティブ状態・ロール名）だけを 1 クエリで取得し TTL 付きで保持する。
+
+論理削除・復元・ロール付与など識別情報を変える書き込みでは
+invalidate_user() で明示的に破棄する。キャッシュはワーカープロセス単位のため、
+他ワーカーへの反映は TTL（identity_cache_ttl）経過後となる。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.core.config import get_settings
+from app.models.roles import Role
+from app.models.user import User
+from app.models.user_auth_provider import UserAuthProvider
+
+IdentityKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class AuthIdentity:
+    """
+    認証済みユーザーの軽量な射影。ORM オブジェクトではないため遅延ロードは発生しない。
+    """
+    id: UUID
+    is_active: bool
+    roles: FrozenSet[str]
+
+    @property
+    def is_admin(self) -> bool:
+        return "admin" in self.roles
+
+
+class IdentityCache:
+    """
+    (provider, provider_subject) をキーにした AuthIdentity の TTL キャッシュ。
+    無効化はユーザーID単位（管理操作のみで頻度が低いため全件走査で行う。一括更新は 1 回の走査にまとめる）。
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache: ExpiringLRUCache[IdentityKey, AuthIdentity] = ExpiringLRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def resolve(self, db: AsyncSession, provider: str, provider_subject: str) -> Optional[AuthIdentity]:
+        """
+        識別情報を返す。キャッシュに無い場合のみ 1 クエリで取得する。
+        該当ユーザーが存在しない場合は None（新規登録直後に備えキャッシュしない）。
+        """
+        key = (provider, provider_subject)
+        identity = self._cache.get(key)
+        if identity is not None:
+            return identity
+
+        result = await db.execute(
+            select(
+                User.id,
+                User.is_active,
+                func.array_remove(func.array_agg(Role.name), None),
+            )
+            .join(UserAuthProvider, UserAuthProvider.user_id == User.id)
+            .outerjoin(User.roles)
+            .where(
+                UserAuthProvider.provider == provider,
+                UserAuthProvider.provider_subject == provider_subject,
+            )
+            .group_by(User.id, User.is_active)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        user_id, is_active, role_names = row
+        identity = AuthIdentity(id=user_id, is_active=bool(is_active), roles=frozenset(role_names or ()))
+        self._cache.set(key, identity)
+        return identity
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        指定ユーザーのキャッシュをすべて破棄する。
+        """
+        self.invalidate_users({user_id})
+
+    def invalidate_users(self, user_ids: AbstractSet[UUID]) -> None:
+        """
+        複数ユーザーのキャッシュをまとめて破棄する（一括更新用。キャッシュの走査は 1 回）。
+        """
+        if not user_ids:
+            return
+        for key, identity in self._cache.items():
+            if identity.id in user_ids:
+                self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, object]:
+        return self._cache.stats()
+
+
+@lru_cache()
+def get_identity_cache() -> IdentityCache:
+    """
+    プロセス内で共有する IdentityCache を返す。
+    """
+    settings = get_settings()
+    cache = IdentityCache(maxsize=settings.identity_cache_size, ttl=settings.identity_cache_ttl)
+    metrics.register("identity_cache", cache.stats)
+    return cache
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """
+    書き込み処理（論理削除・復元・ロール付与など）から呼び出す無効化フック。
+    """
+    get_identity_cache().invalidate_user(user_id)
+
+
+def invalidate_users(user_ids: AbstractSet[UUID]) -> None:
+    """
+    一括更新（ユーザーの一括無効化・ロールの一括付与など）から呼び出す無効化フック。
+    """
+    get_identity_cache().invalidate_users(user_ids)
@@ -0,0 +1,184 @@
+# app/services/password_hasher.py
+
+"""
+パスワードハッシュ（bcrypt）専用の実行サービス。
+
+bcrypt の hash / verify は 1 回あたり 100〜300ms の CPU を消費するため、
+async ハンドラ内で直接呼ぶとワーカーのイベントループ全体が停止する。
+本サービスは上限付きのスレッドプールで計算を行い、
+待ち行列が上限に達した場合は 503 を即時返却（バックプレッシャー）する。
+
+bcrypt の C 実装は計算中に GIL を解放するため、スレッドプールでも並列に実行される。
+コスト（rounds）は app.core.password_policy の共有方針に従い、
+hash / verify の所要時間はヒストグラムとして /admin/metrics に出力する。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.password_policy import get_password_context
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class PasswordHasher:
+    """
+    上限付きスレッドプールで bcrypt を実行するハッシュサービス。
+    - max_workers: 同時に計算するスレッド数
+    - max_queue: 実行待ちで保持できる要求数（超過分は 503 で即時拒否）
+    カウンタはイベントループのスレッドからのみ更新されるためロック不要。
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int) -> None:
+        self._context = context
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pwd-hash")
+        self._pending = 0      # 実行中＋待機中の要求数
+        self._completed = 0    # 完了した要求数
+        self._rejected = 0     # キュー満杯で拒否した要求数
+        self._peak_queue = 0   # 観測した最大待機数
+        # 操作別の所要時間（ミリ秒）。キュー待ちを含まない計算時間のみを記録する
+        self._latency: Dict[str, metrics.Histogram] = {
+            "hash": metrics.Histogram(),
+            "verify": metrics.Histogram(),
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """スレッドの空きを待っている要求数。"""
+        return max(0, self._pending - self._max_workers)
+
+    async def _run(self, op: str, fn: Callable[..., T], *args: Any) -> T:
+        """
+        計算をプールへ投入する。待機数が上限に達していれば 503 を送出する。
+        計算時間はスレッド内で計測し、ループ側で op 別のヒストグラムに記録する。
+        """
+        if self._pending >= self._max_workers + self._max_queue:
+            self._rejected += 1
+            logger.warning("パスワードハッシュキュー満杯: pending=%d", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="認証処理が混雑しています。しばらくしてから再試行してください。",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        self._peak_queue = max(self._peak_queue, self.queue_depth)
+        loop = asyncio.get_running_loop()
+        try:
+            result, elapsed_ms = await loop.run_in_executor(self._executor, _timed, fn, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+        self._latency[op].observe(elapsed_ms)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        プレーンなパスワードをハッシュ化して返す。
+        """
+        return await self._run("hash", self._context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str | None) -> bool:
+        """
+        平文パスワードとハッシュ値を照合する。ハッシュ未設定のユーザーは常に不一致。
+        """
+        if not hashed_password:
+            return False
+        return await self._run("verify", self._context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str | None) -> Tuple[bool, Optional[str]]:
+        """
+        照合し、ハッシュが現行方針（コスト）と異なる場合は新しいハッシュも返す。
+        戻り値は (照合結果, 新ハッシュ（更新不要なら None）)。
+        再ハッシュは照合と同じスレッド内で行うため、プールへの投入は 1 回で済む。
+        """
+        if not hashed_password:
+            return False, None
+        return await self._run("verify", self._context.verify_and_update, password, hashed_password)
+
+    def needs_update(self, hashed_password: str) -> bool:
+        """
+        ハッシュが現行方針と異なる（旧コストなど）場合に True を返す。
+        """
+        return self._context.needs_update(hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キュー深さなどの統計を返す（/admin/metrics 用）。
+        """
+        return {
+            "workers": self._max_workers,
+            "max_queue": self._max_queue,
+            "in_flight": min(self._pending, self._max_workers),
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self._peak_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "bcrypt_rounds": self._context.to_dict().get("bcrypt__rounds"),
+            "latency_ms": {op: hist.snapshot() for op, hist in self._latency.items()},
+        }
+
+    def shutdown(self) -> None:
+        """
+        スレッドプールを停止する（アプリ終了時）。
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    """
+    ワーカースレッド内で fn を実行し、(結果, 所要ミリ秒) を返す。
+    """
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    """
+    プロセス内で共有する PasswordHasher を返す。
+    """
+    settings = get_settings()
+    hasher = PasswordHasher(
+        get_password_context(),
+        max_workers=settings.password_hash_workers,
+        max_queue=settings.password_hash_max_queue,
+    )
+    metrics.register("password_hasher", hasher.stats)
+    return hasher
+
+
+async def hash_password(password: str) -> str:
+    """
+    共有プールでパスワードをハッシュ化する。
+    """
+    return await get_password_hasher().hash(password)
+
+
+async def verify_password(password: str, hashed_password: str | None) -> bool:
+    """
+    共有プールでパスワードを照合する。
+    """
+    return await get_password_hasher().verify(password, hashed_password)
+
+
+async def verify_and_update_password(password: str, hashed_password: str | None) -> Tuple[bool, Optional[str]]:
+    """
+    共有プールで照合し、必要なら再ハッシュした値を返す（ログイン時の透過的なコスト更新用）。
+    """
+    return await get_password_hasher().verify_and_update(password, hashed_password)
@@ -1,51 +1,147 @@
 # app/services/pet_service.py
 
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID, uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import String, Integer, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud.base import CRUDBase
 from app.models.pet import Pet
-from app.schemas.pet import PetCreate, PetUpdate
-from uuid import UUID
+from app.schemas.common import BulkResult
+from app.schemas.pet import PetCreate, PetUpdate, PetBulkCreateItem, PetBulkUpdateItem
+from app.utils import bulk
+from app.utils.pagination import CursorParams, Page, paginate
+
+pets = CRUDBase[Pet, PetCreate](Pet)
+
+# 一括更新で書き換える列
+_BULK_UPDATE_FIELDS = ("name", "species", "breed", "age")
+
+async def get_pets_by_user(
+    db: AsyncSession,
+    user_id: UUID,
+    params: CursorParams,
+    options: Sequence[LoaderOption] = (),
+) -> Page[Pet]:
+    """
+    指定ユーザーが飼っているペットを登録の新しい順にキーセット方式で取得する。
+    options で読み込む列を絞れる（?fields= 用）。
+    """
+    return await paginate(
+        db,
+        select(Pet).options(*options).where(Pet.user_id == user_id),
+        sort_col=Pet.created_at,
+        id_col=Pet.id,
+        params=params,
+    )
 
-async def get_pets_by_user(db: AsyncSession, user_id: UUID):
+async def get_pets_version(db: AsyncSession, user_id: UUID) -> tuple[int, datetime | None]:
     """
-    指定ユーザーが飼っている全ペットを一覧取得する。
+    条件付き GET 用に、ユーザーのペットの (件数, 最終更新日時) だけを集約で取得する。
+    件数は削除の検知用（削除では最終更新日時が変わらないため）。
     """
-    result = await db.execute(select(Pet).where(Pet.user_id == user_id))
-    return result.scalars().all()
+    row = (
+        await db.execute(select(func.count(), func.max(Pet.updated_at)).where(Pet.user_id == user_id))
+    ).one()
+    return row[0], row[1]
 
 async def create_pet(db: AsyncSession, user_id: UUID, data: PetCreate):
     """
     新規ペットを登録する。
-    指定されたユーザーIDに紐づけて保存。
+    指定されたユーザーIDに紐づけて保存（INSERT ... RETURNING の 1 往復）。
     """
-    pet = Pet(user_id=user_id, **data.dict())
-    db.add(pet)
-    await db.commit()
-    await db.refresh(pet)
-    return pet
+    return await pets.create(db, data, user_id=user_id)
 
 async def update_pet(db: AsyncSession, pet_id: UUID, data: PetUpdate):
     """
     既存のペット情報を更新する。
-    指定された pet_id に一致するレコードを変更。
+    指定された pet_id に一致するレコードを UPDATE ... RETURNING で変更し、更新後の行を返す。
     """
-    result = await db.execute(select(Pet).where(Pet.id == pet_id))
-    pet = result.scalar_one_or_none()
-    if pet:
-        for field, value in data.dict().items():
-            setattr(pet, field, value)
-        await db.commit()
-        await db.refresh(pet)
-    return pet
+    return await pets.update_returning(db, pet_id, data.model_dump())
 
 async def delete_pet(db: AsyncSession, pet_id: UUID):
     """
-    指定されたペット（pet_id）を削除する。
+    指定されたペット（pet_id）を DELETE ... RETURNING で削除する。
     存在しない場合は None を返す。
     """
-    result = await db.execute(select(Pet).where(Pet.id == pet_id))
-    pet = result.scalar_one_or_none()
-    if pet:
-        await db.delete(pet)
-        await db.commit()
-    return pet
+    return await pets.delete_returning(db, pet_id)
+
+
+async def bulk_create_pets(db: AsyncSession, user_id: UUID, items: list[PetBulkCreateItem]) -> BulkResult:
+    """
+    ペットを一括登録する（1 トランザクション）。
+    複数行の INSERT ... ON CONFLICT (id) DO NOTHING RETURNING id で書き込み、
+    返ってこなかった id は既存行として扱う（自分のペットなら exists、他人のものなら conflict）。
+    """
+    now = datetime.now()
+    rows = []
+    results = []
+    seen: set[UUID] = set()
+    for index, data in enumerate(items):
+        pet_id = data.id or uuid4()
+        if pet_id in seen:
+            results.append(bulk.item(index, bulk.STATUS_DUPLICATE, pet_id))
+            continue
+        seen.add(pet_id)
+        rows.append({"id": pet_id, "user_id": user_id, "created_at": now, "updated_at": now, **data.model_dump(exclude={"id"})})
+        results.append(bulk.item(index, bulk.STATUS_CREATED, pet_id))
+
+    inserted: set[UUID] = set()
+    for chunk in bulk.chunked(rows, bulk.rows_per_statement(len(rows[0]) if rows else 1)):
+        stmt = insert(Pet).values(list(chunk)).on_conflict_do_nothing(index_elements=[Pet.id]).returning(Pet.id)
+        inserted.update((await db.scalars(stmt)).all())
+
+    skipped = [row["id"] for row in rows if row["id"] not in inserted]
+    if skipped:
+        owned = set((await db.scalars(select(Pet.id).where(Pet.id.in_(skipped), Pet.user_id == user_id))).all())
+        for result in results:
+            if result.status == bulk.STATUS_CREATED and result.id not in inserted:
+                result.status = bulk.STATUS_EXISTS if result.id in owned else bulk.STATUS_CONFLICT
+    await db.commit()
+    return bulk.build_result(results)
+
+async def bulk_update_pets(db: AsyncSession, user_id: UUID, items: list[PetBulkUpdateItem]) -> BulkResult:
+    """
+    自分のペットを一括更新する（1 トランザクション）。
+    UPDATE pets ... FROM (VALUES ...) RETURNING id の 1 文で複数行を書き換え、
+    返ってこなかった id（存在しない・他人のペット）は not_found とする。
+    """
+    rows = []
+    results = []
+    seen: set[UUID] = set()
+    for index, data in enumerate(items):
+        if data.id in seen:
+            results.append(bulk.item(index, bulk.STATUS_DUPLICATE, data.id))
+            continue
+        seen.add(data.id)
+        rows.append(tuple(getattr(data, field) for field in ("id",) + _BULK_UPDATE_FIELDS))
+        results.append(bulk.item(index, bulk.STATUS_UPDATED, data.id))
+
+    now = datetime.now()
+    updated: set[UUID] = set()
+    for chunk in bulk.chunked(rows, bulk.rows_per_statement(len(_BULK_UPDATE_FIELDS) + 1)):
+        source = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("name", String),
+            column("species", String),
+            column("breed", String),
+            column("age", Integer),
+            name="src",
+        ).data(list(chunk))
+        stmt = (
+            update(Pet)
+            .where(Pet.id == source.c.id, Pet.user_id == user_id)
+            .values(**{field: source.c[field] for field in _BULK_UPDATE_FIELDS}, updated_at=now)
+            .returning(Pet.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update((await db.scalars(stmt)).all())
+
+    for result in results:
+        if result.status == bulk.STATUS_UPDATED and result.id not in updated:
+            result.status = bulk.STATUS_NOT_FOUND
+    await db.commit()
+    return bulk.build_result(results)
@@ -1,16 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from app.models.roles import Role
 from app.models.user import User
 from app.schemas.roles import RoleCreate, RoleRead
+from app.services.identity_cache import invalidate_user
+from app.utils.serialization import validate_list
 
 async def get_roles(db: AsyncSession) -> list[RoleRead]:
     """
     すべてのロールを取得します。
     """
     result = await db.execute(select(Role))
-    roles = result.scalars().all()
-    return [RoleRead.from_orm(role) for role in roles]
+    return validate_list(RoleRead, result.scalars().all())
 
 async def create_role(db: AsyncSession, role: RoleCreate) -> RoleRead:
     """
@@ -19,17 +21,18 @@ async def create_role(db: AsyncSession, role: RoleCreate) -> RoleRead:
     db_role = Role(name=role.name)
     db.add(db_role)
     await db.commit()
-    await db.refresh(db_role)
-    return RoleRead.from_orm(db_role)
+    return RoleRead.model_validate(db_role)
 
 async def assign_role(db: AsyncSession, user_id: int, role_id: int) -> None:
     """
     指定されたユーザーにロールを割り当てます。
+    割り当て後は認証用の識別情報キャッシュを破棄します。
     """
-    user_result = await db.execute(select(User).where(User.id == user_id))
+    user_result = await db.execute(select(User).options(selectinload(User.roles)).where(User.id == user_id))
     user = user_result.scalar_one_or_none()
     role_result = await db.execute(select(Role).where(Role.id == role_id))
     role = role_result.scalar_one_or_none()
     if user and role:
         user.roles.append(role)
         await db.commit()
+        invalidate_user(user.id)
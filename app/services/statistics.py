@@ -1,30 +1,203 @@
-# サマリ統計データ取得ロジック
+# app/services/statistics.py
 
-from sqlalchemy import select, func
+"""
+管理ダッシュボードの KPI（サマリ統計）。
+
+リクエストごとに users / report_logs を COUNT(*) すると、件数に比例した
+全件（またはインデックス全体の）走査が毎回発生する。そこで集計値を
+kpi_counters テーブルに保持し、次の 3 段で定数時間の読み出しにしている。
+
+* 増分更新: users / report_logs の文単位トリガー（マイグレーションで作成）が
+  INSERT・DELETE・is_active の変更を同じトランザクション内で kpi_counters に反映する。
+  一括 INSERT でも UPDATE は 1 文につき 1 回で、ORM 以外の書き込みも取りこぼさない
+* 突き合わせ: KpiReconciler が kpi_reconcile_interval 秒ごとに実数を数え直して上書きする
+  （トリガー導入前のデータや手作業での修正によるずれを解消する）
+* 読み出し: kpi_counters の数行を kpi_cache_ttl 秒だけプロセス内にキャッシュする
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.cache import ExpiringLRUCache
+from app.core.config import get_settings
+from app.models.kpi_counter import KpiCounter
+from app.models.report_log import ReportLog
 from app.models.user import User
-from app.models.report import Report  # 仮に report モデルがあると仮定
 
-async def get_dashboard_stats(db: AsyncSession) -> dict:
+logger = logging.getLogger(__name__)
+
+# kpi_counters.name
+USERS_TOTAL = "users_total"
+USERS_ACTIVE = "users_active"
+REPORTS_TOTAL = "reports_total"
+
+# 複数ワーカーが同時に突き合わせを行わないためのアドバイザリロックキー
+RECONCILE_LOCK_KEY = 0x4B5049  # "KPI"
+
+_CACHE_KEY = "dashboard"
+
+
+def _to_stats(counters: Dict[str, int]) -> Dict[str, int]:
+    total_users = counters.get(USERS_TOTAL, 0)
+    active_users = counters.get(USERS_ACTIVE, 0)
+    return {
+        "total_users": total_users,
+        "active_users": active_users,
+        "inactive_users": total_users - active_users,
+        "total_reports": counters.get(REPORTS_TOTAL, 0),
+    }
+
+
+async def load_counters(db: AsyncSession) -> Dict[str, int]:
     """
-    ダッシュボード用の集計統計を返す。
-    - アクティブユーザー数
-    - 非アクティブユーザー数
-    - レポート提出数（例）
+    kpi_counters を主キー順に読み出す（数行のみ）。
+    """
+    result = await db.execute(select(KpiCounter.name, KpiCounter.value))
+    return {name: value for name, value in result.all()}
+
+
+async def count_actuals(db: AsyncSession) -> Dict[str, int]:
+    """
+    元テーブルを数え直した実数を返す（突き合わせ用。1 テーブル 1 スキャン）。
     """
-    result = {}
+    users = (
+        await db.execute(
+            select(func.count(), func.count().filter(User.is_active == True)).select_from(User)
+        )
+    ).one()
+    total_reports = await db.scalar(select(func.count()).select_from(ReportLog))
+    return {USERS_TOTAL: users[0], USERS_ACTIVE: users[1], REPORTS_TOTAL: total_reports or 0}
 
-    # アクティブ/非アクティブユーザー数
-    total_users = await db.scalar(select(func.count()).select_from(User))
-    active_users = await db.scalar(select(func.count()).select_from(User).where(User.is_active == True))
-    inactive_users = total_users - active_users
 
-    # レポート数（仮に存在する場合）
-    total_reports = await db.scalar(select(func.count()).select_from(Report))
+async def reconcile(db: AsyncSession) -> Optional[Dict[str, int]]:
+    """
+    実数を数え直して kpi_counters を上書きし、補正量（実数 - 保持値）を返す。
+    他のワーカーが実行中の場合は何もせず None を返す。
+
+    カウントと上書きを同じトランザクションで行い、その間の users / report_logs への
+    書き込みはトリガーが kpi_counters の行ロックで待つため、補正が二重に効くことはない。
+    """
+    locked = await db.scalar(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY)))
+    if not locked:
+        return None
+    # kpi_counters を name 順（reports_total → users_active → users_total）で先にロックし、
+    # 数え直し中の増減を待たせる。トリガーも 1 文の中では name 順に更新するため、ロック順序が逆転しない
+    await db.execute(text("SELECT name FROM kpi_counters ORDER BY name FOR UPDATE"))
+    current = await load_counters(db)
+    actual = await count_actuals(db)
 
-    result["total_users"] = total_users
-    result["active_users"] = active_users
-    result["inactive_users"] = inactive_users
-    result["total_reports"] = total_reports
+    stmt = insert(KpiCounter).values([{"name": name, "value": value} for name, value in actual.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KpiCounter.name],
+        set_={"value": stmt.excluded.value, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+    await db.commit()
+    return {name: value - current.get(name, 0) for name, value in actual.items()}
 
-    return result
+
+class KpiReconciler:
+    """
+    KPI の読み出しキャッシュと定期的な突き合わせ。
+    """
+
+    def __init__(self, cache_ttl: float, interval: float) -> None:
+        self.interval = interval
+        self._cache: ExpiringLRUCache[str, Dict[str, int]] = ExpiringLRUCache(maxsize=1, ttl=cache_ttl)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.runs = 0
+        self.skipped = 0
+        self.failed = 0
+        self.corrections = 0
+
+    async def get_stats(self, db: AsyncSession) -> Dict[str, int]:
+        """
+        ダッシュボード用の集計値を返す。キャッシュが切れている場合のみ 1 クエリ発行する。
+        """
+        stats = self._cache.get(_CACHE_KEY)
+        if stats is None:
+            stats = _to_stats(await load_counters(db))
+            self._cache.set(_CACHE_KEY, stats)
+        return stats
+
+    async def run_once(self) -> Optional[Dict[str, int]]:
+        """
+        突き合わせを 1 回実行する。ずれがあればログに残し、キャッシュを破棄する。
+        """
+        from app.core.database import async_session  # 循環 import 回避のため遅延 import
+
+        try:
+            async with async_session() as db:
+                drift = await reconcile(db)
+        except Exception:
+            self.failed += 1
+            logger.exception("KPI の突き合わせに失敗しました")
+            return None
+        if drift is None:
+            self.skipped += 1
+            return None
+        self.runs += 1
+        if any(drift.values()):
+            self.corrections += 1
+            logger.warning("KPI のずれを補正しました: %s", drift)
+            self._cache.clear()
+        return drift
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="kpi-reconciler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "corrections": self.corrections,
+            "cache": self._cache.stats(),
+        }
+
+
+@lru_cache()
+def get_kpi_reconciler() -> KpiReconciler:
+    """
+    プロセス内で共有する KpiReconciler を返す。
+    """
+    settings = get_settings()
+    reconciler = KpiReconciler(cache_ttl=settings.kpi_cache_ttl, interval=settings.kpi_reconcile_interval)
+    metrics.register("kpi", reconciler.stats)
+    return reconciler
+
+
+async def get_dashboard_stats(db: AsyncSession) -> dict:
+    """
+    ダッシュボード用の集計統計を返す。
+    - アクティブユーザー数
+    - 非アクティブユーザー数
+    - レポート生成数（report_logs）
+    """
+    return dict(await get_kpi_reconciler().get_stats(db))
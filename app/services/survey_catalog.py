@@ -0,0 +1,194 @@
+# app/services/survey_catalog.py
+
+"""
+アンケートカタログ（カテゴリ → 設問 → 選択肢）のプロセス内キャッシュ。
+
+カタログはほぼ更新されない参照データのため、3 テーブルをそれぞれ 1 クエリで読み込み
+（リレーションのロードなし）、不変の木構造と直列化済みの JSON バイト列として保持する。
+
+* 版（version / ETag）は JSON の内容の SHA-256。内容が同じなら何度作り直しても同じ値になる
+* リクエストは保持済みのバイト列を返すだけで、直列化は構築時の 1 回のみ
+* 同じプロセスで Category / Question / Choice を書き込んだセッションが commit すると破棄し、
+  次のリクエストで作り直す
+* 他のプロセス（別ワーカーや管理ツール）での更新は survey_catalog_max_age 秒ごとの
+  読み直しで取り込む。内容が変わっていなければ版も変わらず、クライアントは 304 のまま
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.models.category import Category
+from app.models.choice import Choice
+from app.models.question import Question
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MODELS = (Category, Question, Choice)
+
+
+@dataclass(frozen=True)
+class CatalogChoice:
+    id: str
+    text: str
+
+
+@dataclass(frozen=True)
+class CatalogQuestion:
+    id: str
+    text: str
+    choices: Tuple[CatalogChoice, ...]
+
+
+@dataclass(frozen=True)
+class CatalogCategory:
+    id: str
+    name: str
+    questions: Tuple[CatalogQuestion, ...]
+
+
+@dataclass(frozen=True)
+class SurveyCatalog:
+    """
+    構築済みのカタログ。body は {"version", "categories"} を直列化した JSON。
+    """
+    categories: Tuple[CatalogCategory, ...]
+    version: str
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+async def load_catalog(db: AsyncSession) -> SurveyCatalog:
+    """
+    3 テーブルを id 順に読み込み、木構造と JSON バイト列を作る（クエリは 3 回）。
+    """
+    categories = (await db.execute(select(Category.id, Category.name).order_by(Category.id))).all()
+    questions = (
+        await db.execute(select(Question.id, Question.text, Question.category_id).order_by(Question.id))
+    ).all()
+    choices = (
+        await db.execute(select(Choice.id, Choice.text, Choice.question_id).order_by(Choice.id))
+    ).all()
+
+    choices_by_question: Dict[str, list] = {}
+    for choice in choices:
+        choices_by_question.setdefault(choice.question_id, []).append(CatalogChoice(choice.id, choice.text))
+    questions_by_category: Dict[str, list] = {}
+    for question in questions:
+        questions_by_category.setdefault(question.category_id, []).append(
+            CatalogQuestion(question.id, question.text, tuple(choices_by_question.get(question.id, ())))
+        )
+    tree = tuple(
+        CatalogCategory(category.id, category.name, tuple(questions_by_category.get(category.id, ())))
+        for category in categories
+    )
+    return build_catalog(tree)
+
+
+def build_catalog(tree: Tuple[CatalogCategory, ...]) -> SurveyCatalog:
+    """
+    木構造から版と JSON バイト列を作る（orjson は dataclass をそのまま直列化できる）。
+    """
+    categories_json = orjson.dumps(tree)
+    version = hashlib.sha256(categories_json).hexdigest()[:32]
+    body = b'{"version":"' + version.encode() + b'","categories":' + categories_json + b"}"
+    return SurveyCatalog(categories=tree, version=version, body=body)
+
+
+class SurveyCatalogCache:
+    """
+    カタログを 1 つだけ保持するキャッシュ。同時に複数のリクエストが来ても構築は 1 回。
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = max_age
+        self._catalog: Optional[SurveyCatalog] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.builds = 0
+        self.invalidations = 0
+
+    async def get(self, db: AsyncSession) -> SurveyCatalog:
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - self._loaded_at < self.max_age:
+            return catalog
+        async with self._lock:
+            if self._catalog is None or time.monotonic() - self._loaded_at >= self.max_age:
+                self._catalog = await load_catalog(db)
+                self._loaded_at = time.monotonic()
+                self.builds += 1
+            return self._catalog
+
+    def invalidate(self) -> None:
+        """
+        カタログの書き込み後に呼び出す（次のリクエストで作り直す）。
+        """
+        self._catalog = None
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._catalog.version if self._catalog else None,
+            "builds": self.builds,
+            "invalidations": self.invalidations,
+        }
+
+
+@lru_cache()
+def get_survey_catalog() -> SurveyCatalogCache:
+    """
+    プロセス内で共有する SurveyCatalogCache を返す。
+    """
+    cache = SurveyCatalogCache(max_age=get_settings().survey_catalog_max_age)
+    metrics.register("survey_catalog", cache.stats)
+    return cache
+
+
+# ------------------------------------------------------------------
+# 書き込み検知: カタログのモデルを flush したセッションが commit したら破棄する
+# ------------------------------------------------------------------
+_DIRTY_KEY = "survey_catalog_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_dirty(session: Session, flush_context: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_catalog_dml(state: Any) -> None:
+    # update(Question) などの ORM 一括 DML は flush を経由しないためここで検知する
+    if (state.is_insert or state.is_update or state.is_delete) and any(
+        mapper.class_ in CATALOG_MODELS for mapper in state.all_mappers
+    ):
+        state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalog(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        get_survey_catalog().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_mark(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -34,6 +34,5 @@ async def save_file_metadata(db: AsyncSession, file: UploadFile, user_id: int) -
     )
     db.add(db_file)
     await db.commit()
-    await db.refresh(db_file)
 
     return file_path
@@ -0,0 +1,51 @@
+# app/services/user_loader_profiles.py
+
+"""
+User を読み込むときのローダープロファイル。
+
+User のリレーション（roles / auth_providers / event_logs / pets）はモデル側で
+lazy="raise" とし、既定では一切読み込まない（読み込まずにアクセスすると例外）。
+必要な範囲はクエリごとに次のプロファイルで選ぶ。
+
+* lean: UserRead とキーセットページングに必要な列のみ（リレーションなし）。一覧・検索用
+* with_pets: lean + pets（selectinload で 1 クエリ追加）
+* full: 全列 + 全リレーション（selectinload でリレーションごとに 1 クエリ追加）
+
+例:
+    select(User).options(*user_loader(LEAN))
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models.user import User
+
+LEAN = "lean"
+WITH_PETS = "with_pets"
+FULL = "full"
+
+# UserRead の項目と、一覧の並び順（created_at, id）に使う列
+LEAN_COLUMNS = (User.id, User.username, User.email, User.display_name, User.is_active, User.created_at)
+
+
+def user_loader(profile: str = LEAN) -> Tuple[LoaderOption, ...]:
+    """
+    プロファイル名に対応するローダーオプションを返す。
+    lean / with_pets で読み込まない列は、アクセス時に遅延ロードせず例外にする。
+    """
+    if profile == LEAN:
+        return (load_only(*LEAN_COLUMNS, raiseload=True),)
+    if profile == WITH_PETS:
+        return (load_only(*LEAN_COLUMNS, raiseload=True), selectinload(User.pets))
+    if profile == FULL:
+        return (
+            selectinload(User.roles),
+            selectinload(User.auth_providers),
+            selectinload(User.event_logs),
+            selectinload(User.pets),
+        )
+    raise ValueError(f"未知のローダープロファイルです: {profile}")
@@ -0,0 +1,84 @@
+# app/services/user_search.py
+
+"""
+管理者向けユーザー検索（pg_trgm によるあいまい検索）。
+
+username / display_name / email の各列に gin_trgm_ops の GIN インデックスを張り、
+部分一致（ILIKE '%q%'）と類似度（`%` 演算子、既定しきい値 0.3）の両方を
+インデックスで絞り込む。結果は 3 列の similarity の最大値をスコアとして降順に並べ、
+(スコア, id) のキーセットでページングする。
+
+トライグラムは 3 文字単位のため、短すぎる検索語はインデックスが効かず全件走査になる。
+そのため user_search_min_length 未満の検索語は受け付けない。
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+from app.models.user import User
+from app.services.user_loader_profiles import LEAN, user_loader
+from app.utils.pagination import CursorParams, Page, decode_cursor, encode_cursor, keyset_query
+
+# 検索対象の列
+SEARCH_COLUMNS = (User.username, User.display_name, User.email)
+
+
+def _escape_like(text: str) -> str:
+    """
+    LIKE のワイルドカード（% _）とエスケープ文字を無効化する。
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(query: str, is_active: bool | None = None):
+    """
+    検索条件と類似度スコアを返す。戻り値は (SELECT 文, スコア式)。
+    各列の条件はそれぞれの GIN インデックスで評価され、BitmapOr で結合される。
+    """
+    pattern = f"%{_escape_like(query)}%"
+    conditions = []
+    for column in SEARCH_COLUMNS:
+        conditions.append(column.ilike(pattern, escape="\\"))
+        conditions.append(column.op("%")(query))
+    score = func.greatest(*(func.coalesce(func.similarity(column, query), 0) for column in SEARCH_COLUMNS)).label("score")
+
+    stmt = select(User, score).options(*user_loader(LEAN)).where(or_(*conditions))
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    return stmt, score
+
+
+async def search_users(
+    db: AsyncSession,
+    query: str,
+    is_active: bool | None = None,
+    *,
+    params: CursorParams,
+) -> Page[User]:
+    """
+    類似度の高い順にユーザーを 1 ページ分返す。
+    """
+    query = query.strip()
+    if len(query) < get_settings().user_search_min_length:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"検索語は {get_settings().user_search_min_length} 文字以上で指定してください",
+        )
+    if params.cursor and not isinstance(decode_cursor(params.cursor)[0], float):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="カーソルが不正です")
+
+    stmt, score = build_search_query(query, is_active)
+    result = await db.execute(keyset_query(stmt, sort_col=score, id_col=User.id, params=params))
+    rows = result.all()
+
+    items = [user for user, _ in rows[: params.limit]]
+    next_cursor = None
+    if len(rows) > params.limit:
+        last_user, last_score = rows[params.limit - 1]
+        next_cursor = encode_cursor(float(last_score), last_user.id)
+    return Page(items, next_cursor)
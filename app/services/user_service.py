@@ -1,50 +1,80 @@
 # app/services/user_service.py
 
-from sqlalchemy import select
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud.base import CRUDBase
+from app.crud.crud_api_key import get_key_hashes_by_users
 from app.models.user import User
+from app.schemas.common import BulkResult
 from app.schemas.user import UserCreate, UserRead
-from passlib.context import CryptContext
+from app.services.api_key_index import get_api_key_index
+from app.services import user_search
+from app.services.identity_cache import invalidate_user, invalidate_users
+from app.services.password_hasher import hash_password, verify_password
+from app.services.user_loader_profiles import LEAN, user_loader
+from app.utils import bulk
+from app.utils.pagination import CursorParams, Page, paginate
+from app.utils.serialization import validate_list
 
-# bcrypt によるパスワードハッシュ化設定
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+users = CRUDBase[User, UserCreate](User)
 
 
-async def get_user_by_id(db: AsyncSession, user_id: int) -> UserRead | None:
+async def get_user_by_id(db: AsyncSession, user_id: int, profile: str = LEAN) -> UserRead | None:
     """
     指定したIDのアクティブユーザー（is_active=True）を取得。
     該当がなければ None を返す。
     """
     result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == True)
+        select(User).options(*user_loader(profile)).where(User.id == user_id, User.is_active == True)
     )
     user = result.scalar_one_or_none()
-    return UserRead.from_orm(user) if user else None
+    return UserRead.model_validate(user) if user else None
+
+
+async def get_user_version(db: AsyncSession, user_id: UUID) -> datetime | None:
+    """
+    条件付き GET 用に、アクティブユーザーの updated_at だけを取得する（主キー検索 1 回）。
+    該当がなければ None。
+    """
+    return await db.scalar(select(User.updated_at).where(User.id == user_id, User.is_active == True))
 
 
-async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+async def get_user_by_email(db: AsyncSession, email: str, profile: str = LEAN) -> User | None:
     """
     メールアドレスからユーザーを取得。
     アクティブ／非アクティブ問わず全件対象。
     """
     result = await db.execute(
-        select(User).where(User.email == email)
+        select(User).options(*user_loader(profile)).where(User.email == email)
     )
     return result.scalar_one_or_none()
 
 
-async def get_all_users(db: AsyncSession, limit: int = 50, offset: int = 0) -> list[UserRead]:
-    """
-    アクティブユーザーの一覧をページネーション付きで取得。
-    デフォルトで最大50件取得。
-    """
-    result = await db.execute(
-        select(User)
-        .where(User.is_active == True)
-        .offset(offset)
-        .limit(limit)
+async def get_all_users(
+    db: AsyncSession,
+    params: CursorParams,
+    options: Sequence[LoaderOption] | None = None,
+) -> Page[UserRead] | Page[User]:
+    """
+    アクティブユーザーの一覧を新しい順にキーセット方式で取得。
+    deep page でも (created_at, id) のインデックス範囲走査のみで済む。
+    options（?fields= 用のローダー）を指定した場合は UserRead に変換せず User のまま返す。
+    """
+    page = await paginate(
+        db,
+        select(User).options(*(options or user_loader(LEAN))).where(User.is_active == True),
+        sort_col=User.created_at,
+        id_col=User.id,
+        params=params,
     )
-    return [UserRead.from_orm(u) for u in result.scalars().all()]
+    if options is None:
+        page.items = validate_list(UserRead, page.items)
+    return page
 
 
 async def get_inactive_users(db: AsyncSession) -> list[UserRead]:
@@ -53,28 +83,23 @@ async def get_inactive_users(db: AsyncSession) -> list[UserRead]:
     管理者画面などでの復元候補リストとして利用。
     """
     result = await db.execute(
-        select(User).where(User.is_active == False)
+        select(User).options(*user_loader(LEAN)).where(User.is_active == False)
     )
-    return [UserRead.from_orm(u) for u in result.scalars().all()]
+    return validate_list(UserRead, result.scalars().all())
 
 
 async def create_user(db: AsyncSession, user: UserCreate) -> UserRead:
     """
     新規ユーザーを作成。
     ・パスワードはbcryptでハッシュ化。
-    ・作成後はDBからUserReadに変換して返却。
-    """
-    hashed = pwd_context.hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed,
-        is_active=True
+    ・INSERT ... RETURNING の結果をそのままUserReadに変換して返却。
+    """
+    hashed = await hash_password(user.password)
+    db_user = await users.create(
+        db,
+        {"username": user.username, "email": user.email, "hashed_password": hashed, "is_active": True},
     )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return UserRead.from_orm(db_user)
+    return UserRead.model_validate(db_user)
 
 
 async def update_user(db: AsyncSession, user_id: int, data: UserCreate) -> UserRead | None:
@@ -83,36 +108,27 @@ async def update_user(db: AsyncSession, user_id: int, data: UserCreate) -> UserR
     ・存在しなければ None。
     ・パスワードは新規入力値で上書きハッシュ保存。
     """
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == True)
+    db_user = await users.update_returning(
+        db,
+        user_id,
+        {"username": data.username, "email": data.email, "hashed_password": await hash_password(data.password)},
+        User.is_active == True,
     )
-    db_user = result.scalar_one_or_none()
-    if not db_user:
-        return None
-
-    db_user.username = data.username
-    db_user.email = data.email
-    db_user.hashed_password = pwd_context.hash(data.password)
-
-    await db.commit()
-    await db.refresh(db_user)
-    return UserRead.from_orm(db_user)
+    return UserRead.model_validate(db_user) if db_user else None
 
 
 async def deactivate_user(db: AsyncSession, user_id: int) -> bool:
     """
     アクティブユーザーを論理削除（is_active=False）に設定。
     ・該当しない場合は False。
+    ・認証用の識別情報キャッシュと API キーキャッシュも破棄する。
     """
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == True)
-    )
-    db_user = result.scalar_one_or_none()
+    db_user = await users.update_returning(db, user_id, {"is_active": False}, User.is_active == True)
     if not db_user:
         return False
 
-    db_user.is_active = False
-    await db.commit()
+    invalidate_user(db_user.id)
+    get_api_key_index().invalidate_user(db_user.id)
     return True
 
 
@@ -120,19 +136,56 @@ async def restore_user(db: AsyncSession, user_id: int) -> bool:
     """
     非アクティブユーザーを復元（is_active=True）。
     ・該当しない場合は False。
+    ・認証用の識別情報キャッシュと、無効化中に付いた API キーの否定キャッシュも破棄する。
     """
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == False)
-    )
-    db_user = result.scalar_one_or_none()
+    db_user = await users.update_returning(db, user_id, {"is_active": True}, User.is_active == False)
     if not db_user:
         return False
 
-    db_user.is_active = True
-    await db.commit()
+    invalidate_user(db_user.id)
+    get_api_key_index().invalidate_user(db_user.id, await get_key_hashes_by_users(db, [db_user.id]))
     return True
 
 
+async def bulk_set_active(db: AsyncSession, user_ids: list[UUID], is_active: bool) -> BulkResult:
+    """
+    複数ユーザーを一括で論理削除（is_active=False）または復元（is_active=True）する。
+    ・UPDATE ... WHERE id = ANY(...) AND is_active <> 目標値 RETURNING id の 1 文で処理。
+    ・返ってこなかった ID は、存在しないか既に目標の状態（not_found）。
+    ・変更したユーザーの識別情報キャッシュと API キーキャッシュ（復元時は否定キャッシュも）を破棄する。
+    """
+    results = []
+    targets: list[UUID] = []
+    seen: set[UUID] = set()
+    for index, user_id in enumerate(user_ids):
+        if user_id in seen:
+            results.append(bulk.item(index, bulk.STATUS_DUPLICATE, user_id))
+            continue
+        seen.add(user_id)
+        targets.append(user_id)
+        results.append(bulk.item(index, bulk.STATUS_UPDATED, user_id))
+
+    changed: set[UUID] = set()
+    for chunk in bulk.chunked(targets, bulk.MAX_ROWS_PER_STATEMENT):
+        stmt = (
+            update(User)
+            .where(User.id.in_(chunk), User.is_active == (not is_active))
+            .values(is_active=is_active)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        changed.update((await db.scalars(stmt)).all())
+    await db.commit()
+
+    for result in results:
+        if result.status == bulk.STATUS_UPDATED and result.id not in changed:
+            result.status = bulk.STATUS_NOT_FOUND
+    key_hashes = await get_key_hashes_by_users(db, changed) if is_active and changed else []
+    invalidate_users(changed)
+    get_api_key_index().invalidate_users(changed, key_hashes)
+    return bulk.build_result(results)
+
+
 async def change_password(db: AsyncSession, user_id: int, old_password: str, new_password: str) -> bool:
     """
     認証済みユーザーが自身のパスワードを変更。
@@ -145,10 +198,10 @@ async def change_password(db: AsyncSession, user_id: int, old_password: str, new
     if not db_user:
         return False
 
-    if not pwd_context.verify(old_password, db_user.hashed_password):
+    if not await verify_password(old_password, db_user.hashed_password):
         return False
 
-    db_user.hashed_password = pwd_context.hash(new_password)
+    db_user.hashed_password = await hash_password(new_password)
     await db.commit()
     return True
 
@@ -159,36 +212,20 @@ async def force_reset_password(db: AsyncSession, user_id: int, new_password: str
     ・旧パスワードの照合なし。
     ・対象が存在しない場合は False。
     """
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    db_user = result.scalar_one_or_none()
-    if not db_user:
-        return False
-
-    db_user.hashed_password = pwd_context.hash(new_password)
-    await db.commit()
-    return True
-
-from sqlalchemy import or_
+    db_user = await users.update_returning(db, user_id, {"hashed_password": await hash_password(new_password)})
+    return db_user is not None
 
 async def search_users_by_criteria(
     db: AsyncSession,
     query: str,
     is_active: bool | None = None,
-    limit: int = 50,
-    offset: int = 0
-) -> list[UserRead]:
-    stmt = select(User).where(
-        or_(
-            User.username.ilike(f"%{query}%"),
-            User.email.ilike(f"%{query}%")
-        )
-    )
-
-    if is_active is not None:
-        stmt = stmt.where(User.is_active == is_active)
-
-    stmt = stmt.offset(offset).limit(limit)
-    result = await db.execute(stmt)
-    return [UserRead.from_orm(u) for u in result.scalars().all()]
\ No newline at end of file
+    *,
+    params: CursorParams,
+) -> Page[UserRead]:
+    """
+    ユーザー名・表示名・メールアドレスのあいまい検索（pg_trgm の GIN インデックスを使用）。
+    類似度の高い順に (スコア, id) のキーセットでページングする。
+    """
+    page = await user_search.search_users(db, query, is_active, params=params)
+    page.items = validate_list(UserRead, page.items)
+    return page
\ No newline at end of file
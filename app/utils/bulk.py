@@ -0,0 +1,61 @@
+# app/utils/bulk.py
+
+"""
+一括書き込み API の共通処理。
+
+1 件ずつ INSERT / UPDATE して都度 commit すると、件数分の往復と fsync が発生する。
+一括 API は行をまとめた複数行 VALUES の 1 文（RETURNING 付き）で書き込み、
+全件を 1 トランザクションで commit する。結果は入力順の項目ごとに返す。
+
+PostgreSQL（asyncpg）の 1 文あたりのバインドパラメータは 32767 個が上限のため、
+1 文に入れる行数は列数から決める（chunked()）。
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from app.schemas.common import BulkItemResult, BulkResult
+
+T = TypeVar("T")
+
+# asyncpg の 1 文あたりのバインドパラメータ上限
+MAX_BIND_PARAMS = 32767
+# 1 文あたりの最大行数（大きすぎる文は計画・送信のコストが増える）
+MAX_ROWS_PER_STATEMENT = 1000
+
+# 項目ごとの結果
+STATUS_CREATED = "created"
+STATUS_UPDATED = "updated"
+STATUS_GRANTED = "granted"
+STATUS_EXISTS = "exists"          # 既に同じ状態（冪等な再実行を含む）
+STATUS_NOT_FOUND = "not_found"
+STATUS_CONFLICT = "conflict"      # 他のデータと衝突した
+STATUS_DUPLICATE = "duplicate"    # 同じリクエスト内で重複している
+
+SUCCESS_STATUSES = frozenset({STATUS_CREATED, STATUS_UPDATED, STATUS_GRANTED, STATUS_EXISTS})
+
+
+def rows_per_statement(columns: int) -> int:
+    """
+    列数 columns の行を 1 文に何行入れられるかを返す。
+    """
+    return max(1, min(MAX_ROWS_PER_STATEMENT, MAX_BIND_PARAMS // columns))
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def build_result(results: List[BulkItemResult]) -> BulkResult:
+    """
+    入力順の項目結果から成功・失敗件数を集計する。
+    """
+    succeeded = sum(1 for item in results if item.status in SUCCESS_STATUSES)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, items=results)
+
+
+def item(index: int, status: str, id: Optional[UUID] = None, detail: Optional[str] = None) -> BulkItemResult:
+    return BulkItemResult(index=index, id=id, status=status, detail=detail)
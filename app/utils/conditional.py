@@ -0,0 +1,103 @@
+# app/utils/conditional.py
+
+"""
+条件付き GET（ETag / Last-Modified → 304 Not Modified）のヘルパ。
+
+ルートは本文を組み立てる前に、行の版（updated_at・件数・xmin など）だけを
+軽い集約クエリで取得して Validators を作り、クライアントの If-None-Match /
+If-Modified-Since と一致すれば本文なしの 304 を返す。
+
+    validators = conditional.make_validators("pets", user_id, *version, last_modified=version[1])
+    if (cached := conditional.not_modified(request, validators)) is not None:
+        return cached
+    conditional.apply(response, validators)
+
+ETag は弱い ETag（W/"..."）。版の値とアプリのバージョンのハッシュで、
+デプロイでレスポンスの形が変わった場合も一致しなくなる。
+版は本文より先に取得するため、間に更新が入っても古い ETag が付くだけ（次回 200 で取り直す）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import get_settings
+
+# クライアントに毎回再検証させる（キャッシュは本人の端末のみ）
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _to_utc(value: datetime) -> datetime:
+    # DB の時刻はタイムゾーンなし（サーバーのローカル時刻）で保存している。HTTP の日付は秒単位
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_validators(*parts: Any, last_modified: Optional[datetime] = None) -> Validators:
+    """
+    版を構成する値から弱い ETag（と Last-Modified）を作る。
+    """
+    raw = "|".join(map(str, (get_settings().version, *parts)))
+    etag = f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+    return Validators(etag=etag, last_modified=_to_utc(last_modified) if last_modified else None)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match に etag が含まれるか（弱い比較。W/ の有無は区別しない）。
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """
+    If-None-Match があればそれだけで判定し、無ければ If-Modified-Since で判定する（RFC 9110）。
+    """
+    if "if-none-match" in request.headers:
+        return etag_matches(request, validators.etag)
+    since = request.headers.get("if-modified-since")
+    if not since or validators.last_modified is None:
+        return False
+    try:
+        return validators.last_modified <= parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(request: Request, validators: Validators) -> Optional[Response]:
+    """
+    条件に一致すれば 304 のレスポンスを、一致しなければ None を返す。
+    """
+    if is_not_modified(request, validators):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
+    return None
+
+
+def apply(response: Response, validators: Validators) -> None:
+    """
+    200 のレスポンスに ETag / Last-Modified を付ける。
+    """
+    response.headers.update(validators.headers())
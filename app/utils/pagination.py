@@ -0,0 +1,142 @@
+# app/utils/pagination.py
+
+"""
+キーセット（カーソル）方式のページネーション。
+
+OFFSET は読み飛ばす行をすべて走査するため深いページほど遅くなる。
+本モジュールは (並び順の列, id) の組を不透明なカーソルとして返し、次ページは
+`WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n`
+で取得する。対応する複合インデックス (…, created_at DESC, id DESC) があれば
+何ページ目でもインデックスの範囲走査 n 行で済む。
+
+並び順の列が NULL の行（logged_at / created_at が未設定の古い行など）は、PostgreSQL の
+DESC の既定どおり先頭（NULLS FIRST。(…, created_at, id) インデックスの逆順走査と同じ順）に並ぶ。
+NULL の行で区切ったカーソルは値を持たない印（n）で表し、次ページは
+「NULL かつ id が小さい行」と「NULL 以外の全行」を続けて返す。
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import ColumnElement, Select, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+T = TypeVar("T")
+
+# カーソルに格納できる並び順の値（時刻、または検索スコアなどの数値。NULL 列は None）
+SortValue = Optional[Union[datetime, float]]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class CursorParams:
+    """
+    一覧エンドポイント共通のクエリパラメータ（`params: CursorParams = Depends()`）。
+    """
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスの next_cursor（先頭ページは省略）")
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="1 ページの件数")
+
+
+class Page(Generic[T]):
+    """
+    1 ページ分の結果。レスポンスでは schemas.common.CursorPage として直列化される。
+    """
+    __slots__ = ("items", "next_cursor")
+
+    def __init__(self, items: List[T], next_cursor: Optional[str]) -> None:
+        self.items = items
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(sort_value: SortValue, row_id: UUID) -> str:
+    """
+    (並び順の値, id) を URL セーフな不透明文字列にする。
+    値の型は先頭 1 文字（d: 時刻 / f: 数値 / n: NULL）で区別する。
+    """
+    if sort_value is None:
+        encoded = "n"
+    elif isinstance(sort_value, datetime):
+        encoded = f"d{sort_value.isoformat()}"
+    else:
+        encoded = f"f{float(sort_value)!r}"
+    raw = f"{encoded}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[SortValue, UUID]:
+    """
+    encode_cursor() の逆変換。改ざん・破損したカーソルは 400。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        encoded, row_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        kind, value = encoded[:1], encoded[1:]
+        if kind == "d":
+            return datetime.fromisoformat(value), UUID(row_id)
+        if kind == "f":
+            return float(value), UUID(row_id)
+        if kind == "n" and not value:
+            return None, UUID(row_id)
+        raise ValueError(kind)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="カーソルが不正です")
+
+
+def keyset_query(
+    stmt: Select,
+    *,
+    sort_col: ColumnElement[Any],
+    id_col: InstrumentedAttribute,
+    params: CursorParams,
+) -> Select:
+    """
+    stmt に新しい順（値の大きい順）の並びとカーソル条件を付与する。
+    sort_col には列のほか、検索スコアなどの式も指定できる。
+    次ページの有無を判定するため 1 件多く取得する。
+    """
+    if params.cursor:
+        sort_value, row_id = decode_cursor(params.cursor)
+        if sort_value is None:
+            # NULL の行は先頭に並ぶため、残りの NULL 行の後に NULL 以外の行がすべて続く
+            stmt = stmt.where(or_(and_(sort_col.is_(None), id_col < row_id), sort_col.is_not(None)))
+        else:
+            # 行値比較は NULL を含む行で NULL となり、既に返した NULL 行は自然に除外される
+            stmt = stmt.where(tuple_(sort_col, id_col) < tuple_(sort_value, row_id))
+    return stmt.order_by(sort_col.desc(), id_col.desc()).limit(params.limit + 1)
+
+
+def build_page(rows: Sequence[Any], *, sort_attr: str, params: CursorParams) -> Page[Any]:
+    """
+    keyset_query() で取得した行から Page を作る（limit + 1 件目があれば次ページあり）。
+    """
+    items = list(rows[: params.limit])
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_attr), last.id)
+    return Page(items, next_cursor)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    *,
+    sort_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    params: CursorParams,
+) -> Page[Any]:
+    """
+    ORM エンティティを 1 ページ分取得する。
+    （コレクションの joined eager load は使わない前提。必要なら selectinload を指定する）
+    """
+    result = await db.scalars(keyset_query(stmt, sort_col=sort_col, id_col=id_col, params=params))
+    return build_page(result.all(), sort_attr=sort_col.key, params=params)
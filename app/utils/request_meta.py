@@ -0,0 +1,59 @@
+# app/utils/request_meta.py
+
+import ipaddress
+
+from starlette.requests import HTTPConnection
+
+from app.core.config import get_settings
+
+# クライアント IP が取得できない場合の既定値（INET 列に格納可能な値）
+UNKNOWN_IP = "0.0.0.0"
+
+def parse_ip(value: str | None) -> str | None:
+    """
+    IP アドレス表記を検証・正規化して返す（不正な値は None）。
+    プロキシによって付与されるポート番号（"203.0.113.9:51234" / "[2001:db8::1]:443"）は取り除く。
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.startswith("["):
+        value = value[1:].partition("]")[0]
+    elif value.count(":") == 1:
+        value = value.partition(":")[0]
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+def get_client_ip(request: HTTPConnection) -> str:
+    """
+    リクエスト元クライアントの IP アドレスを返す。
+    X-Forwarded-For の左側はクライアントが自由に書けるため、信頼済みプロキシ（Front Door）が
+    右端に追記したエントリを trusted_proxy_count 段だけ右から数えて採用する。
+    client_ip_header が設定されていればそのヘッダーを優先し、いずれも不正なら接続元アドレスを使う。
+    """
+    settings = get_settings()
+    if settings.client_ip_header:
+        ip = parse_ip(request.headers.get(settings.client_ip_header))
+        if ip:
+            return ip
+    forwarded = request.headers.get("x-forwarded-for")
+    trusted = settings.trusted_proxy_count
+    if forwarded and trusted > 0:
+        entries = forwarded.split(",")
+        if len(entries) >= trusted:
+            ip = parse_ip(entries[-trusted])
+            if ip:
+                return ip
+    if request.client:
+        ip = parse_ip(request.client.host)
+        if ip:
+            return ip
+    return UNKNOWN_IP
+
+def get_user_agent(request: HTTPConnection) -> str | None:
+    """
+    User-Agent ヘッダーを返す（未指定は None）。
+    """
+    return request.headers.get("user-agent")
@@ -0,0 +1,61 @@
+# app/utils/serialization.py
+
+"""
+レスポンスの検証・直列化ヘルパ。
+
+pydantic v2 の TypeAdapter は型ごとに 1 度だけ作り（スキーマ構築が重いため）、
+一覧は ORM オブジェクトのリストを 1 回の validate_python で検証する。
+
+FastAPI は response_model があるとエンドポイントの戻り値を再検証してから直列化する。
+サービス層で検証済みの一覧は json_response / page_response で直列化済みの
+Response として返し、再検証を省く（response_model は OpenAPI の定義として残す）。
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas.common import CursorPage
+from app.utils.pagination import Page
+
+M = TypeVar("M", bound=BaseModel)
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """
+    型に対応する TypeAdapter を返す（プロセス内でキャッシュ）。
+    """
+    return TypeAdapter(tp)
+
+
+def validate_list(model: Type[M], objs: Iterable[Any]) -> List[M]:
+    """
+    ORM オブジェクトの一覧をまとめて model のリストに変換する。
+    """
+    return type_adapter(List[model]).validate_python(list(objs), from_attributes=True)
+
+
+def json_response(tp: Any, value: Any, status_code: int = 200) -> Response:
+    """
+    検証済みの値を tp の定義どおりに直列化したレスポンスを返す（再検証しない）。
+    """
+    return Response(
+        type_adapter(tp).dump_json(value, by_alias=True),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+def page_response(model: Type[M], page: Page[M]) -> Response:
+    """
+    検証済みの items を持つ Page を CursorPage[model] として直列化したレスポンスを返す。
+    """
+    body = CursorPage[model].model_construct(items=page.items, next_cursor=page.next_cursor)
+    return Response(body.model_dump_json(by_alias=True), media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,95 @@
+# app/utils/sparse_fields.py
+
+"""
+一覧 API の ?fields=（スパースフィールドセット）。
+
+    PET_FIELDS = SparseFields(PetRead, Pet, always=(Pet.id, Pet.created_at))
+
+    async def list_pets(..., fields: Optional[FieldSelection] = Depends(PET_FIELDS)):
+        page = await pet_service.get_pets_by_user(db, user_id, params, options=fields.options if fields else None)
+        return fields.page_response(page) if fields else page
+
+* fields の各項目はレスポンススキーマの項目名。それ以外は 400
+* SQL: 指定列だけを load_only で読み、リレーションは noload（読み込まない）
+  always の列（キーセットページングの並び順と id）は出力しなくても読み込む
+* JSON: 指定項目だけを持つ狭いモデルを動的に作り（項目の組ごとにキャッシュ）、
+  検証済みの一覧を再検証せずに直列化する
+"""
+
+# FastAPI が SparseFields.__call__ の型注釈を解決できるよう、from __future__ import annotations は使わない
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only, noload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.utils.pagination import Page
+from app.utils.serialization import page_response, validate_list
+
+
+@lru_cache(maxsize=256)
+def narrow_model(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    schema から names の項目だけを持つモデルを作る（型・制約・別名は元の定義を引き継ぐ）。
+    """
+    return create_model(
+        f"{schema.__name__}_{'_'.join(names)}",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """
+    検証済みの fields。names はスキーマでの定義順。
+    """
+    names: Tuple[str, ...]
+    model: Type[BaseModel]
+    options: Tuple[LoaderOption, ...]
+
+    def page_response(self, page: Page[Any]) -> Response:
+        """
+        ORM オブジェクトの Page を、指定項目だけの CursorPage として直列化する。
+        """
+        page.items = validate_list(self.model, page.items)
+        return page_response(self.model, page)
+
+
+class SparseFields:
+    """
+    fields クエリパラメータを FieldSelection に変換する依存関数（未指定なら None）。
+    """
+
+    def __init__(self, schema: Type[BaseModel], entity: Any, *, always: Tuple[Any, ...] = ()) -> None:
+        self.schema = schema
+        self.entity = entity
+        self.always = always
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="カンマ区切りの出力項目（例: id,name）。未指定なら全項目"),
+    ) -> Optional[FieldSelection]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(self.schema.model_fields))
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"指定できない項目です: {', '.join(unknown)}（指定できる項目: {', '.join(self.schema.model_fields)}）",
+            )
+        names = tuple(name for name in self.schema.model_fields if name in requested)
+        return self.select(names)
+
+    @lru_cache(maxsize=256)
+    def select(self, names: Tuple[str, ...]) -> FieldSelection:
+        columns = {column.key: column for column in (*self.always, *(getattr(self.entity, name) for name in names))}
+        return FieldSelection(
+            names=names,
+            model=narrow_model(self.schema, names),
+            options=(load_only(*columns.values(), raiseload=True), noload("*")),
+        )
@@ -0,0 +1,130 @@
+"""
+ミドルウェアスタック（ExceptionHandlerMiddleware + AuthMiddleware）の 1 リクエストあたりのオーバーヘッド計測。
+
+HTTP クライアントやサーバーを挟まず、ASGI アプリを直接呼び出して比較する。
+
+* none:   ミドルウェアなし（基準）
+* before: BaseHTTPMiddleware 版（置き換え前の実装）
+* after:  ASGI ミドルウェア版（app.middlewares）
+
+使い方:
+    python -m scripts.bench_middleware --repeat 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from jose import JWTError
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from app.core.security import create_access_token, decode_access_token
+from app.middlewares.auth_middleware import AuthMiddleware
+from app.middlewares.error_handler import ExceptionHandlerMiddleware
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        authorization = request.headers.get("Authorization")
+        if not authorization:
+            return JSONResponse(status_code=401, content={"detail": "Authorization header missing."})
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return JSONResponse(status_code=401, content={"detail": "Invalid authentication scheme."})
+        try:
+            decode_access_token(token)
+        except JWTError:
+            return JSONResponse(status_code=401, content={"detail": "Invalid or expired token."})
+        return await call_next(request)
+
+
+class LegacyExceptionHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+def build(middleware):
+    return Starlette(routes=[Route("/pets/", ok)], middleware=middleware)
+
+
+STACKS = {
+    "none": build([]),
+    "before": build([Middleware(LegacyExceptionHandlerMiddleware), Middleware(LegacyAuthMiddleware)]),
+    "after": build([Middleware(ExceptionHandlerMiddleware), Middleware(AuthMiddleware)]),
+}
+
+
+async def call(app, headers) -> int:
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/pets/",
+        "raw_path": b"/pets/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    status = 0
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # 本文の受信後は切断まで待つ（BaseHTTPMiddleware は切断の監視に receive を使う）
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(label: str, app, headers, repeat: int) -> float:
+    assert await call(app, headers) == 200  # ウォームアップ（トークンキャッシュへの登録など）
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call(app, headers)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    median = statistics.median(samples)
+    p99 = statistics.quantiles(samples, n=100)[-1]
+    print(f"{label:<7} median {median:8.1f} µs   p99 {p99:8.1f} µs")
+    return median
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    headers = [(b"authorization", f"Bearer {create_access_token({'sub': 'bench-user'})}".encode())]
+    print(f"GET /pets/ × {args.repeat} 回（有効なアクセストークン付き）")
+    results = {label: await measure(label, app, headers, args.repeat) for label, app in STACKS.items()}
+    before, after = results["before"] - results["none"], results["after"] - results["none"]
+    print(f"middleware overhead: before {before:.1f} µs → after {after:.1f} µs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
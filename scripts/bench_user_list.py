@@ -0,0 +1,104 @@
+"""
+/users/ のレスポンス生成（ORM → スキーマ変換 → JSON）のマイクロベンチマーク。
+
+DB は使わず、LEAN プロファイル相当の列だけを持つ User オブジェクトで比較する。
+
+* before: UserRead.from_orm を 1 件ずつ（email は EmailStr で再検証）→ FastAPI が
+          response_model で再検証 → JSONResponse
+* after:  TypeAdapter(list[UserRead]) で一括検証 → 再検証なしで page_response
+
+使い方:
+    python -m scripts.bench_user_list --items 50 --repeat 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import warnings
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import EmailStr
+
+from app.models import pet, user_auth_provider, user_event_log  # noqa: F401  (マッパー解決用)
+from app.models.user import User
+from app.schemas.common import CursorPage
+from app.schemas.user import UserRead
+from app.utils.pagination import Page
+from app.utils.serialization import page_response, validate_list
+
+
+class LegacyUserRead(UserRead):
+    """
+    変更前の UserRead（読み取り時も email を EmailStr で検証していた）。
+    """
+    email: EmailStr
+
+
+RESPONSE_FIELD = create_response_field(name="Response_list_users", type_=CursorPage[LegacyUserRead])
+
+
+def make_users(count: int) -> list[User]:
+    now = datetime.now()
+    return [
+        User(
+            id=uuid.uuid4(),
+            username=f"user{i:05d}",
+            email=f"user{i:05d}@example.com",
+            display_name=f"ユーザー {i}",
+            is_active=True,
+            created_at=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+async def before(users: list[User]) -> bytes:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        page = Page([LegacyUserRead.from_orm(u) for u in users], "cursor")
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=page, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def after(users: list[User]) -> bytes:
+    page = Page(validate_list(UserRead, users), "cursor")
+    return page_response(UserRead, page).body
+
+
+async def measure(label: str, fn, users: list[User], repeat: int) -> float:
+    await fn(users)  # ウォームアップ（TypeAdapter の構築など）
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(users)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    median = statistics.median(samples)
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    print(f"{label:<7} median {median:9.1f} µs   p95 {p95:9.1f} µs")
+    return median
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="1 ページの件数（CursorParams.limit 相当）")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    users = make_users(args.items)
+    # 両方式の出力が同じ JSON になることを確認してから計測する
+    import orjson
+    assert orjson.loads(await before(users)) == orjson.loads(await after(users))
+
+    print(f"/users/ レスポンス生成 {args.items} 件 × {args.repeat} 回")
+    old = await measure("before", before, users, args.repeat)
+    new = await measure("after", after, users, args.repeat)
+    print(f"speedup {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
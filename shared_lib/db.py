@@ -1,11 +1,2 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from app.core.config import get_settings
-
-settings = get_settings()
-
-engine = create_async_engine(settings.postgres_uri, echo=False, future=True)
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
-
-async def get_db() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
-        yield session
+# エンジン・セッションはアプリ本体（app.core.database）の 1 つを共有する
+from app.core.database import engine, async_session as AsyncSessionLocal, get_db  # noqa: F401
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.dependencies import has_admin_role
+from app.api.routes import admin
+from app.core import database
+from app.models import pet, user_auth_provider, user_event_log  # noqa: F401  (マッパー解決用)
+from app.services.admin_export import CSV, EXPORTS, NDJSON, build_query, encode_csv, stream_export
+
+
+class FakeResult:
+    def __init__(self, partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
+
+
+class FakeSession:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.options = None
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    async def stream(self, stmt):
+        self.options = stmt.get_execution_options()
+        return FakeResult(self.partitions)
+
+
+def _payment(amount):
+    return (uuid.uuid4(), uuid.uuid4(), Decimal(amount), "JPY", datetime(2025, 1, 1), None, "Completed")
+
+
+def test_query_applies_range_filters_and_stable_order():
+    stmt = build_query(
+        EXPORTS["payments"],
+        since=datetime(2025, 1, 1),
+        until=datetime(2025, 2, 1),
+        filters={"status": "Completed"},
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "payments.payment_date >= " in sql and "payments.payment_date < " in sql
+    assert "payments.status = " in sql
+    assert sql.endswith("ORDER BY payments.payment_date, payments.id")
+    assert "hashed_password" not in str(build_query(EXPORTS["users"]))
+    with pytest.raises(ValueError):
+        build_query(EXPORTS["users"], filters={"status": "x"})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", [NDJSON, CSV])
+async def test_rows_are_streamed_one_partition_at_a_time(monkeypatch, fmt):
+    session = FakeSession([[_payment("100.50"), _payment("1")], [_payment("2")]])
+    monkeypatch.setattr(database, "async_session", lambda bind: session)
+    spec = EXPORTS["payments"]
+
+    chunks = [chunk async for chunk in stream_export(spec, build_query(spec), fmt, None, yield_per=2)]
+
+    assert session.options["yield_per"] == 2
+    assert session.closed
+    if fmt == NDJSON:
+        assert len(chunks) == 2
+        first = [orjson.loads(line) for line in chunks[0].splitlines()]
+        assert first[0]["amount"] == "100.50" and first[0]["payment_method"] is None
+    else:
+        assert len(chunks) == 3
+        assert chunks[0] == b"\xef\xbb\xbfid,user_id,amount,currency,payment_date,payment_method,status\n"
+        assert chunks[1].decode().splitlines()[0].endswith(",100.50,JPY,2025-01-01 00:00:00,,Completed")
+
+
+def test_csv_cells_that_look_like_formulas_are_escaped():
+    row = ("=HYPERLINK(\"http://evil\")", "+1", "-2", "@SUM(A1)", "\tx", "\rx", "safe", Decimal("-3"), None)
+
+    cells = encode_csv([row]).decode().rstrip("\n").split(",")
+
+    assert cells[0] == "\"'=HYPERLINK(\"\"http://evil\"\")\""
+    assert cells[1:6] == ["'+1", "'-2", "'@SUM(A1)", "'\tx", "'\rx"]
+    assert cells[6:] == ["safe", "-3", ""]
+
+
+@pytest.mark.asyncio
+async def test_route_rejects_filters_that_do_not_apply():
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[has_admin_role] = lambda: None
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        unsupported = await client.get("/admin/export/users", params={"status": "Completed"})
+        unknown = await client.get("/admin/export/passwords")
+
+    assert unsupported.status_code == 400
+    assert unknown.status_code == 422
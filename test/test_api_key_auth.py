@@ -0,0 +1,153 @@
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+
+from app.api.dependencies import get_db
+from app.core.security import generate_api_key, hash_api_key
+from app.crud import crud_api_key
+from app.dependencies import api_key_auth
+from app.dependencies.api_key_auth import get_api_key_principal, require_scopes
+from app.services.api_key_index import ApiKeyIndex, ApiKeyPrincipal, LastUsedRecorder
+
+
+def _install_index(monkeypatch, keys):
+    """
+    keys（平文キー → ApiKeyPrincipal）を DB 代わりに引くインデックスを差し込む。
+    """
+    loads = []
+
+    async def fake_load(db, key_hash):
+        loads.append(key_hash)
+        return next((p for raw, p in keys.items() if hash_api_key(raw) == key_hash), None)
+
+    class _Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    index = ApiKeyIndex(maxsize=100, ttl=60, negative_ttl=60)
+    recorder = LastUsedRecorder(flush_interval=60)
+    monkeypatch.setattr(index, "_load", fake_load)
+    monkeypatch.setattr("app.core.database.async_session", _Session)
+    monkeypatch.setattr(api_key_auth, "get_api_key_index", lambda: index)
+    monkeypatch.setattr(api_key_auth, "get_last_used_recorder", lambda: recorder)
+    return index, loads, recorder
+
+
+def _make_client(monkeypatch, raw_key):
+    principal = ApiKeyPrincipal(
+        key_id=uuid.uuid4(), user_id=uuid.uuid4(), service_name="batch", scopes=frozenset({"chat"})
+    )
+    _, loads, recorder = _install_index(monkeypatch, {raw_key: principal})
+
+    app = FastAPI()
+
+    @app.get("/chat", dependencies=[Depends(require_scopes("chat"))])
+    async def chat():
+        return {"ok": True}
+
+    @app.get("/embed", dependencies=[Depends(require_scopes("embedding"))])
+    async def embed():
+        return {"ok": True}
+
+    @app.get("/whoami")
+    async def whoami(principal: ApiKeyPrincipal = Depends(get_api_key_principal)):
+        return {"service": principal.service_name}
+
+    return AsyncClient(app=app, base_url="http://test"), loads, recorder
+
+
+@pytest.mark.asyncio
+async def test_api_key_is_resolved_once_and_usage_coalesced(monkeypatch):
+    raw_key = generate_api_key()
+    client, loads, recorder = _make_client(monkeypatch, raw_key)
+    async with client:
+        for _ in range(3):
+            assert (await client.get("/chat", headers={"X-API-Key": raw_key})).status_code == 200
+        assert (await client.get("/embed", headers={"X-API-Key": raw_key})).status_code == 403
+
+    assert len(loads) == 1
+    assert recorder.recorded == 4
+    assert recorder.stats()["pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_is_rejected_and_negatively_cached(monkeypatch):
+    client, loads, _ = _make_client(monkeypatch, generate_api_key())
+    async with client:
+        assert (await client.get("/whoami")).status_code == 401
+        for _ in range(2):
+            assert (await client.get("/whoami", headers={"X-API-Key": "roro_wrong"})).status_code == 401
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_service_routes_require_api_key_scopes(monkeypatch):
+    chat_routes = pytest.importorskip("app.api.routes.chat")  # openai SDK が必要
+    report_routes = pytest.importorskip("app.api.routes.report")
+    chat_key, report_key = generate_api_key(), generate_api_key()
+    owner = uuid.uuid4()
+    _install_index(monkeypatch, {
+        chat_key: ApiKeyPrincipal(key_id=uuid.uuid4(), user_id=owner, service_name="bot", scopes=frozenset({"chat"})),
+        report_key: ApiKeyPrincipal(key_id=uuid.uuid4(), user_id=owner, service_name="batch", scopes=frozenset({"reports"})),
+    })
+    report_users = []
+
+    async def fake_ai(message):
+        return f"re: {message}"
+
+    async def fake_report(db, user_id, **kwargs):
+        report_users.append(user_id)
+        return {"report_id": "r1", "status": "completed"}
+
+    monkeypatch.setattr(chat_routes, "get_ai_response", fake_ai)
+    monkeypatch.setattr(report_routes, "generate_custom_report", fake_report)
+    app = FastAPI()
+    app.include_router(chat_routes.router)
+    app.include_router(report_routes.router)
+    app.dependency_overrides[get_db] = lambda: None
+    report_body = {"pet_id": str(uuid.uuid4()), "pet_name": "ポチ", "species": "犬", "breed": "柴", "age": "3"}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        chat = await client.post("/service/chat/completion", json={"message": "hi"}, headers={"X-API-Key": chat_key})
+        anonymous = await client.post("/service/chat/completion", json={"message": "hi"})
+        wrong_scope = await client.post("/service/reports/custom", json=report_body, headers={"X-API-Key": chat_key})
+        report = await client.post("/service/reports/custom", json=report_body, headers={"X-API-Key": report_key})
+
+    assert (chat.status_code, chat.json()["content"]) == (200, "re: hi")
+    assert anonymous.status_code == 401
+    assert wrong_scope.status_code == 403
+    assert report.status_code == 200 and report_users == [owner]
+
+
+@pytest.mark.asyncio
+async def test_deleted_key_and_restored_user_are_not_served_from_cache(monkeypatch):
+    raw_key = generate_api_key()
+    principal = ApiKeyPrincipal(key_id=uuid.uuid4(), user_id=uuid.uuid4(), service_name="batch", scopes=frozenset())
+    keys = {}
+    index, loads, _ = _install_index(monkeypatch, keys)
+    monkeypatch.setattr(crud_api_key, "get_api_key_index", lambda: index)
+
+    # 無効化中のユーザーのキーは「該当なし」としてキャッシュされる
+    assert await index.resolve(raw_key) is None
+    keys[raw_key] = principal
+    assert await index.resolve(raw_key) is None
+    # 復元時に所有キーのハッシュを渡すと否定キャッシュも破棄される
+    index.invalidate_user(principal.user_id, [hash_api_key(raw_key)])
+    assert await index.resolve(raw_key) == principal
+
+    class _Deleted:
+        key_hash = hash_api_key(raw_key)
+
+    async def fake_delete(db, id, *where):
+        return _Deleted()
+
+    monkeypatch.setattr(crud_api_key.api_keys, "delete_returning", fake_delete)
+    keys.clear()
+    assert await crud_api_key.delete_api_key(None, user_id=principal.user_id, key_id=principal.key_id)
+    assert await index.resolve(raw_key) is None
+    assert len(loads) == 3
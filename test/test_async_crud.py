@@ -0,0 +1,214 @@
+import inspect
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.dependencies import Principal, get_current_user, get_db
+from app.api.routes import api_keys, notifications, user_settings, webhooks
+from app.core.config import get_settings
+from app.core.database import create_engine_from_settings
+from app.crud import crud_api_key, crud_notification, crud_user_setting, crud_webhook
+from app.models import pet, user_auth_provider, user_event_log  # noqa: F401  (マッパー解決用)
+from app.models.user import User
+from app.models.user_setting import UserSetting as UserSettingModel
+from app.schemas.user_setting import UserSettingCreate
+from app.utils.pagination import Page
+
+
+@pytest.mark.parametrize("module", [api_keys, notifications, user_settings, webhooks])
+def test_routes_are_async(module):
+    # 同期エンドポイントはスレッドプールで実行され、AsyncSession を扱えない
+    endpoints = [route for route in module.router.routes if isinstance(route, APIRoute)]
+    assert endpoints
+    for route in endpoints:
+        assert inspect.iscoroutinefunction(route.endpoint), route.path
+
+
+@pytest.mark.parametrize("module", [crud_api_key, crud_notification, crud_user_setting, crud_webhook])
+def test_crud_functions_are_async(module):
+    functions = [
+        obj for name, obj in vars(module).items()
+        if inspect.isfunction(obj) and obj.__module__ == module.__name__
+    ]
+    assert functions
+    for function in functions:
+        assert inspect.iscoroutinefunction(function), function.__name__
+
+
+class RecordingSession:
+    """
+    発行された文を記録し、scalars() には rows を返すだけのセッション。
+    """
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    def _record(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(
+            one=lambda: self.rows[0],
+            all=lambda: self.rows,
+            scalar_one_or_none=lambda: self.rows[0] if self.rows else None,
+        )
+
+    async def scalars(self, stmt):
+        return self._record(stmt)
+
+    async def scalar(self, stmt):
+        self.statements.append(stmt)
+        return self.rows[0] if self.rows else None
+
+    async def execute(self, stmt):
+        return self._record(stmt)
+
+    async def commit(self):
+        self.commits += 1
+
+    def sql(self, index=-1):
+        return str(self.statements[index].compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_crud_reads_are_single_select_statements():
+    user_id = uuid.uuid4()
+    session = RecordingSession()
+
+    await crud_api_key.get_api_keys_by_user(session, user_id)
+    await crud_webhook.get_webhooks_by_user(session, user_id)
+    await crud_user_setting.get_user_setting(session, user_id)
+    await crud_user_setting.get_user_setting_version(session, user_id)
+
+    assert session.sql(0).endswith("FROM api_keys \nWHERE api_keys.user_id = %(user_id_1)s::UUID ORDER BY api_keys.created_at")
+    assert session.sql(1).endswith("FROM webhooks \nWHERE webhooks.user_id = %(user_id_1)s::UUID ORDER BY webhooks.created_at")
+    assert "FROM user_settings \nWHERE user_settings.user_id = " in session.sql(2)
+    assert session.sql(3).startswith("SELECT CAST(xmin AS VARCHAR)")
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_upsert_user_setting_is_one_on_conflict_returning():
+    user_id = uuid.uuid4()
+    stored = SimpleNamespace(id=uuid.uuid4(), user_id=user_id, receive_notifications=False, theme="dark")
+    session = RecordingSession([stored])
+
+    result = await crud_user_setting.upsert_user_setting(
+        session, user_id, UserSettingCreate(receive_notifications=False, theme="dark")
+    )
+
+    sql = session.sql()
+    assert result is stored and session.commits == 1 and len(session.statements) == 1
+    assert sql.startswith("INSERT INTO user_settings")
+    assert "ON CONFLICT (user_id) DO UPDATE SET receive_notifications = " in sql and "theme = " in sql
+    assert "RETURNING user_settings.id, user_settings.user_id" in sql
+    # 同じ行がセッションに残っていても、RETURNING の値で上書きされる
+    assert session.statements[0].get_execution_options()["populate_existing"] is True
+
+
+def _app(user_id):
+    app = FastAPI()
+    for module in (api_keys, notifications, user_settings):
+        app.include_router(module.router)
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=user_id)
+    app.dependency_overrides[get_db] = lambda: None
+    return app
+
+
+@pytest.mark.asyncio
+async def test_routes_are_served_under_their_prefixes(monkeypatch):
+    user_id = uuid.uuid4()
+    now = datetime(2026, 10, 1)
+    settings_by_user = {}
+
+    async def fake_upsert(db, user_id, setting):
+        # user_id ごとに 1 行（2 回目以降は同じ行を更新する ON CONFLICT と同じ振る舞い）
+        row = settings_by_user.setdefault(user_id, SimpleNamespace(id=uuid.uuid4(), user_id=user_id))
+        vars(row).update(setting.dict())
+        return row
+
+    async def fake_create_key(db, user_id, api_key):
+        row = SimpleNamespace(id=uuid.uuid4(), user_id=user_id, created_at=now, last_used_at=None, **api_key.dict())
+        return row, "roro_plain"
+
+    async def fake_list_keys(db, user_id):
+        return []
+
+    async def fake_delete_key(db, user_id, key_id):
+        return False
+
+    async def fake_create_notification(db, user_id, notification):
+        return SimpleNamespace(id=uuid.uuid4(), user_id=user_id, is_read=False, created_at=now, **notification.dict())
+
+    async def fake_version(db, user_id):
+        return 0, None, 0
+
+    async def fake_page(db, user_id, params):
+        return Page([], None)
+
+    monkeypatch.setattr(crud_user_setting, "upsert_user_setting", fake_upsert)
+    monkeypatch.setattr(crud_api_key, "create_api_key", fake_create_key)
+    monkeypatch.setattr(crud_api_key, "get_api_keys_by_user", fake_list_keys)
+    monkeypatch.setattr(crud_api_key, "delete_api_key", fake_delete_key)
+    monkeypatch.setattr(crud_notification, "create_notification", fake_create_notification)
+    monkeypatch.setattr(crud_notification, "get_notifications_version", fake_version)
+    monkeypatch.setattr(crud_notification, "get_notifications_by_user", fake_page)
+
+    async with AsyncClient(app=_app(user_id), base_url="http://test") as client:
+        created = await client.post("/api_keys/", json={"service_name": "batch", "scopes": ["chat"]})
+        listed = await client.get("/api_keys/")
+        missing = await client.delete(f"/api_keys/{uuid.uuid4()}")
+        notified = await client.post("/notifications/", json={"title": "t", "message": "m"})
+        inbox = await client.get("/notifications/")
+        first = await client.put("/user_settings/", json={"theme": "light"})
+        second = await client.put("/user_settings/", json={"theme": "dark", "receive_notifications": False})
+
+    assert created.status_code == 200 and created.json()["key"] == "roro_plain"
+    assert listed.json() == [] and missing.status_code == 404
+    assert notified.status_code == 200 and notified.json()["is_read"] is False
+    assert inbox.status_code == 200 and inbox.json()["items"] == []
+    assert first.status_code == second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert (second.json()["theme"], second.json()["receive_notifications"]) == ("dark", False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URI"), reason="TEST_POSTGRES_URI が未設定")
+async def test_second_put_user_settings_updates_the_same_row():
+    engine = create_engine_from_settings(get_settings(), os.environ["TEST_POSTGRES_URI"])
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    async with session() as db:
+        await db.execute(insert(User).values(id=user_id, email=f"settings-{user_id.hex}@example.com"))
+        await db.commit()
+
+    async def override_get_db():
+        async with session() as db:
+            yield db
+
+    app = _app(user_id)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.put("/user_settings/", json={"theme": "light"})
+            second = await client.put("/user_settings/", json={"theme": "dark", "receive_notifications": False})
+            current = await client.get("/user_settings/")
+
+        assert first.status_code == second.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+        assert (current.json()["theme"], current.json()["receive_notifications"]) == ("dark", False)
+    finally:
+        async with session() as db:
+            await db.execute(delete(UserSettingModel).where(UserSettingModel.user_id == user_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
@@ -0,0 +1,100 @@
+import uuid
+
+import pytest
+from sqlalchemy.sql import Insert, Select
+
+from app.models import pet, user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.schemas.pet import PetBulkCreateItem
+from app.services import identity_cache, pet_service, user_service
+from app.services.api_key_index import ApiKeyIndex, ApiKeyPrincipal
+from app.services.identity_cache import AuthIdentity, IdentityCache
+from app.utils import bulk
+
+
+class _Result:
+    def __init__(self, values):
+        self._values = values
+
+    def all(self):
+        return list(self._values)
+
+
+class _FakeSession:
+    """
+    INSERT は conflict_ids 以外の id を返し、SELECT は owned_ids を返す。
+    """
+
+    def __init__(self, conflict_ids=(), owned_ids=()):
+        self.conflict_ids = set(conflict_ids)
+        self.owned_ids = list(owned_ids)
+        self.inserts = []
+        self.commits = 0
+
+    async def scalars(self, stmt):
+        if isinstance(stmt, Insert):
+            rows = stmt._multi_values[0]
+            self.inserts.append(len(rows))
+            ids = [row[pet_service.Pet.__table__.c.id] for row in rows]
+            return _Result(i for i in ids if i not in self.conflict_ids)
+        assert isinstance(stmt, Select)
+        return _Result(self.owned_ids)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _item(pet_id=None):
+    return PetBulkCreateItem(id=pet_id, name="ポチ", species="犬", breed="柴", age=3)
+
+
+def test_rows_per_statement_respects_bind_limit():
+    assert bulk.rows_per_statement(8) == bulk.MAX_ROWS_PER_STATEMENT
+    assert bulk.rows_per_statement(100) * 100 <= bulk.MAX_BIND_PARAMS
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_pets_single_transaction_with_item_results():
+    mine, theirs = uuid.uuid4(), uuid.uuid4()
+    items = [_item() for _ in range(2500)] + [_item(mine), _item(theirs), _item(mine)]
+    db = _FakeSession(conflict_ids={mine, theirs}, owned_ids=[mine])
+
+    result = await pet_service.bulk_create_pets(db, uuid.uuid4(), items)
+
+    assert db.inserts == [1000, 1000, 502]
+    assert db.commits == 1
+    assert [item.status for item in result.items[-3:]] == ["exists", "conflict", "duplicate"]
+    assert result.succeeded == 2501
+    assert result.failed == 2
+    assert [item.index for item in result.items] == list(range(len(items)))
+
+
+@pytest.mark.asyncio
+async def test_bulk_deactivate_invalidates_each_cache_in_one_pass(monkeypatch):
+    changed, untouched = [uuid.uuid4() for _ in range(3)], uuid.uuid4()
+    identities = IdentityCache(maxsize=100, ttl=60)
+    keys = ApiKeyIndex(maxsize=100, ttl=60, negative_ttl=60)
+    for user_id in [*changed, untouched]:
+        for provider in ("google", "github"):
+            identities._cache.set((provider, str(user_id)), AuthIdentity(id=user_id, is_active=True, roles=frozenset()))
+        keys._cache.set(f"hash-{user_id}", ApiKeyPrincipal(
+            key_id=uuid.uuid4(), user_id=user_id, service_name="batch", scopes=frozenset(),
+        ))
+    scans = []
+    for cache in (identities._cache, keys._cache):
+        monkeypatch.setattr(cache, "items", lambda items=cache.items: scans.append(1) or items())
+    monkeypatch.setattr(identity_cache, "get_identity_cache", lambda: identities)
+    monkeypatch.setattr(user_service, "get_api_key_index", lambda: keys)
+
+    class _Session:
+        async def scalars(self, stmt):
+            return _Result(changed)
+
+        async def commit(self):
+            pass
+
+    result = await user_service.bulk_set_active(_Session(), [*changed, untouched], is_active=False)
+
+    assert len(scans) == 2
+    assert [key for key, _ in identities._cache.items()] == [("google", str(untouched)), ("github", str(untouched))]
+    assert [key for key, _ in keys._cache.items()] == [f"hash-{untouched}"]
+    assert (result.succeeded, result.failed) == (3, 1)
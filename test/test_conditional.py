@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette.requests import Request
+
+from app.api.dependencies import Principal, get_current_user, get_db
+from app.api.routes import pet as pet_routes
+from app.utils import conditional
+from app.utils.pagination import Page
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_etag_depends_on_version_parts():
+    first = conditional.make_validators("pets", 1, 3, datetime(2025, 1, 1))
+
+    assert first.etag.startswith('W/"')
+    assert first == conditional.make_validators("pets", 1, 3, datetime(2025, 1, 1))
+    assert first.etag != conditional.make_validators("pets", 1, 2, datetime(2025, 1, 1)).etag
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    updated = datetime(2025, 1, 1, 12, 0, 0, 500)
+    validators = conditional.make_validators("x", updated, last_modified=updated)
+    later = format_datetime(validators.last_modified + timedelta(seconds=1), usegmt=True)
+
+    assert conditional.is_not_modified(_request(if_none_match=f'"other", {validators.etag}'), validators)
+    assert conditional.is_not_modified(_request(if_none_match=validators.etag.removeprefix("W/")), validators)
+    assert conditional.is_not_modified(_request(if_modified_since=later), validators)
+    assert conditional.is_not_modified(_request(if_modified_since=validators.headers()["Last-Modified"]), validators)
+    assert not conditional.is_not_modified(_request(if_none_match='W/"other"', if_modified_since=later), validators)
+    assert not conditional.is_not_modified(_request(if_modified_since="not a date"), validators)
+    assert not conditional.is_not_modified(_request(), validators)
+
+
+@pytest.mark.asyncio
+async def test_pets_list_answers_304_without_loading_the_page(monkeypatch):
+    version = [2, datetime(2025, 1, 1)]
+    pages_loaded = []
+
+    async def fake_version(db, user_id):
+        return tuple(version)
+
+    async def fake_page(db, user_id, params):
+        pages_loaded.append(user_id)
+        return Page([], None)
+
+    monkeypatch.setattr(pet_routes.pet_service, "get_pets_version", fake_version)
+    monkeypatch.setattr(pet_routes.pet_service, "get_pets_by_user", fake_page)
+
+    app = FastAPI()
+    app.include_router(pet_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=uuid.UUID(int=1))
+    app.dependency_overrides[get_db] = lambda: None
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.get("/pets/")
+        etag = first.headers["etag"]
+        cached = await client.get("/pets/", headers={"If-None-Match": etag})
+        version[0] = 1  # 1 件削除
+        changed = await client.get("/pets/", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and first.headers["cache-control"] == conditional.CACHE_CONTROL
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(pages_loaded) == 2
@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect
+
+from app.crud.base import CRUDBase
+from app.models import pet, user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.models.pet import Pet
+from app.models.user import User
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def one_or_none(self):
+        return self._value
+
+
+class _FakeSession:
+    def __init__(self, returned=None):
+        self.returned = returned
+        self.statements = []
+        self.commits = 0
+
+    async def scalars(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=dialect())))
+        return _Result(self.returned)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_models_use_eager_defaults():
+    from sqlalchemy import inspect
+
+    assert inspect(Pet).eager_defaults is True
+    assert inspect(User).eager_defaults is True
+
+
+@pytest.mark.asyncio
+async def test_update_returning_is_single_statement():
+    row = object()
+    db = _FakeSession(returned=row)
+
+    result = await CRUDBase(User).update_returning(db, uuid.uuid4(), {"is_active": False}, User.is_active == True)
+
+    assert result is row
+    assert db.commits == 1
+    [sql] = db.statements
+    assert sql.startswith("UPDATE users SET is_active=")
+    assert "users.is_active = true" in sql
+    assert "RETURNING users.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_delete_returning_reports_missing_row():
+    db = _FakeSession(returned=None)
+
+    assert await CRUDBase(Pet).delete_returning(db, uuid.uuid4()) is None
+    [sql] = db.statements
+    assert sql.startswith("DELETE FROM pets WHERE pets.id =")
+    assert "RETURNING pets.id" in sql
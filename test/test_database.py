@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.config import get_settings
+from app.core.database import InstrumentedQueuePool, create_engine_from_settings, make_async_url, prefill_pool
+
+
+def test_make_async_url_uses_asyncpg():
+    assert make_async_url("postgresql://u:p@db/roro") == "postgresql+asyncpg://u:p@db/roro"
+    assert make_async_url("postgres://u:p@db/roro") == "postgresql+asyncpg://u:p@db/roro"
+    assert make_async_url("postgresql+asyncpg://u:p@db/roro") == "postgresql+asyncpg://u:p@db/roro"
+
+
+@pytest.mark.asyncio
+async def test_engine_uses_tuned_instrumented_pool():
+    cfg = get_settings().model_copy(update={
+        "postgres_uri": "postgresql://u:p@127.0.0.1:1/roro",
+        "db_pool_size": 3,
+        "db_max_overflow": 1,
+        "db_pool_timeout": 0.5,
+    })
+    engine = create_engine_from_settings(cfg)
+    try:
+        pool = engine.pool
+        assert isinstance(pool, InstrumentedQueuePool)
+        stats = pool.stats()
+        assert (stats["size"], stats["max_overflow"], stats["checked_out"]) == (3, 1, 0)
+
+        # 到達できない DB では事前確立は 0 本で終わり、起動は継続できる
+        assert await prefill_pool(engine, 2) == 0
+        assert pool.stats()["wait_ms"]["count"] >= 1
+    finally:
+        await engine.dispose()
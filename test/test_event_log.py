@@ -0,0 +1,138 @@
+import uuid
+
+import orjson
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.background.batch_writer import BatchWriter
+from app.events import event_handler
+from app.events.event_handler import build_rows, insert_events, log_event
+from app.models import user  # noqa: F401  (UserEventLog.user のマッパー解決用)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, rows):
+        self.statements.append((statement.table.name, rows))
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    batches = []
+
+    async def flush(events):
+        batches.append(events)
+
+    writer = BatchWriter("event_log", flush, max_batch=2, flush_interval=60, max_pending=3)
+    monkeypatch.setattr(event_handler, "get_event_log_writer", lambda: writer)
+    writer.batches = batches
+    return writer
+
+
+@pytest.mark.asyncio
+async def test_events_are_buffered_and_drained_on_stop(writer):
+    actor, target = uuid.uuid4(), uuid.uuid4()
+    await writer.start()
+
+    assert log_event("user_deactivated", actor, {"target_user_id": str(target)})
+    assert log_event("settings_changed", actor, {"keys": ["theme"]})
+    assert log_event("user_restored", None, {"target_user_id": "not-a-uuid"})
+    assert not log_event("dropped", actor, {})
+
+    await writer.stop()
+
+    events = [event for batch in writer.batches for event in batch]
+    assert [event["event_type"] for event in events] == ["user_deactivated", "settings_changed", "user_restored"]
+    assert events[0]["target_user_id"] == target
+    assert events[2]["target_user_id"] is None
+    assert writer.stats()["dropped"] == 1
+    assert writer.stats()["written"] == 3
+
+
+def test_rows_split_into_audit_and_user_event_logs():
+    details = {"target_user_id": uuid.uuid4()}
+    events = [
+        {"timestamp": None, "event_type": "user_deactivated", "user_id": uuid.uuid4(),
+         "target_user_id": details["target_user_id"], "description": orjson.dumps(details).decode()},
+        {"timestamp": None, "event_type": "x" * 120, "user_id": None, "target_user_id": None, "description": "{}"},
+    ]
+
+    audit_rows, user_rows = build_rows(events)
+
+    assert [row["action"] for row in audit_rows] == ["user_deactivated", "x" * 100]
+    assert len(user_rows) == 1 and user_rows[0]["user_id"] == details["target_user_id"]
+
+
+@pytest.mark.asyncio
+async def test_flush_is_one_multi_row_insert_per_table():
+    session = RecordingSession()
+    events = [
+        {"timestamp": None, "event_type": "e", "user_id": None, "target_user_id": uuid.uuid4(), "description": "{}"}
+        for _ in range(3)
+    ]
+
+    await insert_events(session, events)
+
+    assert [(table, len(rows)) for table, rows in session.statements] == [("audit_logs", 3), ("user_event_logs", 3)]
+    assert session.commits == 1
+
+
+class ForeignKeyViolatingSession(RecordingSession):
+    """
+    存在しないユーザーを参照する user_event_logs 行があると IntegrityError を送出するセッション。
+    """
+
+    def __init__(self, existing):
+        super().__init__()
+        self.existing = existing
+        self.rollbacks = 0
+
+    async def execute(self, statement, rows=None):
+        if rows is None:
+            return _Scalars(self.existing)
+        if statement.table.name == "user_event_logs" and any(row["user_id"] not in self.existing for row in rows):
+            raise IntegrityError("INSERT INTO user_event_logs", rows, Exception("fk violation"))
+        await super().execute(statement, rows)
+
+    async def rollback(self):
+        self.statements.clear()
+        self.rollbacks += 1
+
+
+class _Scalars:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return iter(self.values)
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_does_not_drop_the_whole_batch():
+    alive, deleted = uuid.uuid4(), uuid.uuid4()
+    session = ForeignKeyViolatingSession({alive})
+    events = [
+        {"timestamp": None, "event_type": "e", "user_id": actor, "target_user_id": target, "description": "{}"}
+        for actor, target in [(alive, alive), (deleted, deleted), (None, alive)]
+    ]
+
+    async def flush(batch):
+        return await insert_events(session, batch)
+
+    writer = BatchWriter("event_log", flush, max_batch=10, flush_interval=60)
+    for event in events:
+        writer.submit(event)
+    await writer.flush_once()
+
+    (_, audit_rows), (_, user_rows) = session.statements
+    assert [row["user_id"] for row in audit_rows] == [alive, None, None]
+    assert [row["user_id"] for row in user_rows] == [alive, alive]
+    assert session.rollbacks == 1 and session.commits == 1
+    stats = writer.stats()
+    assert (stats["written"], stats["rejected"], stats["failed"]) == (2, 1, 0)
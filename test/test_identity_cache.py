@@ -0,0 +1,132 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud import roles as crud_roles
+from app.models import pet, user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.services import identity_cache, role_service, user_service
+from app.services.api_key_index import ApiKeyIndex
+from app.services.identity_cache import AuthIdentity, IdentityCache
+
+
+class _Rows:
+    def __init__(self, row=None, scalar=None):
+        self._row = row
+        self._scalar = scalar
+
+    def one_or_none(self):
+        return self._row
+
+    def scalar_one_or_none(self):
+        return self._scalar
+
+
+class CountingSession:
+    """
+    execute() の回数を数え、results を順に返すセッション。
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.queries = 0
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        return self.results.pop(0) if self.results else _Rows()
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _seed(cache, user_id, *providers):
+    for provider in providers:
+        cache._cache.set((provider, f"{provider}-{user_id}"), AuthIdentity(id=user_id, is_active=True, roles=frozenset()))
+
+
+def _keys(cache):
+    return sorted(key for key, _ in cache._cache.items())
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = IdentityCache(maxsize=100, ttl=60)
+    monkeypatch.setattr(identity_cache, "get_identity_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_warm_hit_issues_no_queries():
+    cache = IdentityCache(maxsize=100, ttl=60)
+    user_id = uuid.uuid4()
+    db = CountingSession(_Rows(row=(user_id, True, ["admin"])))
+
+    first = await cache.resolve(db, "google", "sub-1")
+    second = await cache.resolve(db, "google", "sub-1")
+
+    assert first == second == AuthIdentity(id=user_id, is_active=True, roles=frozenset({"admin"}))
+    assert first.is_admin
+    assert db.queries == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_identity_is_not_cached():
+    cache = IdentityCache(maxsize=100, ttl=60)
+    db = CountingSession()
+
+    assert await cache.resolve(db, "google", "new-user") is None
+    assert await cache.resolve(db, "google", "new-user") is None
+    assert db.queries == 2
+
+
+def test_invalidate_user_drops_every_provider_entry(cache):
+    target, other = uuid.uuid4(), uuid.uuid4()
+    _seed(cache, target, "google", "github", "apple")
+    _seed(cache, other, "google")
+
+    identity_cache.invalidate_user(target)
+
+    assert _keys(cache) == [("google", f"google-{other}")]
+
+
+@pytest.mark.asyncio
+async def test_deactivate_and_restore_invalidate_identity_cache(cache, monkeypatch):
+    user_id = uuid.uuid4()
+
+    async def fake_update_returning(db, id, values, *where):
+        return SimpleNamespace(id=user_id)
+
+    async def no_key_hashes(db, user_ids):
+        return []
+
+    monkeypatch.setattr(user_service.users, "update_returning", fake_update_returning)
+    monkeypatch.setattr(user_service, "get_key_hashes_by_users", no_key_hashes)
+    monkeypatch.setattr(user_service, "get_api_key_index", lambda: ApiKeyIndex(maxsize=10, ttl=60, negative_ttl=60))
+
+    _seed(cache, user_id, "google", "github")
+    assert await user_service.deactivate_user(None, user_id)
+    assert _keys(cache) == []
+
+    _seed(cache, user_id, "google")
+    assert await user_service.restore_user(None, user_id)
+    assert _keys(cache) == []
+
+
+@pytest.mark.asyncio
+async def test_role_assignment_invalidates_identity_cache(cache):
+    user_id, other = uuid.uuid4(), uuid.uuid4()
+    _seed(cache, user_id, "google")
+    _seed(cache, other, "google")
+    db_user = SimpleNamespace(id=user_id, roles=[])
+    db = CountingSession(_Rows(scalar=db_user), _Rows(scalar=SimpleNamespace(name="admin")))
+
+    await role_service.assign_role(db, user_id, 1)
+
+    assert db.commits == 1 and len(db_user.roles) == 1
+    assert _keys(cache) == [("google", f"google-{other}")]
+
+    _seed(cache, other, "github")
+    await crud_roles.assign_role(CountingSession(), other, uuid.uuid4())
+    assert _keys(cache) == []
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+
+from app.core.jwks import IssuerRegistry
+
+AUDIENCE = "api://roro"
+
+
+def _make_key(kid: str):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    public.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return pem, public
+
+
+class StubJWKSServer:
+    """ローカルで discovery と JWKS を返すスタブ IdP。"""
+
+    def __init__(self):
+        self.keys = []
+        self.jwks_requests = 0
+        self.max_age = 600
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/.well-known/openid-configuration":
+                    body = {"issuer": stub.issuer, "jwks_uri": f"{stub.issuer}/jwks"}
+                elif self.path == "/jwks":
+                    stub.jwks_requests += 1
+                    time.sleep(0.05)
+                    body = {"keys": list(stub.keys)}
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={stub.max_age}")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.issuer = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def idp():
+    server = StubJWKSServer()
+    yield server
+    server.close()
+
+
+def _token(idp, pem, kid, **claims):
+    body = {"iss": idp.issuer, "sub": "user-1", "aud": AUDIENCE, "exp": int(time.time()) + 60, **claims}
+    return jwt.encode(body, pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.mark.asyncio
+async def test_verify_uses_cached_keys(idp):
+    pem, public = _make_key("k1")
+    idp.keys = [public]
+    registry = IssuerRegistry([idp.issuer + "/"])
+    await registry.start()
+    try:
+        for _ in range(3):
+            claims = await registry.verify(_token(idp, pem, "k1"), audience=AUDIENCE)
+            assert claims["sub"] == "user-1"
+        assert idp.jwks_requests == 1
+    finally:
+        await registry.stop()
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_once(idp):
+    pem1, public1 = _make_key("k1")
+    pem2, public2 = _make_key("k2")
+    idp.keys = [public1]
+    registry = IssuerRegistry([idp.issuer], min_refetch_interval=0)
+    await registry.start()
+    try:
+        idp.keys = [public1, public2]
+        token = _token(idp, pem2, "k2")
+        results = await asyncio.gather(*(registry.verify(token, audience=AUDIENCE) for _ in range(5)))
+        assert all(r["sub"] == "user-1" for r in results)
+        assert idp.jwks_requests == 2
+    finally:
+        await registry.stop()
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_signature_and_unknown_issuer(idp):
+    pem, public = _make_key("k1")
+    other_pem, _ = _make_key("k1")
+    idp.keys = [public]
+    registry = IssuerRegistry([idp.issuer])
+    await registry.start()
+    try:
+        with pytest.raises(JWTError):
+            await registry.verify(_token(idp, other_pem, "k1"), audience=AUDIENCE)
+        with pytest.raises(JWTError):
+            await registry.verify(_token(idp, pem, "k1", iss="https://evil.example.com"), audience=AUDIENCE)
+    finally:
+        await registry.stop()
+
+
+@pytest.mark.asyncio
+async def test_short_max_age_does_not_refetch_in_a_tight_loop(idp):
+    _, public = _make_key("k1")
+    idp.keys = [public]
+    idp.max_age = 60
+    registry = IssuerRegistry([idp.issuer], refresh_margin=300, min_refetch_interval=30)
+    await registry.start()
+    try:
+        await asyncio.sleep(0.2)
+        entry = registry._issuers[idp.issuer]
+        # 余裕は max-age の半分に縮められ、取得直後に更新対象にならない
+        assert entry.refresh_at - entry.last_fetch_at == pytest.approx(30, abs=1)
+        assert idp.jwks_requests == 1
+
+        # max-age: 0 でも再取得の間隔は min_refetch_interval 以上
+        idp.max_age = 0
+        await registry._refresh(entry)
+        assert entry.refresh_at <= time.time()
+        assert registry._next_delay(time.time()) == 30
+    finally:
+        await registry.stop()
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import re
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import create_engine_from_settings
+from app.models import pet, user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.services import statistics
+from app.models.user import User
+from app.services.statistics import KpiReconciler, load_counters, reconcile
+
+MIGRATION = Path(__file__).parents[1] / "alembic" / "versions" / "c4d8a2e6f1b9_kpi_counters.py"
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_are_cached(monkeypatch):
+    loads = []
+
+    async def fake_load(db):
+        loads.append(db)
+        return {"users_total": 10, "users_active": 7, "reports_total": 3}
+
+    monkeypatch.setattr(statistics, "load_counters", fake_load)
+    reconciler = KpiReconciler(cache_ttl=60, interval=3600)
+
+    first = await reconciler.get_stats(db=None)
+    second = await reconciler.get_stats(db=None)
+
+    assert first == {"total_users": 10, "active_users": 7, "inactive_users": 3, "total_reports": 3}
+    assert second == first
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drift_clears_cache(monkeypatch):
+    class _Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def fake_reconcile(db):
+        return {"users_total": 0, "users_active": -2, "reports_total": 0}
+
+    async def fake_load(db):
+        return {"users_total": 10, "users_active": 7, "reports_total": 3}
+
+    monkeypatch.setattr("app.core.database.async_session", _Session)
+    monkeypatch.setattr(statistics, "reconcile", fake_reconcile)
+    monkeypatch.setattr(statistics, "load_counters", fake_load)
+    reconciler = KpiReconciler(cache_ttl=60, interval=3600)
+    await reconciler.get_stats(db=None)
+
+    assert await reconciler.run_once() == {"users_total": 0, "users_active": -2, "reports_total": 0}
+    assert reconciler.stats()["corrections"] == 1
+    assert reconciler.stats()["cache"]["size"] == 0
+
+
+def test_trigger_functions_update_counters_in_name_order():
+    # reconcile は ORDER BY name でロックするため、トリガー関数内の更新順も name 順でなければならない
+    bodies = MIGRATION.read_text().split("CREATE OR REPLACE FUNCTION ")[1:]
+    assert len(bodies) == 5
+    for body in bodies:
+        names = re.findall(r"WHERE name = '(\w+)'", body)
+        assert names and names == sorted(names), body.split("(")[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URI"), reason="TEST_POSTGRES_URI が未設定")
+async def test_triggers_and_reconcile_against_database():
+    # マイグレーション適用済み（kpi_counters とトリガーあり）の DB を前提とする
+    engine = create_engine_from_settings(get_settings(), os.environ["TEST_POSTGRES_URI"])
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    tag = uuid.uuid4().hex[:8]
+
+    async def add_users(count: int, active: bool):
+        async with session() as db:
+            await db.execute(insert(User), [
+                {"id": uuid.uuid4(), "email": f"kpi-{tag}-{uuid.uuid4().hex}@example.com", "is_active": active}
+                for _ in range(count)
+            ])
+            await db.commit()
+
+    async def counters():
+        async with session() as db:
+            return await load_counters(db)
+
+    async def run_reconcile():
+        async with session() as db:
+            return await reconcile(db)
+
+    try:
+        await run_reconcile()
+        before = await counters()
+
+        await add_users(3, True)
+        await add_users(1, False)
+        async with session() as db:
+            await db.execute(
+                update(User).where(User.email.like(f"kpi-{tag}-%"), User.is_active == True)
+                .values(is_active=False).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        after = await counters()
+        assert after["users_total"] - before["users_total"] == 4
+        assert after["users_active"] - before["users_active"] == 0
+
+        # トリガーと突き合わせを並行させてもデッドロックせず、ずれも生じない
+        results = await asyncio.gather(*[add_users(5, True) for _ in range(10)], *[run_reconcile() for _ in range(5)])
+        assert any(drift is not None for drift in results[10:])
+        assert await run_reconcile() == {"users_total": 0, "users_active": 0, "reports_total": 0}
+        assert (await counters())["users_active"] - before["users_active"] == 50
+    finally:
+        async with session() as db:
+            await db.execute(delete(User).where(User.email.like(f"kpi-{tag}-%")))
+            await db.commit()
+        await engine.dispose()
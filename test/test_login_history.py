@@ -0,0 +1,48 @@
+import ipaddress
+import uuid
+
+import pytest
+from starlette.requests import HTTPConnection
+
+from app.background.batch_writer import BatchWriter
+from app.crud import login_history
+from app.crud.login_history import insert_logins, record_login
+from app.models import user  # noqa: F401  (LoginHistory.user のマッパー解決用)
+from app.utils.request_meta import UNKNOWN_IP, get_client_ip
+
+
+class RecordingSession:
+    def __init__(self):
+        self.rows = []
+
+    async def execute(self, statement, rows):
+        assert statement.table.name == "login_history"
+        self.rows.extend(rows)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_malformed_forwarded_for_still_produces_insertable_row(monkeypatch):
+    session = RecordingSession()
+
+    async def flush(rows):
+        await insert_logins(session, rows)
+
+    writer = BatchWriter("login_history", flush, max_batch=10, flush_interval=60, max_pending=10)
+    monkeypatch.setattr(login_history, "get_login_history_writer", lambda: writer)
+
+    request = HTTPConnection({
+        "type": "http",
+        "headers": [(b"x-forwarded-for", b"<script>, 999.1.1.1")],
+        "client": ("192.0.2.10", 5000),
+    })
+    record_login(user_id=uuid.uuid4(), ip=get_client_ip(request), ua="pytest", success=False)
+    record_login(user_id=None, ip="unknown, 203.0.113.9", ua=None, success=False)
+    await writer.flush_once()
+
+    assert [row["ip_address"] for row in session.rows] == ["192.0.2.10", UNKNOWN_IP]
+    for row in session.rows:
+        ipaddress.ip_address(row["ip_address"])  # INET 列に入る値であること
+    assert writer.stats()["failed"] == 0
@@ -0,0 +1,75 @@
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.security import create_access_token
+from app.middlewares.auth_middleware import AuthMiddleware
+from app.middlewares.error_handler import ExceptionHandlerMiddleware
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+async def boom(request):
+    raise RuntimeError("boom")
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"{i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def _client():
+    app = Starlette(routes=[Route("/pets/", ok), Route("/health", ok), Route("/healthz", ok), Route("/docs-internal", ok), Route("/boom", boom), Route("/stream", stream)])
+    app.add_middleware(AuthMiddleware)
+    app.add_middleware(ExceptionHandlerMiddleware)
+    return AsyncClient(app=app, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_auth_middleware_checks_token_outside_allowlist():
+    token = create_access_token({"sub": "user-1"})
+    async with _client() as client:
+        missing = await client.get("/pets/")
+        scheme = await client.get("/pets/", headers={"Authorization": f"Basic {token}"})
+        invalid = await client.get("/pets/", headers={"Authorization": "Bearer not-a-token"})
+        valid = await client.get("/pets/", headers={"Authorization": f"Bearer {token}"})
+        health = await client.get("/health")
+
+    assert (missing.status_code, missing.json()["detail"]) == (401, "Authorization header missing.")
+    assert (scheme.status_code, scheme.json()["detail"]) == (401, "Invalid authentication scheme.")
+    assert (invalid.status_code, invalid.json()["detail"]) == (401, "Invalid or expired token.")
+    assert valid.status_code == 200
+    assert health.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unhandled_errors_become_500_and_streams_pass_through():
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user-1'})}"}
+    async with _client() as client:
+        failed = await client.get("/boom", headers=headers)
+        streamed = await client.get("/stream", headers=headers)
+
+    assert (failed.status_code, failed.json()) == (500, {"detail": "Internal Server Error"})
+    assert streamed.text == "0\n1\n2\n"
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_match_whole_segments_only():
+    async with _client() as client:
+        health = await client.get("/health")
+        healthz = await client.get("/healthz")
+        docs_internal = await client.get("/docs-internal")
+
+    assert health.status_code == 200
+    assert healthz.status_code == 401
+    assert docs_internal.status_code == 401
+    middleware = AuthMiddleware(ok)
+    assert middleware.is_exempt("/docs") and middleware.is_exempt("/docs/oauth2-redirect")
+    assert not middleware.is_exempt("/openapi.json.bak")
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.pet import Pet
+from app.models import user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.utils.pagination import CursorParams, build_page, decode_cursor, encode_cursor, keyset_query
+
+
+def test_cursor_roundtrip_and_tampering():
+    created_at, row_id = datetime(2026, 10, 1, 12, 30, 15, 123456), uuid.uuid4()
+    cursor = encode_cursor(created_at, row_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_query_uses_row_comparison_without_offset():
+    cursor = encode_cursor(datetime(2026, 10, 1), uuid.uuid4())
+    stmt = keyset_query(
+        select(Pet).where(Pet.user_id == uuid.uuid4()),
+        sort_col=Pet.created_at,
+        id_col=Pet.id,
+        params=CursorParams(cursor=cursor, limit=20),
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(pets.created_at, pets.id) < (" in sql
+    assert "ORDER BY pets.created_at DESC, pets.id DESC" in sql
+    assert "OFFSET" not in sql
+    assert stmt._limit == 21
+
+
+def test_build_page_sets_next_cursor_only_when_more_rows():
+    rows = [SimpleNamespace(id=uuid.uuid4(), created_at=datetime(2026, 10, 3 - i)) for i in range(3)]
+    page = build_page(rows, sort_attr="created_at", params=CursorParams(cursor=None, limit=2))
+    assert page.items == rows[:2]
+    assert decode_cursor(page.next_cursor) == (rows[1].created_at, rows[1].id)
+
+    last = build_page(rows[:2], sort_attr="created_at", params=CursorParams(cursor=None, limit=2))
+    assert last.next_cursor is None
+
+
+def test_search_query_is_trigram_indexable_and_ranked():
+    from app.services.user_search import build_search_query
+    from app.models.user import User
+
+    stmt, score = build_search_query("ali_ce")
+    cursor = encode_cursor(0.42, uuid.uuid4())
+    sql = str(
+        keyset_query(stmt, sort_col=score, id_col=User.id, params=CursorParams(cursor=cursor, limit=10))
+        .compile(dialect=postgresql.dialect())
+    )
+    assert "users.username ILIKE" in sql and "users.email %%" in sql
+    assert "ORDER BY score DESC, users.id DESC" in sql
+    assert decode_cursor(cursor)[0] == 0.42
+
+
+def test_create_all_enables_pg_trgm_before_the_trigram_indexes():
+    from sqlalchemy import create_mock_engine
+    from app.models.user import User
+
+    ddl = []
+    engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: ddl.append(str(sql.compile(dialect=engine.dialect))))
+    User.__table__.create(engine, checkfirst=False)
+
+    extension = next(i for i, sql in enumerate(ddl) if "CREATE EXTENSION IF NOT EXISTS pg_trgm" in sql)
+    trigram = [i for i, sql in enumerate(ddl) if "gin_trgm_ops" in sql]
+    assert len(trigram) == 3 and extension < min(trigram)
+
+
+def test_null_sort_values_page_through_without_errors():
+    rows = [SimpleNamespace(id=uuid.UUID(int=9 - i), created_at=None) for i in range(3)]
+    page = build_page(rows, sort_attr="created_at", params=CursorParams(cursor=None, limit=2))
+    assert decode_cursor(page.next_cursor) == (None, rows[1].id)
+
+    stmt = keyset_query(
+        select(Pet),
+        sort_col=Pet.created_at,
+        id_col=Pet.id,
+        params=CursorParams(cursor=page.next_cursor, limit=2),
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "pets.created_at IS NULL AND pets.id < " in sql
+    assert "OR pets.created_at IS NOT NULL" in sql
+    assert "ORDER BY pets.created_at DESC, pets.id DESC" in sql
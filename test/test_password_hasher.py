@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.password_hasher import PasswordHasher
+
+
+class BlockingContext:
+    """
+    hash() が release されるまでワーカースレッドを占有する CryptContext 代わり。
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+
+    def hash(self, password):
+        self.threads.append(threading.get_ident())
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def to_dict(self):
+        return {"bcrypt__rounds": 4}
+
+
+async def _wait_until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timeout")
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_off_the_event_loop():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, max_workers=1, max_queue=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while not context.release.is_set():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    try:
+        task = asyncio.create_task(hasher.hash("secret"))
+        tick_task = asyncio.create_task(ticker())
+        await _wait_until(lambda: ticks >= 3)  # 計算中もイベントループは他の処理を進められる
+        context.release.set()
+        assert await task == "hashed:secret"
+        await tick_task
+        assert context.threads and context.threads[0] != threading.get_ident()
+    finally:
+        context.release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_503_and_reported_in_stats():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, max_workers=1, max_queue=1)
+    try:
+        running = asyncio.create_task(hasher.hash("a"))
+        queued = asyncio.create_task(hasher.hash("b"))
+        await _wait_until(lambda: len(context.threads) == 1)
+
+        stats = hasher.stats()
+        assert (stats["in_flight"], stats["queue_depth"], stats["peak_queue_depth"]) == (1, 1, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            await hasher.hash("c")
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+
+        context.release.set()
+        assert await asyncio.gather(running, queued) == ["hashed:a", "hashed:b"]
+        stats = hasher.stats()
+        assert (stats["queue_depth"], stats["completed"], stats["rejected"]) == (0, 2, 1)
+        assert stats["latency_ms"]["hash"]["count"] == 2
+    finally:
+        context.release.set()
+        hasher.shutdown()
@@ -0,0 +1,44 @@
+import pytest
+
+from app.core import metrics
+from app.core.password_policy import build_context, calibrate
+from app.services.password_hasher import PasswordHasher
+
+
+def test_calibrate_picks_highest_rounds_under_target():
+    best, timings = calibrate(target_ms=10_000, min_rounds=4, max_rounds=6, samples=1)
+    assert best == 6
+    assert sorted(timings) == [4, 5, 6]
+
+    best, _ = calibrate(target_ms=0, min_rounds=4, max_rounds=6, samples=1)
+    assert best == 4
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_old_cost():
+    old_hash = build_context(4).hash("secret")
+    hasher = PasswordHasher(build_context(5), max_workers=1, max_queue=1)
+    try:
+        assert hasher.needs_update(old_hash)
+
+        ok, new_hash = await hasher.verify_and_update("secret", old_hash)
+        assert ok and new_hash is not None
+        assert not hasher.needs_update(new_hash)
+
+        assert await hasher.verify_and_update("secret", new_hash) == (True, None)
+        assert (await hasher.verify_and_update("wrong", old_hash))[0] is False
+
+        latency = hasher.stats()["latency_ms"]
+        assert latency["verify"]["count"] == 3
+        assert latency["hash"]["count"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_histogram_snapshot():
+    hist = metrics.Histogram(buckets=(10, 100))
+    for value in (1, 5, 50, 500):
+        hist.observe(value)
+    snap = hist.snapshot()
+    assert snap["buckets"] == {"le_10": 2, "le_100": 3, "le_inf": 4}
+    assert snap["p50"] == 10
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+
+from app.core import principal as principal_module
+from app.core.database import get_db
+from app.core.principal import Principal, get_principal, require_admin
+from app.core.security import create_access_token
+
+
+def _make_client(monkeypatch):
+    decoded = []
+    original = principal_module.decode_access_token
+
+    def counting_decode(token):
+        decoded.append(token)
+        return original(token)
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(principal_module, "decode_access_token", counting_decode)
+
+    app = FastAPI()
+    app.dependency_overrides[get_db] = no_db
+
+    @app.get("/admin", dependencies=[Depends(require_admin)])
+    async def admin(user: Principal = Depends(get_principal)):
+        return {"id": str(user.id), "is_admin": user.is_admin}
+
+    return AsyncClient(app=app, base_url="http://test"), decoded
+
+
+@pytest.mark.asyncio
+async def test_token_is_decoded_once_per_request(monkeypatch):
+    user_id = uuid.uuid4()
+    client, decoded = _make_client(monkeypatch)
+    async with client:
+        token = create_access_token({"sub": str(user_id), "is_admin": True})
+        response = await client.get("/admin", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == {"id": str(user_id), "is_admin": True}
+    assert len(decoded) == 1
+
+
+@pytest.mark.asyncio
+async def test_non_admin_and_invalid_tokens_are_rejected(monkeypatch):
+    client, _ = _make_client(monkeypatch)
+    async with client:
+        token = create_access_token({"sub": str(uuid.uuid4())})
+        assert (await client.get("/admin", headers={"Authorization": f"Bearer {token}"})).status_code == 403
+        assert (await client.get("/admin", headers={"Authorization": "Bearer broken"})).status_code == 401
+        assert (await client.get("/admin")).status_code == 401
@@ -0,0 +1,82 @@
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import HTTPConnection
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.rate_limit import MemoryBucketBackend, RateLimitMiddleware
+from app.core.config import get_settings
+from app.core.security import create_access_token
+
+
+def _make_client(**kwargs):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/pets/", ok), Route("/reports/custom", ok, methods=["POST"])])
+    app.add_middleware(RateLimitMiddleware, backend=MemoryBucketBackend(), **kwargs)
+    return AsyncClient(app=app, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_throttles_with_retry_after():
+    async with _make_client(per_minute=60, burst=3) as client:
+        statuses = [(await client.get("/pets/")).status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+        throttled = await client.get("/pets/")
+        assert int(throttled.headers["retry-after"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_route_cost_and_separate_keys():
+    async with _make_client(per_minute=60, burst=10, route_costs={"POST /reports": 10}) as client:
+        assert (await client.post("/reports/custom")).status_code == 200
+        assert (await client.get("/pets/")).status_code == 429
+
+        # 別クライアント（X-Forwarded-For）や認証ユーザーは別バケット
+        assert (await client.get("/pets/", headers={"X-Forwarded-For": "203.0.113.9"})).status_code == 200
+        token = create_access_token({"sub": "user-1"})
+        assert (await client.get("/pets/", headers={"Authorization": f"Bearer {token}"})).status_code == 200
+
+
+def _conn(forwarded: str, client=("10.0.0.5", 443)) -> HTTPConnection:
+    return HTTPConnection({"type": "http", "headers": [(b"x-forwarded-for", forwarded.encode())], "client": client})
+
+
+def test_spoofed_forwarded_for_does_not_change_key(monkeypatch):
+    monkeypatch.setattr(get_settings(), "trusted_proxy_count", 1)
+    monkeypatch.setattr(get_settings(), "client_ip_header", None)
+
+    # 左側はクライアントが任意に付けられるが、Front Door が右端に追記した値でキーが決まる
+    key = RateLimitMiddleware.key_for(_conn("203.0.113.9"))
+    assert key == "ip:203.0.113.9"
+    assert RateLimitMiddleware.key_for(_conn("198.51.100.1, 203.0.113.9")) == key
+    assert RateLimitMiddleware.key_for(_conn("evil, 1.1.1.1, 203.0.113.9:51234")) == key
+
+    # 不正な値や段数不足は接続元アドレスにフォールバック
+    assert RateLimitMiddleware.key_for(_conn("not-an-ip")) == "ip:10.0.0.5"
+    monkeypatch.setattr(get_settings(), "trusted_proxy_count", 2)
+    assert RateLimitMiddleware.key_for(_conn("198.51.100.1, 203.0.113.9, 10.1.1.1")) == "ip:203.0.113.9"
+    assert RateLimitMiddleware.key_for(_conn("203.0.113.9")) == "ip:10.0.0.5"
+
+
+@pytest.mark.asyncio
+async def test_throttled_responses_keep_cors_headers():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    # app.main と同じ順序（RateLimitMiddleware を先に登録し、CORSMiddleware が外側）
+    app = Starlette(routes=[Route("/pets/", ok)])
+    app.add_middleware(RateLimitMiddleware, backend=MemoryBucketBackend(), per_minute=60, burst=1)
+    app.add_middleware(CORSMiddleware, allow_origins=["https://app.example"], expose_headers=["Retry-After"])
+
+    headers = {"Origin": "https://app.example"}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/pets/", headers=headers)).status_code == 200
+        throttled = await client.get("/pets/", headers=headers)
+
+    assert throttled.status_code == 429
+    assert throttled.headers["access-control-allow-origin"] == "https://app.example"
+    assert "retry-after" in throttled.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import get_settings
+from app.core.database import create_engine_from_settings
+from app.core.read_replicas import PIN_COOKIE, Replica, ReplicaRouter
+
+
+def _request(method="GET", token="t1", cookie=None, forwarded_for=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    if forwarded_for:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers, "client": ("10.0.0.1", 1)})
+
+
+def _router(*replicas, max_lag=5.0):
+    return ReplicaRouter(
+        "primary",
+        list(replicas),
+        max_lag_seconds=max_lag,
+        check_interval=60,
+        check_timeout=1,
+        pin_seconds=5,
+    )
+
+
+def _replica(name, healthy=True, lag=0.0):
+    replica = Replica(name, name)
+    replica.healthy, replica.lag_seconds = healthy, lag
+    return replica
+
+
+def test_reads_round_robin_over_healthy_replicas():
+    router = _router(_replica("r1"), _replica("r2"), _replica("down", healthy=False), _replica("slow", lag=30))
+
+    routed = [router.route(_request()) for _ in range(4)]
+
+    assert routed == ["r1", "r2", "r1", "r2"]
+    assert router.route(_request("POST")) == "primary"
+    assert router.route(None) == "primary"
+
+
+def test_falls_back_to_primary_when_no_replica_is_usable():
+    router = _router(_replica("down", healthy=False), _replica("slow", lag=30))
+
+    assert router.route(_request()) == "primary"
+    assert router.fallbacks == 1
+
+
+def test_client_is_pinned_to_primary_after_write():
+    router = _router(_replica("r1"))
+    response = Response()
+
+    assert router.route(_request("PUT", token="writer"), response) == "primary"
+    assert router.route(_request(token="writer")) == "primary"
+    assert router.route(_request(token="someone-else")) == "r1"
+
+    # 別ワーカー（プロセス内の記録なし）でも Cookie で固定される
+    other_worker = _router(_replica("r1"))
+    cookie = response.headers["set-cookie"].split(";")[0]
+    assert cookie.startswith(f"{PIN_COOKIE}=")
+    assert other_worker.route(_request(token="writer", cookie=cookie)) == "primary"
+    expired = f"{PIN_COOKIE}={int(time.time()) - 1}"
+    assert other_worker.route(_request(token="writer", cookie=expired)) == "r1"
+
+
+def test_anonymous_clients_behind_the_proxy_are_pinned_separately(monkeypatch):
+    monkeypatch.setattr(get_settings(), "trusted_proxy_count", 1)
+    monkeypatch.setattr(get_settings(), "client_ip_header", None)
+    router = _router(_replica("r1"))
+
+    # 接続元（10.0.0.1 = プロキシ）は全員同じなので、X-Forwarded-For の右端で区別する
+    assert router.route(_request("POST", token=None, forwarded_for="203.0.113.9"), Response()) == "primary"
+    assert router.route(_request(token=None, forwarded_for="203.0.113.9")) == "primary"
+    assert router.route(_request(token=None, forwarded_for="198.51.100.7")) == "r1"
+    assert router.route(_request(token=None, forwarded_for="203.0.113.9, 198.51.100.7")) == "r1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URI"), reason="TEST_POSTGRES_URI が未設定")
+async def test_same_database_stand_in_replica():
+    # 同じ DB を読み取り専用エンジンでレプリカに見立てる（pg_is_in_recovery() = false → 遅延 0）
+    cfg = get_settings()
+    uri = os.environ["TEST_POSTGRES_URI"]
+    primary = create_engine_from_settings(cfg, uri)
+    replica = Replica("stand-in", create_engine_from_settings(cfg, uri, read_only=True))
+    router = ReplicaRouter(primary, [replica], max_lag_seconds=5, check_interval=60, check_timeout=5, pin_seconds=5)
+    try:
+        await router.check_once()
+        assert replica.healthy and replica.lag_seconds == 0
+        assert router.route(_request()) is replica.engine
+
+        async with replica.engine.connect() as conn:
+            with pytest.raises(Exception, match="read-only"):
+                await conn.execute(text("CREATE TEMP TABLE replica_write_check (id int)"))
+    finally:
+        await router.stop()
+        await primary.dispose()
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+import fastapi.routing
+import orjson
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api.dependencies import has_admin_role
+from app.api.routes import user as user_routes
+from app.core.database import get_db
+from app.models import pet, user_auth_provider, user_event_log  # noqa: F401  (マッパー解決用)
+from app.models.user import User
+from app.schemas.user import UserRead
+from app.utils.pagination import Page
+from app.utils.serialization import page_response, type_adapter, validate_list
+
+
+def _users(count):
+    return [
+        User(id=uuid.uuid4(), username=f"user{i}", email=f"user{i}@example.com", is_active=True, created_at=datetime.now())
+        for i in range(count)
+    ]
+
+
+def test_list_is_validated_with_one_cached_adapter():
+    users = _users(3)
+
+    first = validate_list(UserRead, users)
+    validate_list(UserRead, users)
+
+    assert [item.id for item in first] == [u.id for u in users]
+    assert all(isinstance(item, UserRead) for item in first)
+    assert type_adapter.cache_info().hits >= 1
+
+
+def test_page_response_matches_cursor_page_schema():
+    users = validate_list(UserRead, _users(2))
+
+    body = orjson.loads(page_response(UserRead, Page(users, "next")).body)
+
+    assert body["next_cursor"] == "next"
+    assert body["items"][0] == {
+        "username": users[0].username,
+        "email": users[0].email,
+        "id": str(users[0].id),
+        "is_active": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_route_skips_response_model_revalidation(monkeypatch):
+    page = Page(validate_list(UserRead, _users(2)), None)
+
+    async def fake_get_all_users(db, params):
+        return page
+
+    async def fail_serialization(*args, **kwargs):
+        raise AssertionError("response_model で再検証された")
+
+    monkeypatch.setattr(user_routes, "get_all_users", fake_get_all_users)
+    monkeypatch.setattr(fastapi.routing, "serialize_response", fail_serialization)
+
+    app = FastAPI()
+    app.include_router(user_routes.router)
+    app.dependency_overrides[has_admin_role] = lambda: None
+    app.dependency_overrides[get_db] = lambda: None
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/users/")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [str(item.id) for item in page.items]
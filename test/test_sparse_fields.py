@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.dependencies import Principal, get_current_user, get_db
+from app.api.routes import pet as pet_routes
+from app.models import user, user_auth_provider, user_event_log  # noqa: F401  (マッパー解決用)
+from app.models.pet import Pet
+from app.utils.pagination import Page
+
+
+def test_selection_narrows_columns_and_model():
+    selection = pet_routes.PET_FIELDS("species, id,name")
+
+    sql = str(select(Pet).options(*selection.options).compile(dialect=postgresql.dialect()))
+    columns = sql.split(" FROM ")[0]
+    assert "pets.name" in columns and "pets.species" in columns and "pets.created_at" in columns
+    assert "pets.breed" not in columns and "pets.updated_at" not in columns
+    assert list(selection.model.model_fields) == ["name", "species", "id"]
+    assert pet_routes.PET_FIELDS("id,name,species") is selection
+
+
+@pytest.mark.asyncio
+async def test_pets_list_returns_only_requested_fields(monkeypatch):
+    received = []
+    now = datetime.now()
+    pet = Pet(id=uuid.uuid4(), user_id=uuid.uuid4(), name="ポチ", species="犬", breed="柴", age=3, created_at=now, updated_at=now)
+
+    async def fake_version(db, user_id):
+        return 1, datetime(2025, 1, 1)
+
+    async def fake_page(db, user_id, params, options=()):
+        received.append(options)
+        return Page([pet], None)
+
+    monkeypatch.setattr(pet_routes.pet_service, "get_pets_version", fake_version)
+    monkeypatch.setattr(pet_routes.pet_service, "get_pets_by_user", fake_page)
+
+    app = FastAPI()
+    app.include_router(pet_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=uuid.UUID(int=1))
+    app.dependency_overrides[get_db] = lambda: None
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        narrowed = await client.get("/pets/", params={"fields": "species, id,name"})
+        unknown = await client.get("/pets/", params={"fields": "id,owner"})
+        full = await client.get("/pets/")
+
+    assert narrowed.status_code == 200
+    assert narrowed.json()["items"] == [{"name": "ポチ", "species": "犬", "id": str(pet.id)}]
+    assert received[0] and received[-1] == ()
+    assert narrowed.headers["etag"] != full.headers["etag"]
+    assert unknown.status_code == 400 and "owner" in unknown.json()["detail"]
+    assert set(full.json()["items"][0]) >= {"breed", "age", "user_id"}
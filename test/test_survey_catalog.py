@@ -0,0 +1,76 @@
+import uuid
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api.dependencies import Principal, get_current_user, get_db
+from app.api.routes import survey
+from app.services import survey_catalog
+from app.services.survey_catalog import (
+    CatalogCategory,
+    CatalogChoice,
+    CatalogQuestion,
+    SurveyCatalogCache,
+    build_catalog,
+)
+
+
+def _tree(label="はい"):
+    question = CatalogQuestion("q1", "散歩は好きですか", (CatalogChoice("c1", label), CatalogChoice("c2", "いいえ")))
+    return (CatalogCategory("cat1", "生活", (question,)),)
+
+
+def test_version_is_content_hash():
+    first, again, changed = build_catalog(_tree()), build_catalog(_tree()), build_catalog(_tree("とても"))
+
+    assert first.version == again.version
+    assert first.version != changed.version
+    body = orjson.loads(first.body)
+    assert body["version"] == first.version
+    assert body["categories"][0]["questions"][0]["choices"][0] == {"id": "c1", "text": "はい"}
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_built_once_until_invalidated(monkeypatch):
+    builds = []
+
+    async def fake_load(db):
+        builds.append(db)
+        return build_catalog(_tree())
+
+    monkeypatch.setattr(survey_catalog, "load_catalog", fake_load)
+    cache = SurveyCatalogCache(max_age=300)
+
+    assert (await cache.get(None)) is (await cache.get(None))
+    cache.invalidate()
+    await cache.get(None)
+    assert len(builds) == 2
+
+
+@pytest.mark.asyncio
+async def test_catalog_route_serves_etag_and_304(monkeypatch):
+    cache = SurveyCatalogCache(max_age=300)
+
+    async def fake_load(db):
+        return build_catalog(_tree())
+
+    monkeypatch.setattr(survey_catalog, "load_catalog", fake_load)
+    monkeypatch.setattr(survey, "get_survey_catalog", lambda: cache)
+
+    app = FastAPI()
+    app.include_router(survey.router)
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=uuid.uuid4())
+    app.dependency_overrides[get_db] = lambda: None
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.get("/surveys/catalog")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert orjson.loads(first.content)["version"] == etag.strip('"')
+
+        cached = await client.get("/surveys/catalog", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
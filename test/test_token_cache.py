@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.core.cache import ExpiringLRUCache
+from app.core.security import create_access_token, decode_access_token, token_cache
+
+
+def test_decode_access_token_is_cached():
+    token_cache.clear()
+    token = create_access_token({"sub": "user-1", "is_admin": True})
+    hits = token_cache.hits
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first.id == "user-1" and first.is_admin
+    assert second is first
+    assert token_cache.hits == hits + 1
+
+
+def test_expired_token_is_not_cached():
+    token_cache.clear()
+    token = create_access_token({"sub": "user-2"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+    assert len(token_cache) == 0
+
+
+def test_lru_evicts_oldest_and_expired_entries():
+    cache = ExpiringLRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, expires_at=time.time() - 1)
+    assert cache.get("d") is None
+    assert cache.stats()["evictions"] == 1
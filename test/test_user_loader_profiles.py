@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import pet, user, user_auth_provider, user_event_log  # noqa: F401  マッパー解決用
+from app.models.user import User
+from app.services.user_loader_profiles import FULL, LEAN, WITH_PETS, user_loader
+
+
+def _sql(profile):
+    return str(select(User).options(*user_loader(profile)).compile(dialect=postgresql.dialect()))
+
+
+def test_relationships_are_not_loaded_by_default():
+    from sqlalchemy import inspect
+
+    for rel in inspect(User).relationships:
+        assert rel.lazy == "raise", rel.key
+
+
+def test_lean_profile_is_one_narrow_query():
+    sql = _sql(LEAN)
+    assert "JOIN" not in sql
+    assert "hashed_password" not in sql
+    assert "last_login_at" not in sql
+    assert "users.email" in sql and "users.created_at" in sql
+
+
+def test_profiles_select_relationships_separately():
+    assert "JOIN" not in _sql(WITH_PETS)
+    assert "JOIN" not in _sql(FULL)
+    assert "hashed_password" in _sql(FULL)
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        user_loader("everything")